@@ -1,12 +1,6 @@
-from elasticsearch import Elasticsearch
+from es_client import es
 import json
 
-# Elasticsearch 연결 설정
-es = Elasticsearch(
-    "http://localhost:9200",
-    basic_auth=("elastic", "OBIpKj46")
-)
-
 def print_section(title):
     print("\n" + "="*50)
     print(f"🔍 {title}")
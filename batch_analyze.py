@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+분석기 일괄 비교 도구
+- 텍스트 배열을 한 번의 _analyze 요청으로 분석 (텍스트마다 요청하지 않음)
+- 여러 분석기 결과를 나란히 비교 (korean_analyzer, legal_analyzer 튜닝용)
+- (분석기, 텍스트)별 토큰 캐시 → 같은 문장을 다시 분석하지 않음
+- 분석기별 토큰 수 통계 / 요청 수 / 소요 시간
+"""
+
+from es_client import es
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from korean_analysis import build_korean_analysis, has_nori_plugin
+import argparse
+import json
+import statistics
+import time
+
+# 요청 하나에 담을 최대 텍스트 수 / 글자 수
+# (index.analyze.max_token_count 기본값 10000 - 한글 bigram은 글자당 토큰이 1개 가까이 나옴)
+BATCH_SIZE = 100
+BATCH_MAX_CHARS = 8000
+
+# Lucene Analyzer.getOffsetGap 기본값 - 배열의 다음 텍스트 offset이 이만큼 띄워서 시작
+OFFSET_GAP = 1
+
+# (분석기 키, 텍스트) → 토큰 튜플
+_token_cache = {}
+
+def print_section(title):
+    print("\n" + "="*60)
+    print(f"🧪 {title}")
+    print("="*60)
+
+def inline_analyzer(analysis, analyzer_name):
+    """인덱스 analysis 설정의 custom 분석기를 인덱스 없이 쓸 수 있는 _analyze 본문으로 변환"""
+    analyzer = analysis["analyzer"][analyzer_name]
+    request = {
+        "tokenizer": analysis.get("tokenizer", {}).get(analyzer["tokenizer"], analyzer["tokenizer"]),
+        "filter": [analysis.get("filter", {}).get(name, name) for name in analyzer.get("filter", [])]
+    }
+    if analyzer.get("char_filter"):
+        request["char_filter"] = [analysis.get("char_filter", {}).get(name, name) for name in analyzer["char_filter"]]
+    return request
+
+def parse_analyzer(value):
+    """CLI 인자 → 분석기 사양 ("standard", "korean_analyzer@tech_books")"""
+    if "@" in value:
+        name, index = value.split("@", 1)
+        return {"analyzer": name, "index": index}
+    return {"analyzer": value}
+
+def analyzer_key(spec):
+    return json.dumps(spec, sort_keys=True, ensure_ascii=False)
+
+def _utf16_len(text):
+    # Elasticsearch(Java)의 offset은 UTF-16 코드 단위 기준
+    return len(text.encode("utf-16-le")) // 2
+
+def split_tokens_by_text(texts, tokens):
+    """배열로 분석한 토큰을 offset으로 원래 텍스트별로 나누기
+
+    i번째 텍스트의 offset은 (앞 텍스트들의 길이 + OFFSET_GAP)의 누적값에서 시작합니다.
+    """
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += _utf16_len(text) + OFFSET_GAP
+
+    per_text = [[] for _ in texts]
+    for token in tokens:
+        per_text[bisect_right(starts, token["start_offset"]) - 1].append(token["token"])
+    return per_text
+
+def _batches(texts, batch_size, max_chars):
+    batch, chars = [], 0
+    for text in texts:
+        if batch and (len(batch) >= batch_size or chars + len(text) > max_chars):
+            yield batch
+            batch, chars = [], 0
+        batch.append(text)
+        chars += len(text)
+    if batch:
+        yield batch
+
+def analyze_texts(texts, spec, batch_size=BATCH_SIZE, max_chars=BATCH_MAX_CHARS):
+    """텍스트 목록을 일괄 분석하여 (텍스트별 토큰 목록, 요청 통계) 반환"""
+    key = analyzer_key(spec)
+    request = {name: value for name, value in spec.items() if name != "index"}
+
+    # 캐시에 없는 텍스트만 중복 없이 요청
+    pending = list(dict.fromkeys(text for text in texts if (key, text) not in _token_cache))
+    pending_set = set(pending)
+    cache_hits = sum(1 for text in texts if text not in pending_set)
+
+    requests = 0
+    start = time.perf_counter()
+    for batch in _batches(pending, batch_size, max_chars):
+        result = es.indices.analyze(index=spec.get("index"), body={**request, "text": batch})
+        for text, tokens in zip(batch, split_tokens_by_text(batch, result["tokens"])):
+            _token_cache[(key, text)] = tuple(tokens)
+        requests += 1
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    return [_token_cache[(key, text)] for text in texts], {
+        "requests": requests,
+        "cache_hits": cache_hits,
+        "elapsed_ms": elapsed_ms
+    }
+
+def token_stats(token_lists):
+    """텍스트별 토큰 수 통계"""
+    counts = sorted(len(tokens) for tokens in token_lists)
+    if not counts:
+        return {"texts": 0, "total_tokens": 0, "avg": 0, "median": 0, "p95": 0, "max": 0, "unique_tokens": 0}
+    return {
+        "texts": len(counts),
+        "total_tokens": sum(counts),
+        "avg": statistics.mean(counts),
+        "median": statistics.median(counts),
+        "p95": counts[min(len(counts) - 1, int(len(counts) * 0.95))],
+        "max": counts[-1],
+        "unique_tokens": len({token for tokens in token_lists for token in tokens})
+    }
+
+def compare_analyzers(texts, specs, batch_size=BATCH_SIZE, max_chars=BATCH_MAX_CHARS):
+    """여러 분석기로 같은 텍스트를 동시에 분석하여 결과와 통계 비교"""
+    def run(label):
+        token_lists, request_stats = analyze_texts(texts, specs[label], batch_size, max_chars)
+        return label, token_lists, {**request_stats, **token_stats(token_lists)}
+
+    with ThreadPoolExecutor(max_workers=len(specs) or 1) as pool:
+        results = list(pool.map(run, specs))
+
+    return {
+        "tokens": {label: token_lists for label, token_lists, _ in results},
+        "stats": {label: stats for label, _, stats in results}
+    }
+
+def clear_token_cache():
+    _token_cache.clear()
+
+def display_comparison(texts, report, show=5):
+    """텍스트별 분석 결과를 분석기끼리 나란히 출력하고 통계 표시"""
+    for i, text in enumerate(texts[:show]):
+        preview = text if len(text) <= 60 else text[:57] + "..."
+        print(f"\n📝 {preview}")
+        for label, token_lists in report["tokens"].items():
+            tokens = list(token_lists[i])
+            suffix = f" ... (+{len(tokens) - 15})" if len(tokens) > 15 else ""
+            print(f"   {label:>20}: {tokens[:15]}{suffix}")
+
+    print_section("분석기별 통계")
+    for label, stats in report["stats"].items():
+        print(f"\n🔧 {label}")
+        print(f"   📊 토큰 수: 합계 {stats['total_tokens']:,} | 평균 {stats['avg']:.1f} | "
+              f"중앙값 {stats['median']} | p95 {stats['p95']} | 최대 {stats['max']}")
+        print(f"   🔤 고유 토큰: {stats['unique_tokens']:,}개")
+        print(f"   ⏱️  요청 {stats['requests']}회, 캐시 적중 {stats['cache_hits']}개, {stats['elapsed_ms']:.1f}ms")
+
+def default_analyzers():
+    """기본 비교 대상: standard / cjk_bigram (+ nori 플러그인이 있으면 nori)"""
+    specs = {
+        "standard": {"analyzer": "standard"},
+        "cjk_bigram": inline_analyzer(build_korean_analysis(None, "bench_analyzer", use_nori=False), "bench_analyzer"),
+    }
+    if has_nori_plugin(es):
+        specs["nori"] = inline_analyzer(build_korean_analysis(es, "bench_analyzer", use_nori=True), "bench_analyzer")
+    return specs
+
+def main():
+    parser = argparse.ArgumentParser(description="분석기 일괄 비교")
+    parser.add_argument("--file", help="한 줄에 한 문장씩 담긴 텍스트 파일 (없으면 법령 샘플 문단)")
+    parser.add_argument("--analyzer", action="append",
+                        help="비교할 분석기 (예: standard, korean_analyzer@tech_books, legal_analyzer@legal_documents)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--show", type=int, default=5, help="나란히 출력할 텍스트 수")
+    args = parser.parse_args()
+
+    if not es.ping():
+        print("❌ Elasticsearch 연결 실패")
+        return
+
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+    else:
+        from highlight_benchmark import LEGAL_PARAGRAPHS
+        texts = list(LEGAL_PARAGRAPHS)
+
+    if args.analyzer:
+        specs = {value: parse_analyzer(value) for value in args.analyzer}
+    else:
+        specs = default_analyzers()
+
+    print_section(f"분석기 일괄 비교 (텍스트 {len(texts):,}개, 분석기 {len(specs)}개)")
+    start = time.perf_counter()
+    report = compare_analyzers(texts, specs, args.batch_size)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    display_comparison(texts, report, args.show)
+    print(f"\n⏱️  전체 {elapsed_ms:.1f}ms")
+
+    print_section("✅ 분석기 일괄 비교 완료!")
+
+if __name__ == "__main__":
+    main()
@@ -1,85 +1,39 @@
-from elasticsearch import Elasticsearch
-from elasticsearch.helpers import bulk
+from es_client import es
 import json
-import random
-from datetime import datetime, timedelta
+from bulk_retry import bulk_actions
+from index_versions import GRACE_SECONDS, IncompleteLoadError, build_version, ensure_complete
+from korean_analysis import build_korean_analysis
+from sample_data import iter_documents
+from tracing import get_tracer, traced
 
-# Elasticsearch 연결 설정
-es = Elasticsearch(
-    "http://localhost:9200",
-    basic_auth=("elastic", "OBIpKj46")
-)
+tracer = get_tracer(__name__)
+
+# 실습 데이터 seed (실행할 때마다 같은 문서)
+SAMPLE_SEED = 42
 
 def print_section(title):
     print("\n" + "="*50)
     print(f"📦 {title}")
     print("="*50)
 
-def generate_sample_data(count=100):
-    """샘플 데이터 생성"""
-    categories = ['프로그래밍', '데이터사이언스', '웹개발', '머신러닝', '인공지능', '클라우드', '보안', '모바일']
-    authors = ['김철수', '이영희', '박민수', '최지은', '정동훈', '홍길동', '김영수', '이민정']
-    
-    languages = ['Python', 'Java', 'JavaScript', 'C++', 'Go', 'Rust', 'TypeScript', 'Kotlin']
-    adjectives = ['완벽한', '실용적인', '전문가를 위한', '초보자를 위한', '고급', '기초', '심화']
-    
-    data = []
-    
-    for i in range(count):
-        # 랜덤 데이터 생성
-        category = random.choice(categories)
-        author = random.choice(authors)
-        language = random.choice(languages)
-        adjective = random.choice(adjectives)
-        
-        # 날짜 범위 (최근 2년)
-        start_date = datetime.now() - timedelta(days=730)
-        random_days = random.randint(0, 730)
-        pub_date = start_date + timedelta(days=random_days)
-        
-        doc = {
-            "title": f"{adjective} {language} {category}",
-            "author": author,
-            "category": category,
-            "language": language,
-            "publish_date": pub_date.strftime("%Y-%m-%d"),
-            "price": random.randint(15000, 50000),
-            "pages": random.randint(200, 800),
-            "rating": round(random.uniform(3.0, 5.0), 1),
-            "description": f"{language}를 사용한 {category} 전문서적. {adjective} 접근 방식으로 실무에 바로 적용할 수 있습니다.",
-            "tags": [language.lower(), category, "programming"] + random.sample(['tutorial', 'advanced', 'beginner', 'expert'], 2)
-        }
-        
-        data.append(doc)
-    
-    return data
+@traced("generate_sample_data")
+def generate_sample_data(count=100, seed=None, partition=0, partition_count=1, index_name="tech_books", end_date=None):
+    """샘플 데이터 생성 → bulk 액션 목록
 
-def main():
-    print_section("벌크 인덱싱 실습")
-    
-    index_name = "tech_books"
-    
-    # 1. 인덱스 삭제 및 재생성
-    print("🗑️ 기존 인덱스 삭제...")
-    if es.indices.exists(index=index_name):
-        es.indices.delete(index=index_name)
-        print(f"   '{index_name}' 인덱스 삭제 완료")
-    
-    # 2. 새로운 인덱스 생성 (한국어 검색 최적화)
-    print("🏗️ 새로운 인덱스 생성...")
-    
-    index_settings = {
+    sample_data의 벡터화 생성기를 사용하며, 같은 seed면 같은 데이터입니다.
+    partition_count개로 나눈 것 중 partition번째 몫만 만들고 _id도 그 범위로 매기므로
+    여러 프로세스가 나눠 만들어도 _id가 겹치지 않습니다.
+    출판일은 end_date(기본 sample_data.DEFAULT_END_DATE) 기준 최근 2년이라 실행한 날짜와 상관없습니다.
+    """
+    return list(iter_documents(count, seed, index_name, end_date=end_date, partition=partition, partition_count=partition_count))
+
+def build_index_settings(client=es):
+    """tech_books 인덱스 설정 / 매핑 (한국어 검색 최적화)"""
+    return {
         "settings": {
             "number_of_shards": 1,
             "number_of_replicas": 0,
-            "analysis": {
-                "analyzer": {
-                    "korean_analyzer": {
-                        "type": "standard",
-                        "stopwords": "_none_"
-                    }
-                }
-            }
+            "analysis": build_korean_analysis(client, "korean_analyzer")
         },
         "mappings": {
             "properties": {
@@ -102,33 +56,42 @@ def main():
             }
         }
     }
+
+def main():
+    print_section("벌크 인덱싱 실습")
     
-    es.indices.create(index=index_name, body=index_settings)
-    print(f"   '{index_name}' 인덱스 생성 완료")
-    
-    # 3. 벌크 데이터 생성
-    print("📝 샘플 데이터 생성...")
-    sample_data = generate_sample_data(100)
-    print(f"   {len(sample_data)}개의 샘플 문서 생성 완료")
-    
-    # 4. 벌크 인덱싱
-    print("📦 벌크 인덱싱 시작...")
-    
-    def doc_generator():
-        for i, doc in enumerate(sample_data):
-            yield {
-                "_index": index_name,
-                "_id": i + 1,
-                "_source": doc
-            }
-    
-    # 벌크 인덱싱 실행
-    success_count, failed_docs = bulk(es, doc_generator(), chunk_size=50)
-    print(f"   성공: {success_count}개, 실패: {len(failed_docs)}개")
+    index_name = "tech_books"
     
-    # 5. 인덱스 새로고침
-    es.indices.refresh(index=index_name)
-    print("🔄 인덱스 새로고침 완료")
+    # 1. 새 버전 인덱스 생성 (tech_books alias는 로딩이 끝날 때까지 기존 버전을 가리킴)
+    print("🏗️ 새 버전 인덱스 생성...")
+    
+    try:
+        with build_version(es, index_name, build_index_settings()) as version_index:
+            print(f"   '{version_index}' 인덱스 생성 완료 (refresh 끔 / 복제본 0)")
+            
+            # 2. 벌크 데이터 생성
+            print("📝 샘플 데이터 생성...")
+            sample_data = generate_sample_data(100, seed=SAMPLE_SEED, index_name=version_index)
+            print(f"   {len(sample_data)}개의 샘플 문서 생성 완료")
+            
+            # 3. 벌크 인덱싱
+            print("📦 벌크 인덱싱 시작...")
+            
+            # 벌크 인덱싱 실행 (청크마다 elasticsearch.bulk 스팬이 이 스팬 아래에 기록됨)
+            with tracer.start_as_current_span("bulk_index", attributes={"index": version_index, "docs": len(sample_data)}):
+                result = bulk_actions(es, sample_data, chunk_size=50)
+            print(f"   성공: {result['docs']}개, 재시도: {result['retried']}개, 실패(dead-letter): {result['dead']}개")
+            for error in result["errors"]:
+                print(f"   ❌ [{error['status']}] {error['error']}")
+            # 한 건이라도 빠졌으면 전환하지 않음 (새 버전 삭제, alias는 이전 버전 유지)
+            ensure_complete(result, len(sample_data))
+    except IncompleteLoadError as e:
+        print(f"❌ 로딩 미완료: {e} → '{version_index}' 삭제, alias '{index_name}'는 기존 버전 유지 (python bulk_retry.py replay --index {index_name})")
+        return
+    
+    # 4. 설정 복원 + 새로고침 (build_version 블록을 빠져나올 때)
+    # 5. 예열 후 alias 전환
+    print(f"🔀 alias '{index_name}' → '{version_index}' 전환 완료 (이전 버전은 {GRACE_SECONDS}초 유예가 지난 뒤 다음 전환 또는 `index_versions.py cleanup` 때 삭제)")
     
     # 6. 인덱싱 결과 확인
     print_section("인덱싱 결과 확인")
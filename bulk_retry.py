@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+벌크 재시도 큐 + dead-letter 파일
+- _bulk 응답의 항목별 실패를 분류
+  - 재시도 가능 (429 거부, 타임아웃, 502/503/504): 그 항목만 모아 지수 백오프 + 지터 후 다시 전송
+  - 영구 실패 (매핑 오류 등) / 재시도 횟수 초과: dead-letter NDJSON 파일에 원본 줄 + 에러 사유 기록
+- 요청 자체가 429 / 타임아웃 / 연결 오류로 실패해도 같은 규칙으로 재시도
+- 백오프는 실패한 요청을 보낸 스레드/프로세스만 기다리므로 나머지 전송은 계속 진행
+- python bulk_retry.py replay : dead-letter 파일을 다시 전송 (또 실패한 항목은 새 dead-letter로,
+  기록된 인덱스가 지워졌으면 보내지 않음 → --index <alias>로 대상 지정)
+- python bulk_retry.py summary : dead-letter 파일을 에러 종류별로 요약
+
+환경 변수
+- ES_BULK_DEAD_LETTER: dead-letter 파일 경로 (기본 bulk_dead_letter.ndjson)
+"""
+
+from es_client import ES_URL, create_client, es
+from elasticsearch import ApiError, ConnectionError, ConnectionTimeout
+from datetime import datetime
+import argparse
+import json
+import os
+import random
+import threading
+import time
+
+DEFAULT_DEAD_LETTER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bulk_dead_letter.ndjson")
+DEAD_LETTER_PATH = os.environ.get("ES_BULK_DEAD_LETTER", DEFAULT_DEAD_LETTER_PATH)
+
+# 잠시 후 다시 보내면 성공할 수 있는 상태 코드
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+# 상태 코드와 상관없이 재시도할 에러 종류 (샤드 쪽 타임아웃 등)
+RETRYABLE_ERROR_TYPES = {"es_rejected_execution_exception", "timeout_exception", "process_cluster_event_timeout_exception"}
+
+MAX_RETRIES = 5
+INITIAL_BACKOFF = 0.5
+MAX_BACKOFF = 30.0
+
+def print_section(title):
+    print("\n" + "="*60)
+    print(f"♻️ {title}")
+    print("="*60)
+
+def is_retryable(outcome):
+    """_bulk 항목 결과 하나가 재시도 대상인지"""
+    error = outcome.get("error")
+    error_type = error.get("type") if isinstance(error, dict) else None
+    return outcome.get("status") in RETRYABLE_STATUSES or error_type in RETRYABLE_ERROR_TYPES
+
+def backoff_delay(attempt, initial=INITIAL_BACKOFF, maximum=MAX_BACKOFF):
+    """attempt번째 재시도 전 대기 시간 - 지수 백오프 + full jitter
+
+    0 ~ min(maximum, initial * 2^attempt) 사이 난수라서
+    같은 순간 거부당한 요청들이 같은 시각에 한꺼번에 다시 몰리지 않습니다.
+    """
+    return random.uniform(0, min(maximum, initial * (2 ** attempt)))
+
+def split_pairs(body):
+    """bulk 본문 → [(액션 줄, 문서 줄), ...] (index/create만 있는 본문 기준)"""
+    lines = body.split(b"\n")
+    if lines and not lines[-1]:
+        lines.pop()
+    return list(zip(lines[::2], lines[1::2]))
+
+def join_pairs(pairs):
+    return b"".join(action + b"\n" + source + b"\n" for action, source in pairs)
+
+class DeadLetterWriter:
+    """영구 실패 항목을 NDJSON으로 추가 기록 (스레드 안전)
+
+    한 줄을 write 한 번으로 "ab" 모드에 쓰므로 여러 프로세스가 같은 파일에 붙여 써도 줄이 섞이지 않습니다.
+    """
+
+    def __init__(self, path=DEAD_LETTER_PATH):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def write(self, index_name, action, source, status, error, attempts):
+        record = {
+            "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+            "index": index_name,
+            "status": status,
+            "error": error,
+            "attempts": attempts,
+            # 원본 줄을 그대로 보관해서 replay 때 그대로 다시 보냄
+            "action": action.decode("utf-8"),
+            "source": source.decode("utf-8")
+        }
+        self.append(record)
+
+    def append(self, record):
+        """기록 한 줄을 그대로 추가 (replay가 보내지 않고 남겨 두는 항목)"""
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(line)
+            self.count += 1
+
+def new_stats():
+    return {"docs": 0, "bytes": 0, "requests": 0, "retried": 0, "dead": 0, "errors": []}
+
+def merge_stats(total, stats):
+    for key in ("docs", "bytes", "requests", "retried", "dead"):
+        total[key] += stats[key]
+    total["errors"].extend(stats["errors"][:5 - len(total["errors"])])
+    return total
+
+def bulk_with_retry(client, body, index_name=None, dead_letter=None, max_retries=MAX_RETRIES,
+                    initial_backoff=INITIAL_BACKOFF, max_backoff=MAX_BACKOFF):
+    """bulk 본문 하나를 재시도 규칙에 따라 끝까지 처리 → 통계 dict
+
+    모든 문서는 성공(docs) 또는 dead-letter 기록(dead) 중 하나로 끝납니다.
+    클라이언트 자체 재시도는 끄고(max_retries=0) 여기서 백오프를 직접 관리합니다.
+    """
+    client = client.options(max_retries=0)
+    dead_letter = dead_letter or DeadLetterWriter()
+    stats = new_stats()
+    stats["bytes"] = len(body)
+    pairs = split_pairs(body)
+    attempt = 0
+
+    def bury(items, status, error):
+        for action, source in items:
+            dead_letter.write(index_name, action, source, status, error, attempt + 1)
+        stats["dead"] += len(items)
+        if len(stats["errors"]) < 5:
+            stats["errors"].append({"status": status, "error": error})
+
+    while pairs:
+        request_body = body if attempt == 0 else join_pairs(pairs)
+        stats["requests"] += 1
+        try:
+            result = client.bulk(operations=request_body, index=index_name)
+        except (ApiError, ConnectionError, ConnectionTimeout) as e:
+            # 요청 전체 실패 - 429 / 5xx / 타임아웃 / 연결 오류만 재시도
+            status = getattr(e, "status_code", None) if isinstance(e, ApiError) else None
+            retryable = not isinstance(e, ApiError) or status in RETRYABLE_STATUSES
+            if not retryable or attempt >= max_retries:
+                bury(pairs, status, {"type": type(e).__name__, "reason": str(e)[:500]})
+                return stats
+            stats["retried"] += len(pairs)
+            time.sleep(backoff_delay(attempt, initial_backoff, max_backoff))
+            attempt += 1
+            continue
+
+        if not result["errors"]:
+            stats["docs"] += len(pairs)
+            return stats
+
+        retry = []
+        for pair, item in zip(pairs, result["items"]):
+            outcome = next(iter(item.values()))
+            if "error" not in outcome:
+                stats["docs"] += 1
+            elif is_retryable(outcome) and attempt < max_retries:
+                retry.append(pair)
+            else:
+                bury([pair], outcome.get("status"), outcome["error"])
+        if retry:
+            stats["retried"] += len(retry)
+            time.sleep(backoff_delay(attempt, initial_backoff, max_backoff))
+        pairs = retry
+        attempt += 1
+    return stats
+
+def actions_to_body(actions):
+    """helpers.bulk 형식 액션 dict 목록 → bulk 본문 (index 액션만)
+
+    helpers.bulk처럼 _routing은 bulk 액션 메타데이터의 routing으로 바꿔 씁니다 (ES 7+는 _routing 거부).
+    """
+    lines = []
+    for action in actions:
+        meta = {key: action[key] for key in ("_index", "_id") if key in action}
+        routing = action.get("_routing", action.get("routing"))
+        if routing is not None:
+            meta["routing"] = routing
+        lines.append(json.dumps({"index": meta}, ensure_ascii=False))
+        lines.append(json.dumps(action["_source"], ensure_ascii=False))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+def bulk_actions(client, actions, chunk_size=500, dead_letter=None, **retry_options):
+    """액션 dict를 chunk_size개씩 bulk_with_retry로 전송 → 통계 dict"""
+    dead_letter = dead_letter or DeadLetterWriter()
+    total = new_stats()
+    chunk = []
+    for action in actions:
+        chunk.append(action)
+        if len(chunk) >= chunk_size:
+            merge_stats(total, bulk_with_retry(client, actions_to_body(chunk), dead_letter=dead_letter, **retry_options))
+            chunk = []
+    if chunk:
+        merge_stats(total, bulk_with_retry(client, actions_to_body(chunk), dead_letter=dead_letter, **retry_options))
+    return total
+
+def load_dead_letters(path=DEAD_LETTER_PATH):
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def record_target(record):
+    """dead-letter 항목이 실제로 들어가던 인덱스 (액션 줄의 _index 우선, 없으면 bulk 요청 대상)"""
+    meta = next(iter(json.loads(record["action"]).values()))
+    return meta.get("_index") or record.get("index")
+
+def retarget(action):
+    """액션 줄에서 _index 제거 → bulk 요청 대상 인덱스로 보내짐"""
+    op, meta = next(iter(json.loads(action).items()))
+    meta.pop("_index", None)
+    return json.dumps({op: meta}, ensure_ascii=False).encode("utf-8")
+
+def replay(client, path=DEAD_LETTER_PATH, index_name=None, chunk_size=500, **retry_options):
+    """dead-letter 파일을 다시 전송 → 통계 dict (+ "skipped": 보내지 않은 대상별 건수)
+
+    파일을 <path>.replaying으로 옮긴 뒤 보내고, 또 실패한 항목은 원래 경로에 새로 기록합니다.
+    중간에 멈추면 다음 replay가 .replaying부터 이어서 보냅니다 (_id가 같으므로 다시 보내도 중복되지 않음).
+    index_name을 주면 액션 줄의 _index까지 무시하고 모두 그 인덱스(보통 alias)로 보냅니다.
+    기록된 인덱스가 이미 지워졌으면(전환 뒤 정리된 버전, 실패해서 버린 버전) 보내지 않고 파일에 남깁니다 -
+    그대로 보내면 동적 매핑으로 새 인덱스가 생기고 문서는 alias 뒤에 나타나지 않습니다.
+    """
+    replaying = f"{path}.replaying"
+    if not os.path.exists(replaying):
+        if not os.path.exists(path):
+            return {**new_stats(), "skipped": {}}
+        os.replace(path, replaying)
+
+    dead_letter = DeadLetterWriter(path)
+    total = new_stats()
+    skipped = {}
+    exists = {}
+    groups = {}
+    for record in load_dead_letters(replaying):
+        target = index_name or record_target(record)
+        if target not in exists:
+            exists[target] = target is not None and bool(client.indices.exists(index=target))
+        if not exists[target]:
+            dead_letter.append(record)
+            skipped[target] = skipped.get(target, 0) + 1
+            continue
+        action = record["action"].encode("utf-8")
+        pairs = groups.setdefault(target, [])
+        pairs.append((retarget(action) if index_name else action, record["source"].encode("utf-8")))
+        if len(pairs) >= chunk_size:
+            merge_stats(total, bulk_with_retry(client, join_pairs(pairs), target, dead_letter, **retry_options))
+            pairs.clear()
+    for target, pairs in groups.items():
+        if pairs:
+            merge_stats(total, bulk_with_retry(client, join_pairs(pairs), target, dead_letter, **retry_options))
+
+    os.remove(replaying)
+    total["skipped"] = skipped
+    return total
+
+def summarize(path=DEAD_LETTER_PATH):
+    """에러 종류별 건수 / 예시 사유"""
+    groups = {}
+    for record in load_dead_letters(path):
+        error = record.get("error") or {}
+        key = (record.get("index"), record.get("status"), error.get("type"))
+        group = groups.setdefault(key, {"count": 0, "reason": error.get("reason")})
+        group["count"] += 1
+    return sorted(groups.items(), key=lambda item: item[1]["count"], reverse=True)
+
+def display_stats(stats):
+    print(f"📄 성공 {stats['docs']:,}건 | 재시도 {stats['retried']:,}건 | dead-letter {stats['dead']:,}건 | 요청 {stats['requests']:,}회")
+    for error in stats["errors"]:
+        print(f"   ❌ [{error['status']}] {error['error']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="벌크 dead-letter 관리")
+    parser.add_argument("--file", default=DEAD_LETTER_PATH)
+    parser.add_argument("--url", default=ES_URL)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    replay_parser = subparsers.add_parser("replay", help="dead-letter 파일 다시 전송")
+    replay_parser.add_argument("--index", help="기록된 인덱스 / 액션 줄의 _index 대신 보낼 인덱스 (버전 인덱스로 로딩했으면 alias)")
+    replay_parser.add_argument("--chunk-size", type=int, default=500)
+    replay_parser.add_argument("--max-retries", type=int, default=MAX_RETRIES)
+
+    subparsers.add_parser("summary", help="에러 종류별 요약")
+
+    args = parser.parse_args()
+
+    if args.command == "summary":
+        rows = summarize(args.file)
+        print_section(f"dead-letter 요약 ({sum(group['count'] for _, group in rows):,}건)")
+        for (index_name, status, error_type), group in rows:
+            print(f"   {index_name or '(액션 줄의 _index)'} | {status} {error_type}: {group['count']:,}건")
+            print(f"      {str(group['reason'])[:200]}")
+        return
+
+    client = es if args.url == ES_URL else create_client(args.url)
+    print_section(f"dead-letter 재전송 ({args.file})")
+    stats = replay(client, args.file, args.index, args.chunk_size, max_retries=args.max_retries)
+    display_stats(stats)
+    for target, count in stats["skipped"].items():
+        print(f"⏭️  '{target}' 인덱스가 없어 {count:,}건을 보내지 않고 {args.file}에 남겼습니다 (--index <alias>로 다시 실행)")
+    if stats["dead"]:
+        print(f"⚠️  다시 실패한 항목은 {args.file}에 기록되었습니다.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+요청 압축 벤치마크 (bulk / PDF 인덱싱)
+- gzip 레벨별로 전송 바이트, 클라이언트 CPU, 처리량 비교
+- 1단계 (오프라인): 같은 본문을 레벨별로 압축만 해서 압축률 / CPU / 압축 속도 측정
+- 2단계 (실제 전송): es_client.set_compression으로 레벨을 바꿔 가며 bulk / PDF 문서를 인덱싱
+  · bulk: sample_data NDJSON 본문 (parallel_bulk.send_bodies로 전송)
+  · PDF: --pdf 파일을 pdf_search와 같은 형식(base64 data 필드)으로 es.index
+    (파일이 없으면 무작위 바이트로 만든 PDF 크기의 문서 - 실제 PDF 스트림도 이미 압축되어 있어 비슷함)
+- --wan-mbps: 클러스터 앞에 대역폭을 제한하는 TCP 프록시를 별도 프로세스로 띄워 WAN 링크 흉내
+  (로컬 클러스터에서는 네트워크가 병목이 아니라 압축 이득이 드러나지 않음)
+
+클라이언트 CPU는 time.process_time() - 이 프로세스(압축 + 직렬화 + HTTP)만 측정되고
+프록시 / Elasticsearch 쪽 CPU는 포함되지 않습니다.
+"""
+
+from es_client import ES_AUTH, ES_URL, compression_stats, create_client, reset_metrics, set_compression
+from urllib.parse import urlsplit
+import argparse
+import base64
+import gzip
+import json
+import multiprocessing
+import os
+import random
+import socket
+import threading
+import time
+
+from parallel_bulk import split_bulk_body, send_bodies
+from sample_data import iter_ndjson_blocks
+
+LEVELS = (0, 1, 3, 6, 9)
+PDF_SIZE = 2 * 1024 * 1024
+BENCH_INDEX = "compression_bench"
+
+# 프록시가 한 번에 읽는 크기 = 쉬고 있던 링크가 한꺼번에 보낼 수 있는 최대량
+PROXY_CHUNK_BYTES = 65536
+
+PDF_MAPPINGS = {
+    "properties": {
+        "filename": {"type": "keyword"},
+        "upload_date": {"type": "date"},
+        "file_size": {"type": "long"},
+        "data": {"type": "binary"}
+    }
+}
+
+def print_section(title):
+    print("\n" + "="*60)
+    print(f"🗜️ {title}")
+    print("="*60)
+
+def bulk_payloads(docs, docs_per_request, seed):
+    """sample_data NDJSON → [(본문, 문서 수), ...] (_index 없는 액션 줄 → /{index}/_bulk)"""
+    payloads = []
+    for block in iter_ndjson_blocks(docs, seed, index_name=None):
+        payloads.extend(split_bulk_body(block, docs_per_request))
+    return payloads
+
+def pdf_documents(paths, count, size, seed):
+    """pdf_search.index_pdf_file과 같은 형식의 문서 목록"""
+    if paths:
+        documents = []
+        for path in paths:
+            with open(path, "rb") as f:
+                data = f.read()
+            documents.append({
+                "filename": os.path.basename(path),
+                "upload_date": "2024-01-01T00:00:00",
+                "file_size": len(data),
+                "data": base64.b64encode(data).decode("utf-8")
+            })
+        return documents
+
+    rng = random.Random(seed)
+    return [{
+        "filename": f"synthetic_{i}.pdf",
+        "upload_date": "2024-01-01T00:00:00",
+        "file_size": size,
+        "data": base64.b64encode(rng.randbytes(size)).decode("utf-8")
+    } for i in range(count)]
+
+def offline_compare(name, bodies, levels):
+    """압축만 했을 때 레벨별 압축률 / CPU"""
+    raw_bytes = sum(len(body) for body in bodies)
+    print(f"\n📦 {name}: 본문 {len(bodies)}개, {raw_bytes / 1024 / 1024:,.1f}MB")
+    print(f"   {'레벨':>4} | {'압축 후':>10} | {'비율':>6} | {'CPU':>8} | {'압축 속도':>10}")
+    for level in levels:
+        if not level:
+            continue
+        started = time.process_time()
+        wire_bytes = sum(len(gzip.compress(body, compresslevel=level, mtime=0)) for body in bodies)
+        cpu = time.process_time() - started
+        print(f"   {level:>4} | {wire_bytes / 1024 / 1024:>8,.2f}MB | {wire_bytes / raw_bytes:>6.1%} | "
+              f"{cpu * 1000:>6,.0f}ms | {raw_bytes / 1024 / 1024 / max(cpu, 1e-9):>7,.0f}MB/s")
+
+def _pump(source, target, bucket):
+    try:
+        while True:
+            data = source.recv(PROXY_CHUNK_BYTES)
+            if not data:
+                break
+            bucket.consume(len(data))
+            target.sendall(data)
+    except OSError:
+        pass
+    finally:
+        for sock in (source, target):
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+class TokenBucket:
+    """방향 하나(업로드 / 다운로드)의 대역폭 제한 - 모든 연결이 같은 링크를 나눠 씀"""
+
+    def __init__(self, bytes_per_second):
+        self.rate = bytes_per_second
+        self.available = 0.0
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, size):
+        with self._lock:
+            now = time.monotonic()
+            self.available = min(PROXY_CHUNK_BYTES, self.available + (now - self.updated) * self.rate) - size
+            self.updated = now
+            wait = -self.available / self.rate if self.available < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+def run_throttle_proxy(listen_port, upstream_host, upstream_port, mbps, ready):
+    """127.0.0.1:listen_port → upstream, 방향별 mbps 제한 (별도 프로세스에서 실행)"""
+    upload = TokenBucket(mbps * 1_000_000 / 8)
+    download = TokenBucket(mbps * 1_000_000 / 8)
+    server = socket.create_server(("127.0.0.1", listen_port))
+    ready.set()
+    while True:
+        client, _ = server.accept()
+        upstream = socket.create_connection((upstream_host, upstream_port))
+        for sock in (client, upstream):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        threading.Thread(target=_pump, args=(client, upstream, upload), daemon=True).start()
+        threading.Thread(target=_pump, args=(upstream, client, download), daemon=True).start()
+
+def start_throttle_proxy(url, mbps):
+    """대역폭 제한 프록시 프로세스 시작 → (프록시 URL, 프로세스)"""
+    parts = urlsplit(url)
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    ready = multiprocessing.Event()
+    process = multiprocessing.Process(
+        target=run_throttle_proxy, args=(port, parts.hostname, parts.port or 9200, mbps, ready), daemon=True
+    )
+    process.start()
+    ready.wait(10)
+    return f"http://127.0.0.1:{port}", process
+
+def _wire_bytes(operation_class, raw_bytes):
+    """전송된 요청 바이트 = 압축된 본문 + 압축하지 않은(작은) 본문"""
+    stats = compression_stats().get(operation_class)
+    if not stats:
+        return raw_bytes
+    return stats["wire_bytes"] + raw_bytes - stats["raw_bytes"]
+
+def measure(run, operation_class, raw_bytes, docs):
+    reset_metrics()
+    started, cpu_started = time.perf_counter(), time.process_time()
+    run()
+    elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+    return {
+        "elapsed": elapsed, "cpu": cpu, "docs": docs,
+        "raw_bytes": raw_bytes, "wire_bytes": _wire_bytes(operation_class, raw_bytes)
+    }
+
+def display_row(level, result):
+    elapsed = result["elapsed"]
+    print(f"   {level:>4} | {result['wire_bytes'] / 1024 / 1024:>8,.2f}MB | "
+          f"{result['wire_bytes'] / result['raw_bytes']:>6.1%} | {result['cpu']:>6.2f}s | {elapsed:>6.2f}s | "
+          f"{result['docs'] / elapsed:>9,.0f} | {result['raw_bytes'] / 1024 / 1024 / elapsed:>7,.1f}MB/s")
+
+def display_header(name):
+    print(f"\n🚀 {name}")
+    print(f"   {'레벨':>4} | {'전송':>10} | {'비율':>6} | {'CPU':>7} | {'시간':>7} | {'docs/s':>9} | {'처리량':>11}")
+
+def recreate_index(client, index_name, **create_args):
+    """측정 전 빈 인덱스로 다시 생성 (측정 시간에는 포함하지 않음)"""
+    client.indices.delete(index=index_name, ignore_unavailable=True)
+    client.indices.create(index=index_name, **create_args)
+
+def end_to_end(client, args, bulk_bodies, documents):
+    bulk_index, pdf_index = args.index, f"{args.index}_pdf"
+    bulk_raw = sum(len(body) for body, _ in bulk_bodies)
+    bulk_docs = sum(docs for _, docs in bulk_bodies)
+    pdf_raw = sum(len(json.dumps(doc, separators=(",", ":")).encode("utf-8")) for doc in documents)
+
+    from bulk_operations import build_index_settings
+    settings = build_index_settings(client)
+
+    try:
+        # 레벨마다 빈 인덱스로 다시 만들어, 뒤 레벨이 같은 _id 덮어쓰기를 재는 일이 없게 함
+        display_header(f"bulk ({bulk_docs:,}건, 동시 요청 {args.concurrency}개)")
+        for level in args.levels:
+            recreate_index(client, bulk_index, body=settings)
+            set_compression({"bulk": level})
+            result = measure(lambda: send_bodies(client, bulk_bodies, bulk_index, args.concurrency),
+                             "bulk", bulk_raw, bulk_docs)
+            display_row(level, result)
+
+        display_header(f"PDF ({len(documents)}개{', pipeline ' + args.pipeline if args.pipeline else ''})")
+        for level in args.levels:
+            recreate_index(client, pdf_index, mappings=PDF_MAPPINGS)
+            set_compression({"document": level})
+            result = measure(lambda: [client.index(index=pdf_index, document=doc, pipeline=args.pipeline)
+                                      for doc in documents], "document", pdf_raw, len(documents))
+            display_row(level, result)
+    finally:
+        set_compression({})
+        for index_name in (bulk_index, pdf_index):
+            client.indices.delete(index=index_name, ignore_unavailable=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="요청 압축 레벨별 bulk / PDF 인덱싱 벤치마크")
+    parser.add_argument("--url", default=ES_URL)
+    parser.add_argument("--index", default=BENCH_INDEX, help="벤치마크용 인덱스 (끝나면 삭제, PDF는 <index>_pdf)")
+    parser.add_argument("--levels", type=int, nargs="+", default=list(LEVELS), help="gzip 레벨 (0 = 압축 안 함)")
+    parser.add_argument("--docs", type=int, default=50_000, help="bulk 문서 수")
+    parser.add_argument("--docs-per-request", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--pdf", nargs="*", default=[], help="PDF 파일 (없으면 무작위 바이트 문서)")
+    parser.add_argument("--pdf-count", type=int, default=10)
+    parser.add_argument("--pdf-size", type=int, default=PDF_SIZE)
+    parser.add_argument("--pipeline", help="PDF 인덱싱 파이프라인 (예: attachment - 서버 쪽 추출 시간이 섞임)")
+    parser.add_argument("--wan-mbps", type=float, help="이 대역폭(Mbit/s)으로 제한하는 프록시를 거쳐 전송")
+    parser.add_argument("--offline", action="store_true", help="압축률 / CPU만 측정 (클러스터 없이)")
+    args = parser.parse_args()
+
+    print_section("요청 압축 벤치마크")
+    bulk_bodies = bulk_payloads(args.docs, args.docs_per_request, args.seed)
+    documents = pdf_documents(args.pdf, args.pdf_count, args.pdf_size, args.seed)
+
+    offline_compare("bulk NDJSON", [body for body, _ in bulk_bodies], args.levels)
+    offline_compare("PDF 문서 (base64)", [json.dumps(doc, separators=(",", ":")).encode("utf-8") for doc in documents], args.levels)
+    if args.offline:
+        return
+
+    url, proxy = args.url, None
+    if args.wan_mbps:
+        url, proxy = start_throttle_proxy(args.url, args.wan_mbps)
+        print(f"\n🌐 {args.wan_mbps:g}Mbit/s 제한 프록시: {url} → {args.url}")
+
+    try:
+        client = create_client(url, basic_auth=ES_AUTH if args.url == ES_URL else None, request_timeout=300)
+        if not client.ping():
+            print("❌ Elasticsearch 연결 실패")
+            return
+        end_to_end(client, args, bulk_bodies, documents)
+    finally:
+        if proxy is not None:
+            proxy.terminate()
+
+    print_section("✅ 벤치마크 완료!")
+
+if __name__ == "__main__":
+    main()
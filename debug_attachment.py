@@ -3,17 +3,11 @@
 attachment processor 디버깅 스크립트
 """
 
-from elasticsearch import Elasticsearch
+from es_client import es
 import base64
 import json
 import traceback
 
-# Elasticsearch 연결
-es = Elasticsearch(
-    "http://localhost:9200",
-    basic_auth=("elastic", "OBIpKj46")
-)
-
 def check_plugins():
     """설치된 플러그인 확인"""
     print("🔍 설치된 플러그인 확인...")
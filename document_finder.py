@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+문서 내 찾기 (Ctrl+F) 엔진
+- 문서마다 2글자(bigram) 출현 위치 인덱스를 한 번만 만들어 캐시 (NumPy 정렬 한 번)
+- 검색어에서 가장 드문 bigram의 위치만 후보로 검증 → 본문 전체 스캔 없음
+- 후보는 앞에서부터 조금씩 검증하고 검색어별 오름차순 스트림을 병합하므로
+  max_matches개가 차면 나머지 후보는 보지 않음
+- 모든 일치 위치와 앞뒤 문맥 반환, "따옴표" 구문 검색 지원
+"""
+
+from itertools import islice, repeat
+import heapq
+import time
+
+import numpy as np
+
+# 문서 캐시: cache_key → (원문, bigram 위치 인덱스)
+_document_cache = {}
+
+# 캐시에 유지할 최대 문서 수 (오래된 것부터 제거)
+MAX_CACHED_DOCUMENTS = 32
+
+# 후보 검증 묶음 크기 - 처음엔 작게 시작해 두 배씩 키움 (상위 몇 건만 필요하면 첫 묶음에서 끝남)
+FIRST_CHUNK = 256
+MAX_CHUNK = 65536
+
+def _lower_preserving_offsets(text):
+    """오프셋이 원문과 일치하도록 소문자 변환
+
+    대부분의 문자는 lower() 후에도 길이가 같지만 'İ'처럼 길어지는 문자가 있으면
+    해당 문자만 원래대로 두어 오프셋이 어긋나지 않게 합니다.
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+def _codes(text):
+    """문자열 → 문자 코드 배열 (uint32, 배열 인덱스 = 문자 오프셋)"""
+    return np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+
+def _chunks(length):
+    """[0, length) 구간을 FIRST_CHUNK부터 두 배씩 커지는 (시작, 끝) 묶음으로"""
+    begin, size = 0, FIRST_CHUNK
+    while begin < length:
+        yield begin, min(begin + size, length)
+        begin += size
+        size = min(size * 2, MAX_CHUNK)
+
+class OccurrenceIndex:
+    """bigram 출현 위치 인덱스
+
+    모든 위치를 (앞 글자 << 32 | 뒷 글자) 키로 안정 정렬해 positions 한 배열에 두므로
+    bigram 하나의 위치는 positions의 오름차순 구간 하나입니다.
+    파이썬 dict + array를 위치마다 append 하던 방식보다 생성이 몇 배 빠르고 메모리도 작습니다.
+    """
+
+    def __init__(self, lowered):
+        self.codes = _codes(lowered)
+        keys = (self.codes[:-1].astype(np.uint64) << np.uint64(32)) | self.codes[1:]
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        heads = np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+        heads = np.concatenate(([0], heads)) if len(order) else heads
+        self.keys = sorted_keys[heads]
+        self.starts = np.append(heads, len(order))
+        self.positions = order.astype(np.uint32)
+
+    def positions_of(self, first, second):
+        """bigram (first, second 문자 코드)의 출현 위치 (오름차순, 없으면 None)"""
+        key = (first << 32) | second
+        i = int(np.searchsorted(self.keys, key))
+        if i == len(self.keys) or int(self.keys[i]) != key:
+            return None
+        return self.positions[self.starts[i]:self.starts[i + 1]]
+
+def build_occurrence_index(lowered):
+    """소문자 본문 → bigram 위치 인덱스 (OccurrenceIndex)"""
+    return OccurrenceIndex(lowered)
+
+def get_document(cache_key, text):
+    """캐시된 문서 인덱스 조회 (없으면 생성)"""
+    cached = _document_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    cached = (text, build_occurrence_index(_lower_preserving_offsets(text)))
+
+    if len(_document_cache) >= MAX_CACHED_DOCUMENTS:
+        _document_cache.pop(next(iter(_document_cache)))
+    _document_cache[cache_key] = cached
+    return cached
+
+def is_cached(cache_key):
+    """문서가 캐시되어 있는지 확인"""
+    return cache_key in _document_cache
+
+def _iter_offsets(index, needle):
+    """needle의 출현 오프셋을 오름차순으로 생성 (필요한 만큼만 검증)"""
+    if not needle:
+        return
+    target = _codes(needle)
+    codes = index.codes
+
+    if len(target) == 1:
+        # 한 글자는 본문 코드 배열을 앞에서부터 묶음 단위로 비교 (마지막 글자까지 포함)
+        for begin, end in _chunks(len(codes)):
+            yield from (np.flatnonzero(codes[begin:end] == target[0]) + begin).tolist()
+        return
+
+    # 가장 드문 bigram을 기준으로 후보 위치를 좁힘
+    best_shift = 0
+    best_positions = None
+    for shift in range(len(target) - 1):
+        positions = index.positions_of(int(target[shift]), int(target[shift + 1]))
+        if positions is None:
+            return
+        if best_positions is None or len(positions) < len(best_positions):
+            best_shift = shift
+            best_positions = positions
+
+    # 후보 묶음마다 나머지 글자를 배열 비교로 검증 (기준 bigram 두 글자는 이미 일치)
+    rest = [(k, int(code)) for k, code in enumerate(target) if k not in (best_shift, best_shift + 1)]
+    for begin, end in _chunks(len(best_positions)):
+        starts = best_positions[begin:end].astype(np.int64) - best_shift
+        starts = starts[(starts >= 0) & (starts + len(target) <= len(codes))]
+        matched = np.ones(len(starts), dtype=bool)
+        for k, code in rest:
+            matched &= codes[starts + k] == code
+        yield from starts[matched].tolist()
+
+def parse_find_query(query):
+    """검색어를 찾을 문자열 목록으로 변환
+
+    - "따옴표" 안의 내용은 하나의 구문으로 취급
+    - 나머지는 공백 단위로 각각 찾음
+    """
+    needles = []
+    parts = query.split('"')
+    for i, part in enumerate(parts):
+        if i % 2 == 1:
+            if part.strip():
+                needles.append(part.strip())
+        else:
+            needles.extend(part.split())
+    return needles
+
+def find_in_document(cache_key, text, query, context=100, max_matches=None):
+    """문서 내 모든 일치 위치와 문맥 반환
+
+    반환값: [{"term", "offset", "snippet"}, ...] (오프셋 순)
+    """
+    original, index = get_document(cache_key, text)
+
+    # 검색어별 오름차순 스트림을 병합 → 앞에서 max_matches개만 꺼내면 나머지 후보는 검증하지 않음
+    streams = [
+        zip(_iter_offsets(index, _lower_preserving_offsets(needle)), repeat(needle))
+        for needle in parse_find_query(query)
+    ]
+    found = heapq.merge(*streams)
+    if max_matches is not None:
+        found = islice(found, max_matches)
+
+    # 문맥 조각은 반환할 일치 위치에 대해서만 생성
+    matches = []
+    for offset, needle in found:
+        start = max(0, offset - context)
+        end = min(len(original), offset + len(needle) + context)
+        snippet = (
+            original[start:offset]
+            + "【" + original[offset:offset + len(needle)] + "】"
+            + original[offset + len(needle):end]
+        )
+        if start > 0:
+            snippet = "..." + snippet
+        if end < len(original):
+            snippet = snippet + "..."
+        matches.append({"term": needle, "offset": offset, "snippet": snippet})
+    return matches
+
+def main():
+    """간단한 성능 확인"""
+    from pdf_legal_search_fixed import extract_text_from_pdf
+
+    text = extract_text_from_pdf("stalker.pdf") or ""
+    text = text * max(1, 2_000_000 // max(len(text), 1))
+    print(f"📄 문서 길이: {len(text):,} 문자")
+
+    start = time.perf_counter()
+    get_document("demo", text)
+    print(f"🏗️  인덱스 생성: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    for query in ["스토킹", '"3년 이하의 징역"', "피해자 처벌", "법"]:
+        start = time.perf_counter()
+        matches = find_in_document("demo", text, query, max_matches=10)
+        elapsed_us = (time.perf_counter() - start) * 1_000_000
+        print(f"🔍 {query}: 상위 {len(matches)}건 ({elapsed_us:,.0f}µs)")
+
+if __name__ == "__main__":
+    main()
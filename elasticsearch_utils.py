@@ -1,22 +1,143 @@
-from elasticsearch import Elasticsearch
+from es_client import es
+from batch_analyze import analyze_texts
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import argparse
 import json
+import time
 
-# Elasticsearch 연결 설정
-es = Elasticsearch(
-    "http://localhost:9200",
-    basic_auth=("elastic", "OBIpKj46")
-)
+# 분석기 테스트용 문장
+TEST_TEXTS = [
+    "Python으로 배우는 머신러닝",
+    "Django 웹 개발",
+    "Elasticsearch 완벽 가이드"
+]
+
+# 스냅샷 비교 시 목록형(cat API) 결과를 항목별로 맞춰보기 위한 키
+SNAPSHOT_LIST_KEYS = {
+    "cat_indices": lambda row: row["index"],
+    "aliases": lambda row: f"{row['alias']} → {row['index']}",
+    "nodes": lambda row: row["name"],
+    "templates": lambda row: row["name"],
+}
 
 def print_section(title):
     print("\n" + "="*60)
     print(f"⚙️  {title}")
     print("="*60)
 
-def main():
+def inspection_calls(index_name="books", test_texts=TEST_TEXTS):
+    """클러스터 점검에 필요한 서로 독립적인 API 호출 목록 (이름 → 함수)"""
+    calls = {
+        "cluster_health": lambda: es.cluster.health(),
+        "cat_indices": lambda: es.cat.indices(format='json'),
+        "mapping": lambda: es.indices.get_mapping(index=index_name),
+        "settings": lambda: es.indices.get_settings(index=index_name),
+        "stats": lambda: es.indices.stats(index=index_name),
+        "termvectors": lambda: es.termvectors(
+            index=index_name,
+            id=1,
+            fields=['title', 'description'],
+            term_statistics=True,
+            field_statistics=True
+        ),
+        "aliases": lambda: es.cat.aliases(format='json'),
+        "nodes": lambda: es.cat.nodes(format='json'),
+        "templates": lambda: es.cat.templates(format='json'),
+    }
+    # 문장 목록 전체를 _analyze 요청 한 번으로 분석
+    calls["analyze"] = lambda: dict(zip(
+        test_texts,
+        (list(tokens) for tokens in analyze_texts(test_texts, {"analyzer": "standard", "index": index_name})[0])
+    ))
+    return calls
+
+def _timed_call(func):
+    start = time.perf_counter()
+    try:
+        result = func()
+        entry = {"result": getattr(result, "body", result)}
+    except Exception as e:
+        entry = {"error": str(e), "status": getattr(getattr(e, "meta", None), "status", None)}
+    entry["took_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return entry
+
+def take_snapshot(index_name="books", max_workers=8):
+    """점검 API를 스레드 풀에서 동시에 호출하여 하나의 JSON 리포트로 구성
+
+    전체 소요 시간은 호출 시간의 합이 아니라 가장 느린 호출 시간에 가깝습니다.
+    """
+    calls = inspection_calls(index_name)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {name: pool.submit(_timed_call, func) for name, func in calls.items()}
+        results = {name: future.result() for name, future in futures.items()}
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    slowest = max(results, key=lambda name: results[name]["took_ms"])
+    return {
+        "taken_at": datetime.now().isoformat(timespec="seconds"),
+        "index": index_name,
+        "elapsed_ms": round(elapsed_ms, 2),
+        "total_call_ms": round(sum(entry["took_ms"] for entry in results.values()), 2),
+        "slowest_call": slowest,
+        "calls": results
+    }
+
+def _normalize(name, value):
+    """목록형 결과를 키 기반 딕셔너리로 바꿔서 순서와 무관하게 비교"""
+    key_func = SNAPSHOT_LIST_KEYS.get(name)
+    if key_func and isinstance(value, list):
+        return {key_func(row): row for row in value}
+    return value
+
+def _diff_values(old, new, path, changes):
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in sorted(set(old) | set(new), key=str):
+            child = f"{path}.{key}"
+            if key not in old:
+                changes.append({"path": child, "change": "added", "new": new[key]})
+            elif key not in new:
+                changes.append({"path": child, "change": "removed", "old": old[key]})
+            else:
+                _diff_values(old[key], new[key], child, changes)
+    elif old != new:
+        changes.append({"path": path, "change": "changed", "old": old, "new": new})
+
+def diff_snapshots(old_snapshot, new_snapshot):
+    """두 스냅샷의 API 결과 차이 (추가 / 삭제 / 변경된 값 목록)"""
+    changes = []
+    old_calls = old_snapshot["calls"]
+    new_calls = new_snapshot["calls"]
+    for name in sorted(set(old_calls) | set(new_calls)):
+        old_entry = old_calls.get(name, {})
+        new_entry = new_calls.get(name, {})
+        if "error" in old_entry or "error" in new_entry:
+            if old_entry.get("error") != new_entry.get("error"):
+                changes.append({"path": name, "change": "error", "old": old_entry.get("error"), "new": new_entry.get("error")})
+            continue
+        _diff_values(
+            _normalize(name, old_entry.get("result")),
+            _normalize(name, new_entry.get("result")),
+            name,
+            changes
+        )
+    return changes
+
+def _result(snapshot, name):
+    """스냅샷에서 호출 결과 꺼내기 (실패한 호출이면 예외 메시지로 ValueError)"""
+    entry = snapshot["calls"][name]
+    if "error" in entry:
+        raise ValueError(entry["error"])
+    return entry["result"]
+
+def print_inspection(snapshot):
+    """스냅샷을 기존 점검 화면 형식으로 출력"""
     print_section("Elasticsearch 클러스터 정보")
-    
+
     # 1. 클러스터 상태 확인
-    health = es.cluster.health()
+    health = _result(snapshot, "cluster_health")
     print(f"클러스터 상태: {health['status']}")
     print(f"노드 수: {health['number_of_nodes']}")
     print(f"데이터 노드 수: {health['number_of_data_nodes']}")
@@ -24,12 +145,12 @@ def main():
     print(f"초기화 중 샤드: {health.get('initializing_shards', 0)}")
     print(f"재배치 중 샤드: {health.get('relocating_shards', 0)}")
     print(f"미할당 샤드: {health.get('unassigned_shards', 0)}")
-    
+
     # 2. 모든 인덱스 목록 확인
     print_section("인덱스 목록")
-    
+
     try:
-        indices = es.cat.indices(format='json')
+        indices = _result(snapshot, "cat_indices")
         print(f"총 {len(indices)}개의 인덱스 발견:")
         for idx in indices:
             print(f"  📁 {idx['index']}")
@@ -41,50 +162,46 @@ def main():
             print()
     except Exception as e:
         print(f"인덱스 목록 조회 실패: {e}")
-    
-    # 3. books 인덱스 상세 정보
-    print_section("books 인덱스 상세 정보")
-    
-    index_name = "books"
-    
-    if es.indices.exists(index=index_name):
+
+    # 3. 인덱스 상세 정보
+    index_name = snapshot["index"]
+    print_section(f"{index_name} 인덱스 상세 정보")
+
+    index_exists = snapshot["calls"]["mapping"].get("status") != 404
+
+    if index_exists:
         # 매핑 정보 확인
-        mapping = es.indices.get_mapping(index=index_name)
+        mapping = _result(snapshot, "mapping")
         print("📋 매핑 정보:")
-        print(json.dumps(mapping[index_name]['mappings'], indent=2, ensure_ascii=False))
-        
+        # index_name이 alias면 응답 키는 실제(버전) 인덱스 이름
+        print(json.dumps(next(iter(mapping.values()))['mappings'], indent=2, ensure_ascii=False))
+
         # 설정 정보 확인
-        settings = es.indices.get_settings(index=index_name)
+        settings = _result(snapshot, "settings")
         print("\n⚙️ 설정 정보:")
-        print(json.dumps(settings[index_name]['settings'], indent=2, ensure_ascii=False))
-        
+        print(json.dumps(next(iter(settings.values()))['settings'], indent=2, ensure_ascii=False))
+
         # 인덱스 통계
-        stats = es.indices.stats(index=index_name)
-        index_stats = stats['indices'][index_name]
+        stats = _result(snapshot, "stats")
+        index_stats = next(iter(stats['indices'].values()))
         print(f"\n📊 인덱스 통계:")
         print(f"  - 총 문서 수: {index_stats['total']['docs']['count']}")
         print(f"  - 삭제된 문서 수: {index_stats['total']['docs']['deleted']}")
         print(f"  - 저장 공간: {index_stats['total']['store']['size_in_bytes']} bytes")
         print(f"  - 인덱싱 작업: {index_stats['total']['indexing']['index_total']}")
         print(f"  - 검색 작업: {index_stats['total']['search']['query_total']}")
-        
+
     else:
         print(f"❌ '{index_name}' 인덱스가 존재하지 않습니다.")
-    
+
     # 4. 샘플 데이터 분석
     print_section("샘플 데이터 분석")
-    
-    if es.indices.exists(index=index_name):
+
+    if index_exists:
         # 텀 벡터 분석 (특정 문서의 분석 결과)
         try:
-            termvector = es.termvectors(
-                index=index_name,
-                id=1,
-                fields=['title', 'description'],
-                term_statistics=True,
-                field_statistics=True
-            )
-            
+            termvector = _result(snapshot, "termvectors")
+
             print("📝 문서 1번의 텀 벡터 분석:")
             if 'term_vectors' in termvector:
                 for field, terms in termvector['term_vectors'].items():
@@ -94,39 +211,23 @@ def main():
                             print(f"    - '{term}': 빈도수 {info['term_freq']}")
         except Exception as e:
             print(f"텀 벡터 분석 실패: {e}")
-    
+
     # 5. 분석기 테스트
     print_section("분석기 테스트")
-    
-    test_texts = [
-        "Python으로 배우는 머신러닝",
-        "Django 웹 개발",
-        "Elasticsearch 완벽 가이드"
-    ]
-    
-    for text in test_texts:
-        try:
-            # 표준 분석기로 분석
-            result = es.indices.analyze(
-                index=index_name,
-                body={
-                    "analyzer": "standard",
-                    "text": text
-                }
-            )
-            
-            tokens = [token['token'] for token in result['tokens']]
+
+    try:
+        for text, tokens in _result(snapshot, "analyze").items():
             print(f"📝 '{text}' 분석 결과:")
             print(f"   토큰: {tokens}")
-            
-        except Exception as e:
-            print(f"분석 실패: {e}")
-    
+
+    except Exception as e:
+        print(f"분석 실패: {e}")
+
     # 6. 인덱스 별칭 확인
     print_section("인덱스 별칭 확인")
-    
+
     try:
-        aliases = es.cat.aliases(format='json')
+        aliases = _result(snapshot, "aliases")
         if aliases:
             print("📎 설정된 별칭:")
             for alias in aliases:
@@ -135,12 +236,12 @@ def main():
             print("📎 설정된 별칭이 없습니다.")
     except Exception as e:
         print(f"별칭 조회 실패: {e}")
-    
+
     # 7. 노드 정보
     print_section("노드 정보")
-    
+
     try:
-        nodes = es.cat.nodes(format='json')
+        nodes = _result(snapshot, "nodes")
         print(f"📡 총 {len(nodes)}개의 노드:")
         for node in nodes:
             print(f"  - {node['name']}")
@@ -152,12 +253,12 @@ def main():
             print()
     except Exception as e:
         print(f"노드 정보 조회 실패: {e}")
-    
+
     # 8. 인덱스 템플릿 확인
     print_section("인덱스 템플릿 확인")
-    
+
     try:
-        templates = es.cat.templates(format='json')
+        templates = _result(snapshot, "templates")
         if templates:
             print("📄 인덱스 템플릿:")
             for template in templates:
@@ -166,8 +267,66 @@ def main():
             print("📄 인덱스 템플릿이 없습니다.")
     except Exception as e:
         print(f"템플릿 조회 실패: {e}")
-    
+
+    print(f"\n⏱️  점검 시간: {snapshot['elapsed_ms']:.0f}ms "
+          f"(호출 시간 합계 {snapshot['total_call_ms']:.0f}ms, 가장 느린 호출: {snapshot['slowest_call']})")
+
+def print_diff(changes, limit=200):
+    """스냅샷 차이 출력"""
+    if not changes:
+        print("✅ 차이가 없습니다.")
+        return
+
+    print(f"🔀 {len(changes)}개 항목 변경:")
+    for change in changes[:limit]:
+        if change["change"] == "added":
+            print(f"  ➕ {change['path']}: {json.dumps(change['new'], ensure_ascii=False)}")
+        elif change["change"] == "removed":
+            print(f"  ➖ {change['path']}: {json.dumps(change['old'], ensure_ascii=False)}")
+        else:
+            print(f"  ✏️  {change['path']}: {json.dumps(change['old'], ensure_ascii=False)} → "
+                  f"{json.dumps(change['new'], ensure_ascii=False)}")
+    if len(changes) > limit:
+        print(f"  ... 외 {len(changes) - limit}개")
+
+def main():
+    parser = argparse.ArgumentParser(description="클러스터 점검 / 스냅샷")
+    subparsers = parser.add_subparsers(dest="command")
+
+    snapshot_parser = subparsers.add_parser("snapshot", help="점검 결과를 JSON 스냅샷으로 저장")
+    snapshot_parser.add_argument("--output", help="저장할 파일 (없으면 stdout)")
+    snapshot_parser.add_argument("--index", default="books")
+    snapshot_parser.add_argument("--workers", type=int, default=8)
+
+    diff_parser = subparsers.add_parser("diff", help="두 스냅샷 비교")
+    diff_parser.add_argument("old")
+    diff_parser.add_argument("new")
+    diff_parser.add_argument("--limit", type=int, default=200)
+
+    args = parser.parse_args()
+
+    if args.command == "snapshot":
+        snapshot = take_snapshot(args.index, args.workers)
+        report = json.dumps(snapshot, indent=2, ensure_ascii=False)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(report)
+            print(f"💾 {args.output} 저장 완료 ({snapshot['elapsed_ms']:.0f}ms, 호출 {len(snapshot['calls'])}개)")
+        else:
+            print(report)
+        return
+
+    if args.command == "diff":
+        with open(args.old, encoding="utf-8") as f:
+            old_snapshot = json.load(f)
+        with open(args.new, encoding="utf-8") as f:
+            new_snapshot = json.load(f)
+        print_section(f"스냅샷 비교 ({old_snapshot['taken_at']} → {new_snapshot['taken_at']})")
+        print_diff(diff_snapshots(old_snapshot, new_snapshot), args.limit)
+        return
+
+    print_inspection(take_snapshot())
     print_section("✅ 모든 유틸리티 확인 완료!")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
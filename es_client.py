@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+공용 Elasticsearch 클라이언트
+- 모든 스크립트가 이 모듈의 es를 사용 (연결 설정 한 곳에서 관리)
+  비동기 코드는 create_async_client()로 같은 계측을 거치는 AsyncElasticsearch 사용
+- 모든 API 호출(search, msearch, bulk, index, get, analyze ...)의 지표 수집
+  · 클라이언트 지연시간 / 서버 took / 요청·응답 바이트 / 에러 수
+  · 고정 버킷 히스토그램 (호출당 bisect 한 번 + 정수 덧셈)
+- Prometheus 텍스트 포맷 내보내기, 종료 시 덤프 (ES_METRICS_FILE 환경 변수)
+- ES_TRACE 설정 시 요청마다 직렬화 / 전송 / JSON 디코딩 스팬 기록 (tracing.py)
+- 기준 시간(ES_SLOW_QUERY_MS)을 넘은 검색 요청 기록 (slow_queries.py)
+- 작업 종류별 gzip 요청 압축 + gzip 응답 요청 (ES_COMPRESSION="bulk=6,document=6" 또는 set_compression)
+"""
+
+from elasticsearch import AsyncElasticsearch, Elasticsearch
+from elasticsearch.serializer import JsonSerializer
+from elastic_transport import AiohttpHttpNode, Urllib3HttpNode
+from elastic_transport.client_utils import DEFAULT
+from bisect import bisect_left
+from slow_queries import record_if_slow
+from tracing import get_tracer
+import atexit
+import gzip
+import os
+import threading
+import time
+
+ES_URL = "http://localhost:9200"
+ES_AUTH = ("elastic", "OBIpKj46")
+
+# 히스토그램 버킷 상한 (초) - Prometheus 기본 버킷과 비슷하게 1ms ~ 10s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 바이트 히스토그램 버킷 상한 - 1KB ~ 100MB
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 104857600)
+
+# 작업별 지표: operation → {"client": 히스토그램, "took": ..., "overhead": ..., "request_bytes": ..., ...}
+_metrics = {}
+_errors = {}  # (operation, status) → count
+_metrics_lock = threading.Lock()
+
+# 압축 설정 단위 (작업 종류 → endpoint_id)
+OPERATION_CLASSES = {
+    "bulk": {"bulk"},
+    "document": {"index", "create", "update"},  # 단건 문서 - base64 PDF 등 큰 본문
+    "search": {"search", "msearch", "count", "scroll", "open_point_in_time", "mtermvectors"},
+}
+
+# 이보다 작은 본문은 압축해도 이득이 없어 그대로 전송
+COMPRESS_MIN_BYTES = 1024
+
+# 클라이언트 → GzipHttpNode로 압축 설정을 넘기는 내부 헤더 (전송 전에 제거됨)
+COMPRESS_HEADER = "x-es-study-compress"
+
+# 작업 종류별 압축 지표: 종류 → {"requests", "raw_bytes", "wire_bytes", "seconds"}
+_compression = {}
+
+tracer = get_tracer(__name__)
+
+def _new_histogram(buckets):
+    return {"buckets": buckets, "counts": [0] * (len(buckets) + 1), "sum": 0.0, "count": 0}
+
+def _observe(histogram, value):
+    histogram["counts"][bisect_left(histogram["buckets"], value)] += 1
+    histogram["sum"] += value
+    histogram["count"] += 1
+
+def _operation_metrics(operation):
+    metrics = _metrics.get(operation)
+    if metrics is None:
+        metrics = _metrics[operation] = {
+            "client_seconds": _new_histogram(LATENCY_BUCKETS),
+            "took_seconds": _new_histogram(LATENCY_BUCKETS),
+            "overhead_seconds": _new_histogram(LATENCY_BUCKETS),
+            "request_bytes": _new_histogram(SIZE_BUCKETS),
+            "response_bytes": _new_histogram(SIZE_BUCKETS),
+        }
+    return metrics
+
+def record_request(operation, client_seconds, took_ms=None, request_bytes=0, response_bytes=None, status=None):
+    """한 번의 API 호출 결과 기록"""
+    with _metrics_lock:
+        metrics = _operation_metrics(operation)
+        _observe(metrics["client_seconds"], client_seconds)
+        _observe(metrics["request_bytes"], request_bytes)
+        if response_bytes is not None:
+            _observe(metrics["response_bytes"], response_bytes)
+        if took_ms is not None:
+            took_seconds = took_ms / 1000
+            _observe(metrics["took_seconds"], took_seconds)
+            # 네트워크 + 직렬화 + 큐 대기 등 서버 밖에서 쓴 시간
+            _observe(metrics["overhead_seconds"], max(0.0, client_seconds - took_seconds))
+        if status is not None:
+            _errors[(operation, status)] = _errors.get((operation, status), 0) + 1
+
+def reset_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+        _errors.clear()
+        _compression.clear()
+
+def parse_compression(spec):
+    """"bulk=6,document=1" → {"bulk": 6, "document": 1} (0이면 압축 안 함)"""
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = item.partition("=")
+        if name not in OPERATION_CLASSES:
+            raise ValueError(f"알 수 없는 작업 종류: {name} (가능: {', '.join(OPERATION_CLASSES)})")
+        levels[name] = int(level or 6)
+    return levels
+
+_compression_levels = parse_compression(os.environ.get("ES_COMPRESSION", ""))
+
+def set_compression(levels):
+    """작업 종류별 gzip 레벨 설정 (모든 클라이언트 공통, {} = 끄기)"""
+    global _compression_levels
+    _compression_levels = {name: level for name, level in parse_compression(
+        ",".join(f"{name}={level}" for name, level in levels.items())).items() if level}
+
+def operation_class(operation):
+    for name, operations in OPERATION_CLASSES.items():
+        if operation in operations:
+            return name
+    return None
+
+def compression_stats():
+    """작업 종류별 압축 전/후 바이트, 압축에 쓴 시간"""
+    with _metrics_lock:
+        return {name: dict(stats) for name, stats in _compression.items()}
+
+def _record_compression(name, raw_bytes, wire_bytes, seconds):
+    with _metrics_lock:
+        stats = _compression.setdefault(name, {"requests": 0, "raw_bytes": 0, "wire_bytes": 0, "seconds": 0.0})
+        stats["requests"] += 1
+        stats["raw_bytes"] += raw_bytes
+        stats["wire_bytes"] += wire_bytes
+        stats["seconds"] += seconds
+
+def _span_attributes(method, path, operation):
+    return {
+        "db.system": "elasticsearch",
+        "db.operation": operation,
+        "http.request.method": method,
+        "url.path": path
+    }
+
+def _prepare_request(transport, endpoint_id, headers, body):
+    """본문 직렬화 + 압축 헤더 → (body, headers, request_bytes)"""
+    # 본문을 미리 직렬화해 크기를 잰다 (transport는 bytes를 그대로 전송하므로 두 번 직렬화하지 않음)
+    request_bytes = 0
+    if body is not None:
+        with tracer.start_as_current_span("elasticsearch.serialize"):
+            mimetype = (headers or {}).get("content-type")
+            body = transport.serializers.dumps(body, mimetype=mimetype)
+        request_bytes = len(body)
+
+    # 압축이 켜진 작업 종류면 gzip 응답을 요청하고, 본문 압축은 노드(Gzip*HttpNode)에 맡김
+    # (응답은 HTTP 라이브러리가 자동으로 풀고, 지표의 response_bytes는 압축된 전송 크기)
+    compress_class = operation_class(endpoint_id)
+    level = _compression_levels.get(compress_class, 0)
+    if level:
+        headers = {**(headers or {}), "accept-encoding": "gzip", COMPRESS_HEADER: f"{compress_class}={level}"}
+    return body, headers, request_bytes
+
+def _record_failure(error, operation, start, request_bytes, path_parts, params, original_body):
+    meta = getattr(error, "meta", None)
+    status = getattr(meta, "status", None) or type(error).__name__
+    client_seconds = time.perf_counter() - start
+    record_request(operation, client_seconds, request_bytes=request_bytes, status=status)
+    # 타임아웃 / 오래 기다리다 실패한 검색이 가장 느린 쿼리이므로 실패해도 느린 쿼리로 기록
+    record_if_slow(
+        operation, path_parts, params, original_body, None,
+        client_seconds * 1000, None, None, status=status
+    )
+
+def _record_response(response, span, operation, start, request_bytes, path_parts, params, original_body):
+    client_seconds = time.perf_counter() - start
+    took_ms = None
+    if isinstance(response.body, dict):
+        took_ms = response.body.get("took")
+    content_length = response.meta.headers.get("content-length")
+    response_bytes = int(content_length) if content_length else None
+    record_request(
+        operation, client_seconds, took_ms=took_ms, request_bytes=request_bytes,
+        response_bytes=response_bytes
+    )
+    record_if_slow(
+        operation, path_parts, params, original_body, response.body,
+        client_seconds * 1000, took_ms, response_bytes
+    )
+    if span.is_recording():
+        span.set_attributes({
+            "http.response.status_code": response.meta.status,
+            "es.took_ms": took_ms,
+            "es.request_bytes": request_bytes,
+            "es.response_bytes": response_bytes
+        })
+
+class InstrumentedElasticsearch(Elasticsearch):
+    """모든 요청의 지연시간/크기/에러를 기록하는 클라이언트
+
+    es.search(), es.indices.analyze() 등 모든 API는 perform_request를 거치므로
+    여기 한 곳만 감싸면 됩니다. options()로 만든 복사본도 같은 클래스라 그대로 측정됩니다.
+    """
+
+    def perform_request(self, method, path, *, params=None, headers=None, body=None,
+                        endpoint_id=None, path_parts=None):
+        operation = endpoint_id or f"{method} {path}"
+
+        with tracer.start_as_current_span(f"elasticsearch.{operation}",
+                                          attributes=_span_attributes(method, path, operation)) as span:
+            original_body = body
+            body, headers, request_bytes = _prepare_request(self.transport, endpoint_id, headers, body)
+
+            start = time.perf_counter()
+            try:
+                with tracer.start_as_current_span("elasticsearch.transport"):
+                    response = super().perform_request(
+                        method, path, params=params, headers=headers, body=body,
+                        endpoint_id=endpoint_id, path_parts=path_parts
+                    )
+            except Exception as e:
+                _record_failure(e, operation, start, request_bytes, path_parts, params, original_body)
+                raise
+
+            _record_response(response, span, operation, start, request_bytes, path_parts, params, original_body)
+            return response
+
+class InstrumentedAsyncElasticsearch(AsyncElasticsearch):
+    """InstrumentedElasticsearch의 비동기판 - 같은 지표 / 트레이싱 / 느린 쿼리 기록을 공유"""
+
+    async def perform_request(self, method, path, *, params=None, headers=None, body=None,
+                              endpoint_id=None, path_parts=None):
+        operation = endpoint_id or f"{method} {path}"
+
+        with tracer.start_as_current_span(f"elasticsearch.{operation}",
+                                          attributes=_span_attributes(method, path, operation)) as span:
+            original_body = body
+            body, headers, request_bytes = _prepare_request(self.transport, endpoint_id, headers, body)
+
+            start = time.perf_counter()
+            try:
+                with tracer.start_as_current_span("elasticsearch.transport"):
+                    response = await super().perform_request(
+                        method, path, params=params, headers=headers, body=body,
+                        endpoint_id=endpoint_id, path_parts=path_parts
+                    )
+            except Exception as e:
+                _record_failure(e, operation, start, request_bytes, path_parts, params, original_body)
+                raise
+
+            _record_response(response, span, operation, start, request_bytes, path_parts, params, original_body)
+            return response
+
+def _compress_body(body, headers):
+    """압축 헤더가 붙은 요청이면 본문을 지정 레벨로 gzip 압축 → (body, headers)"""
+    setting = headers.get(COMPRESS_HEADER) if headers else None
+    if not setting:
+        return body, headers
+    # 재시도 때 같은 headers를 다시 쓰므로 복사본에서 제거
+    headers = headers.copy()
+    del headers[COMPRESS_HEADER]
+    if body and len(body) >= COMPRESS_MIN_BYTES:
+        compress_class, _, level = setting.partition("=")
+        with tracer.start_as_current_span("elasticsearch.compress", attributes={"es.compress_level": int(level)}):
+            start = time.perf_counter()
+            raw_bytes = len(body)
+            body = gzip.compress(body, compresslevel=int(level), mtime=0)
+            headers["content-encoding"] = "gzip"
+        _record_compression(compress_class, raw_bytes, len(body), time.perf_counter() - start)
+    return body, headers
+
+class GzipHttpNode(Urllib3HttpNode):
+    """압축 헤더가 붙은 요청 본문을 지정 레벨로 gzip 압축해서 보내는 노드
+
+    직렬화기는 NDJSON 본문 끝에 줄바꿈을 붙이므로 압축은 직렬화가 끝난 뒤
+    (transport가 노드에 bytes를 넘길 때) 해야 합니다.
+    """
+
+    def perform_request(self, method, target, body=None, headers=None, request_timeout=DEFAULT):
+        body, headers = _compress_body(body, headers)
+        return super().perform_request(method, target, body=body, headers=headers, request_timeout=request_timeout)
+
+class GzipAiohttpHttpNode(AiohttpHttpNode):
+    """GzipHttpNode의 비동기판 (aiohttp 필요)"""
+
+    async def perform_request(self, method, target, body=None, headers=None, request_timeout=DEFAULT):
+        body, headers = _compress_body(body, headers)
+        return await super().perform_request(method, target, body=body, headers=headers, request_timeout=request_timeout)
+
+class TracedJsonSerializer(JsonSerializer):
+    """응답 JSON 디코딩을 별도 스팬으로 기록하는 직렬화기 (전송 스팬 안에 중첩됨)"""
+
+    def loads(self, data):
+        with tracer.start_as_current_span("elasticsearch.json_decode", attributes={"es.response_bytes": len(data)}):
+            return super().loads(data)
+
+def create_client(url=ES_URL, **kwargs):
+    """공용 설정으로 계측 클라이언트 생성 (url을 바꾸면 인증 없이 접속)"""
+    if url == ES_URL:
+        kwargs.setdefault("basic_auth", ES_AUTH)
+    kwargs.setdefault("serializers", {"application/json": TracedJsonSerializer()})
+    kwargs.setdefault("node_class", GzipHttpNode)
+    return InstrumentedElasticsearch(url, **kwargs)
+
+def create_async_client(url=ES_URL, **kwargs):
+    """공용 설정으로 비동기 계측 클라이언트 생성 (aiohttp가 없으면 ValueError)"""
+    if url == ES_URL:
+        kwargs.setdefault("basic_auth", ES_AUTH)
+    kwargs.setdefault("serializers", {"application/json": TracedJsonSerializer()})
+    kwargs.setdefault("node_class", GzipAiohttpHttpNode)
+    return InstrumentedAsyncElasticsearch(url, **kwargs)
+
+def _histogram_lines(name, operation, histogram):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram["buckets"], histogram["counts"]):
+        cumulative += count
+        lines.append(f'{name}_bucket{{operation="{operation}",le="{bound}"}} {cumulative}')
+    cumulative += histogram["counts"][-1]
+    lines.append(f'{name}_bucket{{operation="{operation}",le="+Inf"}} {cumulative}')
+    lines.append(f'{name}_sum{{operation="{operation}"}} {histogram["sum"]}')
+    lines.append(f'{name}_count{{operation="{operation}"}} {histogram["count"]}')
+    return lines
+
+METRIC_HELP = {
+    "client_seconds": "Client-observed request latency",
+    "took_seconds": "Server-reported took",
+    "overhead_seconds": "Client latency minus server took (network, serialization, queueing)",
+    "request_bytes": "Serialized request body size",
+    "response_bytes": "Response body size (Content-Length)",
+}
+
+def export_prometheus():
+    """수집한 지표를 Prometheus 텍스트 포맷으로 반환"""
+    with _metrics_lock:
+        lines = []
+        for key, help_text in METRIC_HELP.items():
+            name = f"es_client_{key}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for operation, metrics in sorted(_metrics.items()):
+                if metrics[key]["count"]:
+                    lines.extend(_histogram_lines(name, operation, metrics[key]))
+
+        lines.append("# HELP es_client_errors_total Failed requests by status")
+        lines.append("# TYPE es_client_errors_total counter")
+        for (operation, status), count in sorted(_errors.items(), key=str):
+            lines.append(f'es_client_errors_total{{operation="{operation}",status="{status}"}} {count}')
+
+        for key, help_text in (("raw_bytes", "Request body bytes before gzip"),
+                               ("wire_bytes", "Request body bytes after gzip"),
+                               ("seconds", "Time spent compressing request bodies")):
+            name = f"es_client_compression_{key}_total"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for operation_class_name, stats in sorted(_compression.items()):
+                lines.append(f'{name}{{class="{operation_class_name}"}} {stats[key]}')
+    return "\n".join(lines) + "\n"
+
+def print_metrics_summary():
+    """작업별 호출 수 / 평균 지연시간 / 평균 took 요약 출력"""
+    with _metrics_lock:
+        print("\n📈 Elasticsearch 호출 지표")
+        for operation, metrics in sorted(_metrics.items()):
+            client = metrics["client_seconds"]
+            took = metrics["took_seconds"]
+            line = f"   {operation}: {client['count']}회, 평균 {client['sum'] / client['count'] * 1000:.1f}ms"
+            if took["count"]:
+                line += f" (서버 took 평균 {took['sum'] / took['count'] * 1000:.1f}ms)"
+            print(line)
+        for (operation, status), count in sorted(_errors.items(), key=str):
+            print(f"   ❌ {operation} [{status}]: {count}회")
+        for name, stats in sorted(_compression.items()):
+            print(f"   🗜️  {name} 압축: {stats['raw_bytes']:,} → {stats['wire_bytes']:,} bytes "
+                  f"({stats['wire_bytes'] / stats['raw_bytes']:.0%}), {stats['seconds'] * 1000:.0f}ms")
+
+def dump_metrics(path):
+    """Prometheus 텍스트 포맷으로 파일 저장"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(export_prometheus())
+
+def _dump_metrics_at_exit():
+    path = os.environ.get("ES_METRICS_FILE")
+    if path and _metrics:
+        dump_metrics(path)
+
+atexit.register(_dump_metrics_at_exit)
+
+# Elasticsearch 연결 설정 (모든 스크립트 공용)
+es = create_client()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+긴 법령 문서 하이라이트 성능 비교
+- unified (오프셋 없음): 히트마다 본문 재분석
+- unified + index_options: offsets: 포스팅에 저장된 오프셋 사용
+- fvh + term_vector: with_positions_offsets: 텀 벡터 오프셋 사용
+"""
+
+from es_client import es
+import time
+
+LEGAL_PARAGRAPHS = [
+    "제1조(목적) 이 법은 스토킹범죄를 예방하고 피해자를 보호하며, 스토킹범죄에 대한 처벌을 규정함으로써 국민의 자유와 안전을 보장함을 목적으로 한다.",
+    "제2조(정의) \"스토킹행위\"란 상대방의 의사에 반하여 지속적 또는 반복적으로 상대방에게 불안감 또는 공포심을 일으키는 행위를 말한다.",
+    "형법 제283조(협박) 사람을 협박한 자는 3년 이하의 징역, 500만원 이하의 벌금, 구류 또는 과료에 처한다.",
+    "피해자 보호 조항: 피해자의 신변보호와 2차 피해 방지를 위한 특별한 조치를 취해야 한다.",
+    "처벌 규정: 스토킹 행위를 한 자는 3년 이하의 징역 또는 3천만원 이하의 벌금에 처한다.",
+]
+
+# 비교 대상: (인덱스 이름, content 매핑, 하이라이터 타입)
+VARIANTS = [
+    ("hl-bench-unified", {"type": "text"}, "unified"),
+    ("hl-bench-offsets", {"type": "text", "index_options": "offsets"}, "unified"),
+    ("hl-bench-fvh", {"type": "text", "term_vector": "with_positions_offsets"}, "fvh"),
+]
+
+def print_section(title):
+    print("\n" + "="*60)
+    print(f"🖍️  {title}")
+    print("="*60)
+
+def generate_large_document(size_mb=5):
+    """size_mb 크기 이상의 법령 텍스트 생성"""
+    target = size_mb * 1024 * 1024
+    parts = []
+    length = 0
+    article = 0
+    while length < target:
+        paragraph = LEGAL_PARAGRAPHS[article % len(LEGAL_PARAGRAPHS)]
+        line = f"[{article}] {paragraph}\n"
+        parts.append(line)
+        length += len(line.encode("utf-8"))
+        article += 1
+    return "".join(parts)
+
+def setup_index(index_name, content_mapping, content, copies):
+    """벤치마크용 인덱스 생성 및 문서 인덱싱"""
+    if es.indices.exists(index=index_name):
+        es.indices.delete(index=index_name)
+
+    es.indices.create(
+        index=index_name,
+        settings={
+            "number_of_shards": 1,
+            "number_of_replicas": 0,
+            # 오프셋이 없는 unified 하이라이터도 문서 끝까지 분석하도록 상한을 문서 길이로 설정
+            "highlight.max_analyzed_offset": len(content) + 1
+        },
+        mappings={"properties": {"content": content_mapping}}
+    )
+
+    for i in range(copies):
+        es.index(index=index_name, id=str(i), document={"content": content})
+    es.indices.refresh(index=index_name)
+
+    stats = es.indices.stats(index=index_name, metric="store")
+    return stats["indices"][index_name]["total"]["store"]["size_in_bytes"]
+
+def run_highlight_queries(index_name, highlighter, queries, repeat):
+    """하이라이트 포함 검색을 반복 실행하여 평균 시간 측정"""
+    results = {}
+    for query in queries:
+        search_body = {
+            "query": {"match_phrase": {"content": query}},
+            "highlight": {
+                "fields": {
+                    "content": {
+                        "type": highlighter,
+                        "fragment_size": 200,
+                        "number_of_fragments": 5
+                    }
+                }
+            },
+            "_source": False
+        }
+        took_total = 0
+        client_total = 0.0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = es.search(index=index_name, body=search_body, request_cache=False)
+            client_total += time.perf_counter() - start
+            took_total += result["took"]
+        results[query] = {
+            "avg_took_ms": took_total / repeat,
+            "avg_client_ms": client_total * 1000 / repeat
+        }
+    return results
+
+def main(size_mb=5, copies=3, repeat=10):
+    print_section(f"긴 문서 하이라이트 벤치마크 ({size_mb}MB x {copies}개)")
+
+    if not es.ping():
+        print("❌ Elasticsearch 연결 실패")
+        return
+
+    content = generate_large_document(size_mb)
+    print(f"📄 생성된 문서 길이: {len(content):,} 문자")
+
+    queries = ["스토킹범죄", "3년 이하의 징역", "피해자"]
+
+    for index_name, content_mapping, highlighter in VARIANTS:
+        store_size = setup_index(index_name, content_mapping, content, copies)
+        results = run_highlight_queries(index_name, highlighter, queries, repeat)
+
+        print(f"\n🔧 {index_name} ({highlighter})")
+        print(f"   💾 인덱스 크기: {store_size:,} bytes")
+        for query, info in results.items():
+            print(f"   🔍 '{query}': took {info['avg_took_ms']:.1f}ms / 클라이언트 {info['avg_client_ms']:.1f}ms")
+
+        es.indices.delete(index=index_name)
+
+    print_section("✅ 하이라이트 벤치마크 완료!")
+
+if __name__ == "__main__":
+    main()
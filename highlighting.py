@@ -0,0 +1,30 @@
+"""
+법령 검색 공용 하이라이트 설정
+- pdf_legal_search / pdf_legal_search_fixed / pdf_legal_search_v2가 함께 사용
+"""
+
+# 쿼리별 하이라이트 분석 상한 (문자 수) - 이보다 긴 본문은 앞부분만 분석해 에러 대신 부분 하이라이트
+# 인덱스 설정 index.highlight.max_analyzed_offset(기본값도 1,000,000)은 그대로 두고,
+# 너무 긴 필드 에러를 막는 것은 요청의 max_analyzed_offset 쪽입니다 (인덱스 값보다 크게 주면 인덱스 값이 우선)
+MAX_ANALYZED_OFFSET = 1000000
+
+def build_highlight(field, number_of_fragments=5, require_field_match=True):
+    """오프셋 기반 하이라이트 설정
+
+    기본 하이라이터는 히트마다 긴 법령 본문 전체를 다시 분석합니다.
+    term_vector(with_positions_offsets)에 저장된 오프셋을 쓰는 fvh 하이라이터는
+    재분석 없이 조각을 잘라내므로 문서 길이에 영향을 거의 받지 않습니다.
+    """
+    return {
+        "fields": {
+            field: {
+                "type": "fvh",
+                "fragment_size": 200,
+                "number_of_fragments": number_of_fragments,
+                "pre_tags": ["<mark>"],
+                "post_tags": ["</mark>"]
+            }
+        },
+        "require_field_match": require_field_match,
+        "max_analyzed_offset": MAX_ANALYZED_OFFSET
+    }
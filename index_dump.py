@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+인덱스 덤프 / 복원 도구
+- export: 인덱스 내용(또는 sample_data로 생성한 데이터셋)을 bulk 형식 NDJSON으로 저장
+  (.zst → zstd, .gz → gzip, 그 외 → 압축 없음) + 설정/매핑은 <파일>.meta.json에 따로 저장
+- import: 파일을 mmap으로 열어 조금씩 압축을 풀면서 문서 경계에서 잘라 그대로 _bulk 전송
+  (줄을 dict로 파싱하지 않음 - 액션 줄에 _index가 없어서 /{index}/_bulk로 어느 인덱스에나 복원 가능)
+- 전송은 parallel_bulk.send_bodies의 스레드 풀 → 압축 해제와 전송이 겹쳐서 진행
+  (429 / 타임아웃은 재시도, 영구 실패는 bulk_retry의 dead-letter 파일로)
+
+zstd는 zstandard 패키지가 있을 때만 사용 가능 (pip install zstandard)
+"""
+
+from es_client import ES_URL, create_client, es
+from elasticsearch.helpers import scan
+import argparse
+import gzip
+import json
+import mmap
+import os
+import time
+import zlib
+
+import numpy as np
+
+from index_versions import IncompleteLoadError, build_version, ensure_complete
+from parallel_bulk import DOCS_PER_REQUEST, bulk_load_settings, send_bodies
+from sample_data import DEFAULT_END_DATE, END_DATE_HELP, iter_ndjson_blocks, parse_end_date
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 압축 해제할 때 한 번에 mmap에서 넘기는 크기
+READ_CHUNK_BYTES = 1024 * 1024
+
+# 복원할 때 다시 만들 필요 없는 (인덱스 생성 시 ES가 정하는) 설정
+GENERATED_SETTINGS = ("uuid", "creation_date", "provided_name", "version", "routing", "resize", "history_uuid")
+
+DEFAULT_LEVELS = {"zstd": 3, "gzip": 3}
+
+def print_section(title):
+    print("\n" + "="*60)
+    print(f"💾 {title}")
+    print("="*60)
+
+def detect_compression(path):
+    if path.endswith(".zst"):
+        return "zstd"
+    if path.endswith(".gz"):
+        return "gzip"
+    return "none"
+
+def _require_zstd():
+    if zstandard is None:
+        raise ImportError("zstd 압축은 zstandard 패키지가 필요합니다: pip install zstandard (또는 .gz 사용)")
+
+def open_writer(path, level=None):
+    """확장자에 맞는 압축 스트림 (쓰기)"""
+    compression = detect_compression(path)
+    if compression == "zstd":
+        _require_zstd()
+        compressor = zstandard.ZstdCompressor(level=level or DEFAULT_LEVELS["zstd"], threads=-1)
+        return compressor.stream_writer(open(path, "wb"), closefd=True)
+    if compression == "gzip":
+        return gzip.open(path, "wb", compresslevel=level or DEFAULT_LEVELS["gzip"])
+    return open(path, "wb")
+
+def iter_decompressed(path, chunk_bytes=READ_CHUNK_BYTES):
+    """파일을 mmap으로 열고 chunk_bytes씩 압축을 풀어 bytes 조각 스트림으로
+
+    파일 전체를 읽어 두지 않으므로 덤프 크기와 상관없이 메모리는 조각 몇 개 분량만 사용합니다.
+    """
+    compression = detect_compression(path)
+    if compression == "zstd":
+        _require_zstd()
+
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if compression == "none":
+                for start in range(0, len(mapped), chunk_bytes):
+                    yield mapped[start:start + chunk_bytes]
+                return
+
+            decompressor = _new_decompressor(compression)
+            for start in range(0, len(mapped), chunk_bytes):
+                data = mapped[start:start + chunk_bytes]
+                while data:
+                    yield decompressor.decompress(data)
+                    # gzip / zstd 파일은 여러 프레임(멤버)이 이어 붙어 있을 수 있음
+                    if not decompressor.eof:
+                        break
+                    data = decompressor.unused_data
+                    decompressor = _new_decompressor(compression)
+
+def _new_decompressor(compression):
+    if compression == "zstd":
+        return zstandard.ZstdDecompressor().decompressobj()
+    return zlib.decompressobj(wbits=31)
+
+def iter_bulk_bodies(chunks, docs_per_request=DOCS_PER_REQUEST, lines_per_doc=2):
+    """압축 해제된 조각 스트림을 문서 경계에서 docs_per_request개씩 잘라 → (요청 본문, 문서 수)
+
+    줄바꿈 위치만 numpy로 찾고 내용은 파싱하지 않습니다.
+    모든 액션이 index/create(액션 줄 + 문서 줄)라고 가정합니다.
+    """
+    pending = b""
+    pending_docs = []  # pending 안의 문서 끝 위치
+    scanned = 0        # pending에서 줄바꿈을 찾은 위치
+    line_parity = 0    # 마지막 문서 끝 이후 지나온 줄 수
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        pending += chunk
+        newlines = np.flatnonzero(np.frombuffer(pending, dtype=np.uint8, offset=scanned) == ord("\n")) + scanned + 1
+        scanned = len(pending)
+        first = (lines_per_doc - 1 - line_parity) % lines_per_doc
+        pending_docs.extend(newlines[first::lines_per_doc].tolist())
+        line_parity = (line_parity + len(newlines)) % lines_per_doc
+
+        start = 0
+        while len(pending_docs) >= docs_per_request:
+            end = pending_docs[docs_per_request - 1]
+            yield pending[start:end], docs_per_request
+            del pending_docs[:docs_per_request]
+            start = end
+        if start:
+            pending = pending[start:]
+            pending_docs = [end - start for end in pending_docs]
+            scanned -= start
+
+    end = pending_docs[-1] if pending_docs else 0
+    if pending_docs:
+        yield pending[:end], len(pending_docs)
+    if pending[end:].strip():
+        raise ValueError("파일 끝이 문서 경계가 아닙니다 (잘린 파일이거나 액션 줄만 있는 요청이 섞여 있음)")
+
+def index_metadata(client, index_name):
+    """복원용 설정 / 매핑 (ES가 생성 시 정하는 설정은 제외)"""
+    # index_name이 alias면 응답 키는 실제(버전) 인덱스 이름
+    settings = next(iter(client.indices.get_settings(index=index_name).values()))["settings"]["index"]
+    mappings = next(iter(client.indices.get_mapping(index=index_name).values()))["mappings"]
+    return {
+        "index": index_name,
+        "settings": {"index": {key: value for key, value in settings.items() if key not in GENERATED_SETTINGS}},
+        "mappings": mappings
+    }
+
+def _write_meta(path, meta):
+    with open(f"{path}.meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+def load_meta(path):
+    meta_path = f"{path}.meta.json"
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, encoding="utf-8") as f:
+        return json.load(f)
+
+def export_index(client, index_name, path, level=None, batch_size=2000):
+    """인덱스 전체를 bulk NDJSON으로 저장 (액션 줄에는 _id, 라우팅된 문서는 routing도)
+
+    legal_documents처럼 _routing이 필수인 인덱스는 routing이 없으면 복원할 때 모든 문서가 거부됩니다.
+    """
+    meta = index_metadata(client, index_name)
+    docs = 0
+    with open_writer(path, level) as writer:
+        for hit in scan(client, index=index_name, query={"query": {"match_all": {}}}, size=batch_size):
+            action = {"_id": hit["_id"]}
+            if "_routing" in hit:
+                action["routing"] = hit["_routing"]
+            writer.write(
+                json.dumps({"index": action}, ensure_ascii=False).encode("utf-8") + b"\n"
+                + json.dumps(hit["_source"], ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+            )
+            docs += 1
+    _write_meta(path, {**meta, "docs": docs, "compression": detect_compression(path)})
+    return docs
+
+def export_generated(path, count, seed, level=None, end_date=None):
+    """sample_data 데이터셋을 bulk NDJSON으로 저장
+
+    설정/매핑은 저장하지 않고, 복원할 때 대상 클러스터 기준으로 bulk_operations.build_index_settings를 사용합니다
+    (nori 플러그인 유무에 따라 분석기가 달라지기 때문).
+    """
+    with open_writer(path, level) as writer:
+        for block in iter_ndjson_blocks(count, seed, index_name=None, end_date=end_date):
+            writer.write(block)
+    _write_meta(path, {
+        "index": "tech_books",
+        "docs": count,
+        "compression": detect_compression(path),
+        "generated": {"seed": seed, "end_date": str(end_date or DEFAULT_END_DATE)}
+    })
+    return count
+
+def import_dump(client, path, index_name, docs_per_request=DOCS_PER_REQUEST, concurrency=8):
+    """덤프 파일을 압축 해제하며 그대로 /{index}/_bulk로 전송 → 통계 dict"""
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    stats = send_bodies(client, iter_bulk_bodies(iter_decompressed(path), docs_per_request), index_name, concurrency)
+    stats["elapsed"] = time.perf_counter() - started
+    stats["client_cpu_seconds"] = time.process_time() - cpu_started
+    return stats
+
+def verify_import(client, path, index_name, expected_docs=None, sample=100):
+    """복원 결과 확인 → 문제 목록 (비어 있으면 정상)
+
+    - 문서 수가 덤프의 문서 수와 같은지
+    - 덤프 앞쪽 sample건을 액션 줄의 _id / routing 그대로 mget해서 찾을 수 있는지
+      (routing이 빠지면 다른 샤드를 조회해서 못 찾음)
+    """
+    problems = []
+    client.indices.refresh(index=index_name)
+    count = client.count(index=index_name)["count"]
+    if expected_docs is not None and count != expected_docs:
+        problems.append(f"문서 수 불일치: 덤프 {expected_docs:,}건 / 인덱스 {count:,}건")
+
+    docs = []
+    for body, _ in iter_bulk_bodies(iter_decompressed(path), sample):
+        lines = body.split(b"\n")
+        for action_line in lines[:sample * 2:2]:
+            action = next(iter(json.loads(action_line).values()))
+            doc = {"_id": action["_id"]}
+            if "routing" in action:
+                doc["routing"] = action["routing"]
+            docs.append(doc)
+        break
+    if docs:
+        missing = [d["_id"] for d in client.mget(index=index_name, docs=docs)["docs"] if not d.get("found")]
+        if missing:
+            problems.append(f"덤프 앞쪽 {len(docs)}건 중 {len(missing)}건을 찾을 수 없음 (예: {missing[:3]})")
+    return problems
+
+def display_import(stats, path):
+    elapsed = stats["elapsed"]
+    compressed = os.path.getsize(path)
+    print(f"📄 문서 {stats['docs']:,}건, 요청 {stats['requests']:,}회, {elapsed:.2f}초 → {stats['docs'] / elapsed:,.0f} docs/s")
+    print(f"📦 파일 {compressed / 1024 / 1024:,.1f}MB → 전송 {stats['bytes'] / 1024 / 1024:,.1f}MB ({stats['bytes'] / elapsed / 1024 / 1024:,.1f}MB/s)")
+    # 클라이언트 CPU가 경과 시간보다 훨씬 작으면 클러스터 쪽이 병목
+    print(f"⏱️  클라이언트 CPU {stats['client_cpu_seconds']:.2f}초 ({stats['client_cpu_seconds'] / elapsed:.0%}) "
+          f"/ 요청 대기 누적 {stats['send_seconds']:.2f}초")
+    if stats["retried"]:
+        print(f"♻️  재시도 {stats['retried']:,}건 (429 / 타임아웃)")
+    if stats["dead"]:
+        print(f"❌ dead-letter {stats['dead']:,}건 (python bulk_retry.py replay --index <인덱스>)")
+        for error in stats["errors"]:
+            print(f"   - [{error['status']}] {error['error']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="인덱스 덤프 / 복원 (bulk NDJSON, zstd / gzip)")
+    parser.add_argument("--url", default=ES_URL)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="인덱스 또는 생성 데이터셋을 파일로 저장")
+    export_parser.add_argument("path", help="저장 경로 (.zst / .gz / 그 외 압축 없음)")
+    export_parser.add_argument("--index", default="tech_books", help="저장할 인덱스 (tech_books, legal_documents ...)")
+    export_parser.add_argument("--generate", type=int, metavar="COUNT", help="인덱스 대신 sample_data로 COUNT건 생성해서 저장")
+    export_parser.add_argument("--seed", type=int, default=42)
+    export_parser.add_argument("--end-date", type=parse_end_date, help=f"--generate {END_DATE_HELP}")
+    export_parser.add_argument("--level", type=int, help="압축 레벨 (기본 zstd 3 / gzip 3)")
+    export_parser.add_argument("--batch-size", type=int, default=2000)
+
+    import_parser = subparsers.add_parser("import", help="덤프 파일을 인덱스로 복원")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--index", help="복원할 인덱스 (기본: 덤프한 인덱스 이름)")
+    import_parser.add_argument("--recreate", action="store_true", help="인덱스를 지우고 .meta.json 설정/매핑으로 새로 생성")
+    import_parser.add_argument("--docs-per-request", type=int, default=DOCS_PER_REQUEST)
+    import_parser.add_argument("--concurrency", type=int, default=8, help="동시 _bulk 요청 수")
+
+    args = parser.parse_args()
+    client = es if args.url == ES_URL else create_client(args.url)
+
+    if args.command == "export":
+        print_section(f"덤프 저장 → {args.path}")
+        started = time.perf_counter()
+        if args.generate:
+            docs = export_generated(args.path, args.generate, args.seed, args.level, args.end_date)
+        else:
+            if not client.indices.exists(index=args.index):
+                print(f"❌ '{args.index}' 인덱스가 존재하지 않습니다.")
+                return
+            docs = export_index(client, args.index, args.path, args.level, args.batch_size)
+        elapsed = time.perf_counter() - started
+        print(f"📄 문서 {docs:,}건, 파일 {os.path.getsize(args.path) / 1024 / 1024:,.1f}MB, {elapsed:.2f}초")
+        print(f"🗂️  설정/매핑: {args.path}.meta.json")
+        return
+
+    meta = load_meta(args.path)
+    index_name = args.index or (meta or {}).get("index")
+    if not index_name:
+        print("❌ 복원할 인덱스 이름이 없습니다 (--index 지정 또는 .meta.json 필요)")
+        return
+    print_section(f"덤프 복원 {args.path} → {index_name}")
+
+    if args.recreate:
+        if meta is None:
+            print("❌ --recreate에는 .meta.json이 필요합니다.")
+            return
+        if "settings" in meta:
+            body = {"settings": meta["settings"], "mappings": meta["mappings"]}
+        else:
+            from bulk_operations import build_index_settings
+            body = build_index_settings(client)
+        # 새 버전에 복원한 뒤 alias 전환 - 복원하는 동안 기존 인덱스 검색은 그대로
+        try:
+            with build_version(client, index_name, body) as version_index:
+                print(f"🏗️ '{version_index}' 인덱스 생성 완료 (alias '{index_name}'는 복원이 끝나면 전환)")
+                stats = import_dump(client, args.path, version_index, args.docs_per_request, args.concurrency)
+                # dead-letter가 있거나 덤프 문서 수보다 적으면 전환하지 않고 새 버전 삭제
+                ensure_complete(stats, meta.get("docs"))
+        except IncompleteLoadError as e:
+            display_import(stats, args.path)
+            print(f"❌ 복원 미완료: {e} → '{version_index}' 삭제, alias '{index_name}'는 기존 버전 유지")
+            return
+        print(f"🔀 alias '{index_name}' → '{version_index}' 전환 완료")
+    elif not client.indices.exists(index=index_name):
+        print(f"❌ '{index_name}' 인덱스가 존재하지 않습니다. (--recreate로 생성)")
+        return
+    else:
+        with bulk_load_settings(client, index_name):
+            stats = import_dump(client, args.path, index_name, args.docs_per_request, args.concurrency)
+    display_import(stats, args.path)
+
+    # 새로 만든 인덱스면 문서 수까지, 기존 인덱스에 추가했으면 샘플 조회만 확인
+    expected_docs = (meta or {}).get("docs") if args.recreate else None
+    problems = verify_import(client, args.path, index_name, expected_docs)
+    for problem in problems:
+        print(f"❌ 확인 실패: {problem}")
+    if not problems:
+        print("🔎 확인: 문서 수 / 샘플 조회(routing 포함) 정상")
+
+    print_section("✅ 덤프 복원 완료!")
+
+if __name__ == "__main__":
+    main()
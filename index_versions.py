@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+버전 인덱스 + alias 전환 (무중단 재구성)
+- 검색은 항상 alias(books, tech_books, pdf_documents, legal_documents,
+  legal-documents-stable, legal-documents-v2)로 하고
+  실제 데이터는 <alias>_v{n} 인덱스에 둠
+- 새 버전은 refresh 끔 / 복제본 0인 상태로 만들어 채운 뒤
+  원래 설정 복원 → refresh → 샤드 배치 대기 → 예열 → alias를 한 번의 _aliases 요청으로 전환
+  (전환 전까지 기존 검색은 이전 버전을 그대로 조회)
+- 이전 버전은 retired 표시만 하고, 유예 시간(ES_INDEX_GRACE_SECONDS)이 지난 뒤
+  다음 전환 또는 cleanup 때 삭제 → 그 사이에는 rollback으로 되돌릴 수 있음
+- alias 이름과 같은 예전 방식의 실제 인덱스가 있으면 첫 전환 때 같은 요청 안에서 제거(remove_index)
+- python index_versions.py migrate <alias> : 매핑 변경 시 _reindex로 새 버전 생성
+  (slices로 병렬, --rps로 초당 문서 수 제한, rethrottle로 진행 중 속도 변경)
+
+환경 변수
+- ES_INDEX_GRACE_SECONDS: 이전 버전을 지우기 전 유예 시간 (기본 600초)
+"""
+
+from es_client import ES_URL, create_client, es
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import argparse
+import copy
+import json
+import os
+import re
+import time
+
+GRACE_SECONDS = int(os.environ.get("ES_INDEX_GRACE_SECONDS", 600))
+
+# 새 버전을 채우는 동안의 설정 (끝나면 본문에 있던 값 또는 기본값으로 복원)
+BUILD_SETTINGS = {"refresh_interval": "-1", "number_of_replicas": 0}
+
+# _meta 안에서 이 모듈이 쓰는 키
+META_KEY = "versioning"
+
+def print_section(title):
+    print("\n" + "="*60)
+    print(f"🔀 {title}")
+    print("="*60)
+
+def version_name(alias, version):
+    return f"{alias}_v{version}"
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+def _pop_setting(settings, key):
+    """"key" / "index.key" / {"index": {"key"}} 어느 형식이든 꺼내기"""
+    value = None
+    for container, name in ((settings, key), (settings, f"index.{key}"), (settings.get("index", {}), key)):
+        if name in container:
+            value = container.pop(name)
+    return value
+
+def build_body(alias, body):
+    """인덱스 생성 본문 → 벌크용 설정을 적용한 본문
+
+    원래 값(없으면 None → put_settings에서 기본값으로 되돌아감)은 새 인덱스의 _meta에 넣어 두므로
+    다른 프로세스에서도 promote_version을 할 수 있습니다.
+    """
+    body = copy.deepcopy(body)
+    settings = body.setdefault("settings", {})
+    restore = {key: _pop_setting(settings, key) for key in BUILD_SETTINGS}
+    settings.update(BUILD_SETTINGS)
+    mappings = body.setdefault("mappings", {})
+    mappings["_meta"] = {
+        **mappings.get("_meta", {}),
+        META_KEY: {"alias": alias, "built_at": _now(), "restore_settings": restore}
+    }
+    return body
+
+def list_versions(client, alias):
+    """<alias>_v{n} 인덱스 목록 (버전 순) → [{"index", "version", "aliased", "built_at", "retired_at"}, ...]"""
+    pattern = re.compile(rf"^{re.escape(alias)}_v(\d+)$")
+    indices = client.indices.get(index=f"{alias}_v*", allow_no_indices=True, ignore_unavailable=True)
+    versions = []
+    for name, info in indices.items():
+        match = pattern.match(name)
+        if not match:
+            continue
+        meta = info.get("mappings", {}).get("_meta", {}).get(META_KEY, {})
+        versions.append({
+            "index": name,
+            "version": int(match.group(1)),
+            "aliased": alias in info.get("aliases", {}),
+            "built_at": meta.get("built_at"),
+            "retired_at": meta.get("retired_at")
+        })
+    return sorted(versions, key=lambda v: v["version"])
+
+def current_index(client, alias):
+    """alias가 가리키는 인덱스 (없으면 None)"""
+    if not client.indices.exists_alias(name=alias):
+        return None
+    return next(iter(client.indices.get_alias(name=alias)))
+
+def is_legacy_index(client, alias):
+    """alias 자리에 예전 방식(삭제 후 재생성)의 실제 인덱스가 있는지"""
+    return client.indices.exists(index=alias) and not client.indices.exists_alias(name=alias)
+
+def create_version(client, alias, body):
+    """다음 버전 인덱스를 벌크 로딩용 설정으로 생성 → 인덱스 이름"""
+    versions = list_versions(client, alias)
+    name = version_name(alias, versions[-1]["version"] + 1 if versions else 1)
+    client.indices.create(index=name, body=build_body(alias, body))
+    return name
+
+def abandon_version(client, index_name):
+    """채우다 실패한 버전 삭제 (alias는 건드리지 않음)"""
+    client.indices.delete(index=index_name, ignore_unavailable=True)
+
+def _update_meta(client, index_name, **values):
+    mappings = client.indices.get_mapping(index=index_name)[index_name]["mappings"]
+    meta = mappings.get("_meta", {})
+    versioning = {**meta.get(META_KEY, {}), **values}
+    client.indices.put_mapping(index=index_name, meta={**meta, META_KEY: {k: v for k, v in versioning.items() if v is not None}})
+    return versioning
+
+def _keyword_fields(properties, prefix=""):
+    for name, field in properties.items():
+        if field.get("type") == "keyword":
+            yield prefix + name
+        if "properties" in field:
+            yield from _keyword_fields(field["properties"], f"{prefix}{name}.")
+
+def warm_index(client, index_name):
+    """keyword 필드 terms 집계 + 기본 검색으로 예열
+
+    전환 직후 첫 집계가 global ordinals를 만드느라 느려지지 않도록 미리 만들고,
+    세그먼트를 파일시스템 캐시에 올립니다.
+    """
+    mappings = client.indices.get_mapping(index=index_name)[index_name]["mappings"]
+    aggs = {f"warm_{i}": {"terms": {"field": field, "size": 10}}
+            for i, field in enumerate(_keyword_fields(mappings.get("properties", {})))}
+    client.search(index=index_name, size=10, query={"match_all": {}}, aggs=aggs or None, request_cache=False)
+
+def swap_alias(client, alias, index_name):
+    """alias를 index_name으로 한 번에 전환 → 이전에 가리키던 인덱스 목록
+
+    제거 / 추가가 한 요청이라 검색이 alias를 못 찾는 순간이 없습니다.
+    alias 이름의 예전 실제 인덱스는 같은 요청 안에서 remove_index로 지웁니다.
+    """
+    if is_legacy_index(client, alias):
+        actions = [{"remove_index": {"index": alias}}]
+        previous = []
+    else:
+        previous = list(client.indices.get_alias(name=alias)) if client.indices.exists_alias(name=alias) else []
+        actions = [{"remove": {"index": name, "alias": alias}} for name in previous if name != index_name]
+    actions.append({"add": {"index": index_name, "alias": alias, "is_write_index": True}})
+    client.indices.update_aliases(actions=actions)
+    return [name for name in previous if name != index_name]
+
+def cleanup_versions(client, alias, grace=GRACE_SECONDS, abandoned=False):
+    """유예 시간이 지난 retired 버전 삭제 → 삭제한 인덱스 목록
+
+    abandoned=True면 한 번도 전환되지 않은(현재 버전보다 오래된) 빌드도 지웁니다.
+    현재 버전보다 새 빌드는 다른 곳에서 채우는 중일 수 있어서 건드리지 않습니다.
+    """
+    now = datetime.now(timezone.utc)
+    versions = list_versions(client, alias)
+    current = max((v["version"] for v in versions if v["aliased"]), default=None)
+    deleted = []
+    for v in versions:
+        if v["aliased"]:
+            continue
+        if v["retired_at"]:
+            expired = (now - datetime.fromisoformat(v["retired_at"])).total_seconds() >= grace
+        else:
+            expired = abandoned and current is not None and v["version"] < current
+        if expired:
+            client.indices.delete(index=v["index"], ignore_unavailable=True)
+            deleted.append(v["index"])
+    return deleted
+
+def promote_version(client, alias, index_name, warm=None, grace=GRACE_SECONDS):
+    """채운 버전을 서비스에 투입 → {"previous": [...], "deleted": [...]}
+
+    1. 생성 때 보관한 refresh_interval / 복제본 수 복원 후 refresh
+    2. 주 샤드가 모두 배치될 때까지 대기 (yellow)
+    3. 예열 (warm(index_name), 기본 warm_index)
+    4. alias 전환, 이전 버전은 retired 표시
+    5. 유예 시간이 지난 이전 버전 정리
+    """
+    meta = client.indices.get_mapping(index=index_name)[index_name]["mappings"].get("_meta", {}).get(META_KEY, {})
+    restore = meta.get("restore_settings", {key: None for key in BUILD_SETTINGS})
+    client.indices.put_settings(index=index_name, settings={"index": restore})
+    client.indices.refresh(index=index_name)
+    client.cluster.health(index=index_name, wait_for_status="yellow", timeout="60s")
+
+    if warm is None:
+        warm_index(client, index_name)
+    elif warm:
+        warm(index_name)
+
+    previous = swap_alias(client, alias, index_name)
+    _update_meta(client, index_name, promoted_at=_now(), retired_at=None)
+    for name in previous:
+        _update_meta(client, name, retired_at=_now())
+    return {"previous": previous, "deleted": cleanup_versions(client, alias, grace)}
+
+class IncompleteLoadError(RuntimeError):
+    """새 버전 로딩이 덜 끝남 - build_version 블록 안에서 올리면 alias 전환 대신 새 버전 삭제"""
+
+def ensure_complete(stats, expected_docs=None):
+    """로딩 통계 확인 - dead-letter가 있거나 성공 문서 수가 모자라면 IncompleteLoadError
+
+    build_version 블록은 예외 없이 끝나면 alias를 옮기므로,
+    일부만 들어간 새 버전이 온전한 이전 버전을 밀어내지 않도록 블록 안에서 호출합니다.
+    """
+    if stats["dead"]:
+        raise IncompleteLoadError(f"dead-letter {stats['dead']:,}건 (성공 {stats['docs']:,}건)")
+    if expected_docs is not None and stats["docs"] < expected_docs:
+        raise IncompleteLoadError(f"성공 문서 {stats['docs']:,}건 < 기대 {expected_docs:,}건")
+
+@contextmanager
+def build_version(client, alias, body, warm=None, grace=GRACE_SECONDS):
+    """with 블록 안에서 새 버전을 채우고, 정상 종료하면 alias 전환
+
+        with build_version(es, "tech_books", body) as index_name:
+            bulk_actions(es, generate_sample_data(index_name=index_name))
+
+    블록에서 예외가 나면 새 버전을 지우고 alias는 그대로 둡니다.
+    벌크 로딩이면 블록 끝에서 ensure_complete(통계)로 실패 건을 예외로 바꿔야 합니다.
+    """
+    index_name = create_version(client, alias, body)
+    try:
+        yield index_name
+    except BaseException:
+        abandon_version(client, index_name)
+        raise
+    promote_version(client, alias, index_name, warm, grace)
+
+def rollback(client, alias):
+    """아직 지워지지 않은 직전 버전으로 alias 되돌리기 → 되돌린 인덱스 (없으면 None)"""
+    versions = list_versions(client, alias)
+    current = next((v for v in reversed(versions) if v["aliased"]), None)
+    if current is None:
+        return None
+    candidates = [v for v in versions if v["retired_at"] and v["version"] < current["version"]]
+    if not candidates:
+        return None
+    target = candidates[-1]["index"]
+    swap_alias(client, alias, target)
+    _update_meta(client, target, retired_at=None, promoted_at=_now())
+    _update_meta(client, current["index"], retired_at=_now())
+    return target
+
+def wait_for_task(client, task_id, poll_seconds=2.0):
+    """_reindex 같은 백그라운드 작업을 끝날 때까지 진행률 출력 → 완료 응답"""
+    while True:
+        task = client.tasks.get(task_id=task_id)
+        status = task["task"].get("status", {})
+        if task.get("completed"):
+            if "error" in task:
+                raise RuntimeError(f"작업 실패: {task['error']}")
+            return task.get("response", {})
+        total = status.get("total") or 0
+        done = status.get("created", 0) + status.get("updated", 0) + status.get("version_conflicts", 0)
+        progress = f"{done / total:.0%}" if total else "-"
+        print(f"   ⏳ {done:,}/{total:,} ({progress}), 배치 {status.get('batches', 0)}, "
+              f"제한 {status.get('requests_per_second', -1)} docs/s")
+        time.sleep(poll_seconds)
+
+def reindex_version(client, alias, body, slices="auto", requests_per_second=None, batch_size=1000,
+                    warm=None, grace=GRACE_SECONDS, poll_seconds=2.0):
+    """매핑 / 설정 변경: 현재 버전을 _reindex로 새 버전에 복사한 뒤 전환 → (새 인덱스, _reindex 응답)
+
+    slices: 샤드별로 나눠 병렬 복사 ("auto" = 주 샤드 수)
+    requests_per_second: 초당 문서 수 제한 (None = 제한 없음) - 서비스 중인 클러스터 부하 조절
+    복사하는 동안 원본에 들어온 쓰기는 새 버전에 반영되지 않으므로 쓰기를 멈추고 실행합니다.
+    """
+    source = current_index(client, alias) or (alias if is_legacy_index(client, alias) else None)
+    if source is None:
+        raise ValueError(f"'{alias}' alias / 인덱스가 없습니다.")
+
+    index_name = create_version(client, alias, body)
+    try:
+        task = client.reindex(
+            source={"index": source, "size": batch_size},
+            dest={"index": index_name, "op_type": "create"},
+            slices=slices,
+            requests_per_second=requests_per_second or -1,
+            wait_for_completion=False
+        )
+        print(f"   🧵 _reindex {source} → {index_name} (작업 {task['task']}, slices={slices})")
+        response = wait_for_task(client, task["task"], poll_seconds)
+        if response.get("failures") or response.get("timed_out"):
+            raise RuntimeError(f"_reindex 실패: {json.dumps(response.get('failures', [])[:3], ensure_ascii=False)}")
+        source_count = client.count(index=source)["count"]
+        client.indices.refresh(index=index_name)
+        target_count = client.count(index=index_name)["count"]
+        if target_count != source_count:
+            raise RuntimeError(f"문서 수 불일치: {source} {source_count:,}건 / {index_name} {target_count:,}건")
+    except BaseException:
+        abandon_version(client, index_name)
+        raise
+
+    promote_version(client, alias, index_name, warm, grace)
+    return index_name, response
+
+def setup_body(client, alias):
+    """셋업 스크립트에 정의된 현재 설정 / 매핑 (migrate 기본 본문)"""
+    if alias == "books":
+        from main import BOOKS_MAPPING
+        return BOOKS_MAPPING
+    if alias == "tech_books":
+        from bulk_operations import build_index_settings
+        return build_index_settings(client)
+    if alias == "pdf_documents":
+        from pdf_search import PDF_MAPPING
+        return PDF_MAPPING
+    if alias == "legal_documents":
+        from pdf_legal_search import build_legal_index_body
+        return build_legal_index_body(client)
+    raise ValueError(f"'{alias}'의 셋업 본문이 없습니다 (--body로 지정)")
+
+def display_versions(client, alias):
+    versions = list_versions(client, alias)
+    if is_legacy_index(client, alias):
+        print(f"   ⚠️  '{alias}'는 alias가 아닌 실제 인덱스입니다 (다음 전환 때 버전 인덱스로 바뀜)")
+    if not versions:
+        print("   (버전 인덱스 없음)")
+        return
+    stats = {row["index"]: row for row in client.cat.indices(index=f"{alias}_v*", format="json", h="index,health,docs.count,store.size")}
+    for v in versions:
+        row = stats.get(v["index"], {})
+        if v["aliased"]:
+            state = "✅ 사용 중"
+        elif v["retired_at"]:
+            state = f"🕒 retired {v['retired_at']}"
+        else:
+            state = f"🏗️ 빌드 {v['built_at']} (전환 안 됨)"
+        print(f"   {v['index']:<28} {row.get('health', '-'):<7} 문서 {row.get('docs.count', '-'):>10} "
+              f"{row.get('store.size', '-'):>8} | {state}")
+
+def main():
+    parser = argparse.ArgumentParser(description="버전 인덱스 / alias 전환 관리")
+    parser.add_argument("--url", default=ES_URL)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    status_parser = subparsers.add_parser("status", help="버전 목록")
+    status_parser.add_argument("alias")
+
+    migrate_parser = subparsers.add_parser("migrate", help="_reindex로 새 버전을 만들어 전환 (매핑 변경)")
+    migrate_parser.add_argument("alias")
+    migrate_parser.add_argument("--body", help="설정/매핑 JSON 파일 (기본: 셋업 스크립트의 현재 정의)")
+    migrate_parser.add_argument("--slices", default="auto", help="병렬 복사 수 (auto = 주 샤드 수)")
+    migrate_parser.add_argument("--rps", type=float, help="초당 문서 수 제한")
+    migrate_parser.add_argument("--batch-size", type=int, default=1000)
+    migrate_parser.add_argument("--grace", type=int, default=GRACE_SECONDS, help="이전 버전 삭제 유예 시간 (초)")
+
+    rethrottle_parser = subparsers.add_parser("rethrottle", help="진행 중인 _reindex 속도 변경")
+    rethrottle_parser.add_argument("task_id")
+    rethrottle_parser.add_argument("--rps", type=float, help="초당 문서 수 (생략하면 제한 없음)")
+
+    rollback_parser = subparsers.add_parser("rollback", help="직전 버전으로 alias 되돌리기")
+    rollback_parser.add_argument("alias")
+
+    cleanup_parser = subparsers.add_parser("cleanup", help="유예 시간이 지난 이전 버전 삭제")
+    cleanup_parser.add_argument("alias")
+    cleanup_parser.add_argument("--grace", type=int, default=GRACE_SECONDS)
+    cleanup_parser.add_argument("--abandoned", action="store_true", help="전환되지 않은 오래된 빌드도 삭제")
+
+    args = parser.parse_args()
+    client = es if args.url == ES_URL else create_client(args.url)
+
+    if args.command == "rethrottle":
+        client.reindex_rethrottle(task_id=args.task_id, requests_per_second=args.rps or -1)
+        print(f"✅ {args.task_id}: {args.rps or '제한 없음'} docs/s")
+        return
+
+    if args.command == "status":
+        print_section(f"'{args.alias}' 버전")
+        display_versions(client, args.alias)
+        return
+
+    if args.command == "rollback":
+        print_section(f"'{args.alias}' 되돌리기")
+        target = rollback(client, args.alias)
+        print(f"✅ alias '{args.alias}' → '{target}'" if target else "❌ 되돌릴 이전 버전이 없습니다.")
+        return
+
+    if args.command == "cleanup":
+        print_section(f"'{args.alias}' 이전 버전 정리")
+        deleted = cleanup_versions(client, args.alias, args.grace, args.abandoned)
+        print(f"🗑️ 삭제: {', '.join(deleted)}" if deleted else "   삭제할 버전이 없습니다.")
+        return
+
+    print_section(f"'{args.alias}' 마이그레이션 (_reindex)")
+    if args.body:
+        with open(args.body, encoding="utf-8") as f:
+            body = json.load(f)
+    else:
+        body = setup_body(client, args.alias)
+    started = time.perf_counter()
+    index_name, response = reindex_version(
+        client, args.alias, body, args.slices, args.rps, args.batch_size, grace=args.grace
+    )
+    print(f"📄 {response.get('created', 0):,}건 복사, {time.perf_counter() - started:.1f}초")
+    print(f"✅ alias '{args.alias}' → '{index_name}' (이전 버전은 {args.grace}초 뒤 정리)")
+    display_versions(client, args.alias)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+한국어/법령 텍스트용 분석기 설정 및 비교 도구
+- 기본 제공 cjk_width / cjk_bigram 필터 사용
+- analysis-nori 플러그인이 설치되어 있으면 nori 형태소 분석기 사용
+- 분석기별 인덱스 크기와 검색 지연시간 비교
+"""
+
+from es_client import es
+from elasticsearch.helpers import bulk
+
+def print_section(title):
+    print("\n" + "="*60)
+    print(f"🇰🇷 {title}")
+    print("="*60)
+
+def has_nori_plugin(es_client):
+    """analysis-nori 플러그인 설치 여부 확인"""
+    try:
+        plugins = es_client.cat.plugins(format="json")
+        return any(plugin.get("component") == "analysis-nori" for plugin in plugins)
+    except Exception:
+        return False
+
+def build_korean_analysis(es_client, analyzer_name="korean_analyzer", use_nori=None):
+    """한국어 텍스트용 analysis 설정 생성
+
+    standard 토크나이저는 '스토킹범죄의', '스토킹범죄를'처럼 조사가 붙은 어절을
+    하나의 토큰으로 남기기 때문에 퍼지/와일드카드 검색으로 보완해야 했습니다.
+    - nori 사용 가능: 형태소 분석 + 조사/어미 제거
+    - nori 없음: cjk_bigram으로 2글자씩 잘라 조사가 붙어도 텀이 일치하도록 처리
+    """
+    if use_nori is None:
+        use_nori = has_nori_plugin(es_client)
+
+    if use_nori:
+        return {
+            "tokenizer": {
+                "korean_nori_tokenizer": {
+                    "type": "nori_tokenizer",
+                    "decompound_mode": "mixed"
+                }
+            },
+            "analyzer": {
+                analyzer_name: {
+                    "type": "custom",
+                    "tokenizer": "korean_nori_tokenizer",
+                    "filter": [
+                        "nori_part_of_speech",  # 조사(J*), 어미(E*) 등 제거
+                        "nori_readingform",
+                        "lowercase"
+                    ]
+                }
+            }
+        }
+
+    return {
+        "analyzer": {
+            analyzer_name: {
+                "type": "custom",
+                "tokenizer": "standard",
+                "filter": [
+                    "cjk_width",  # 전각/반각 문자 정규화
+                    "lowercase",
+                    "cjk_bigram"  # 한글/한자 2-gram
+                ]
+            }
+        }
+    }
+
+ANALYZER_VARIANTS = {
+    "standard": {
+        "analyzer": {
+            "bench_analyzer": {
+                "type": "custom",
+                "tokenizer": "standard",
+                "filter": ["lowercase", "stop", "snowball"]
+            }
+        }
+    },
+    "cjk": build_korean_analysis(None, "bench_analyzer", use_nori=False),
+}
+
+def load_sample_paragraphs(pdf_path="stalker.pdf"):
+    """비교용 샘플 문단 로드 (stalker.pdf 또는 더미 법령 텍스트)"""
+    from pdf_legal_search_fixed import extract_text_from_pdf
+
+    text = extract_text_from_pdf(pdf_path) or ""
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+def compare_analyzers(paragraphs, queries, copies=200, repeat=20):
+    """분석기별 인덱스 크기와 검색 지연시간 비교"""
+    variants = dict(ANALYZER_VARIANTS)
+    if has_nori_plugin(es):
+        variants["nori"] = build_korean_analysis(es, "bench_analyzer", use_nori=True)
+    else:
+        print("⚠️  analysis-nori 플러그인이 없어 nori 비교는 건너뜁니다.")
+
+    report = []
+
+    for name, analysis in variants.items():
+        index_name = f"analyzer-bench-{name}"
+        if es.indices.exists(index=index_name):
+            es.indices.delete(index=index_name)
+
+        es.indices.create(
+            index=index_name,
+            settings={
+                "number_of_shards": 1,
+                "number_of_replicas": 0,
+                "analysis": analysis
+            },
+            mappings={
+                "properties": {
+                    "content": {"type": "text", "analyzer": "bench_analyzer"}
+                }
+            }
+        )
+
+        def doc_generator():
+            for copy in range(copies):
+                for i, paragraph in enumerate(paragraphs):
+                    yield {
+                        "_index": index_name,
+                        "_id": f"{copy}-{i}",
+                        "_source": {"content": paragraph}
+                    }
+
+        bulk(es, doc_generator(), chunk_size=500)
+        es.indices.refresh(index=index_name)
+        es.indices.forcemerge(index=index_name, max_num_segments=1)
+
+        stats = es.indices.stats(index=index_name, metric="store")
+        store_size = stats["indices"][index_name]["total"]["store"]["size_in_bytes"]
+
+        query_stats = {}
+        for query in queries:
+            search_body = {
+                "query": {"match": {"content": {"query": query, "operator": "and"}}},
+                "size": 10
+            }
+            took_total = 0
+            hits = 0
+            for _ in range(repeat):
+                # request_cache를 끄지 않으면 반복 측정이 캐시 히트만 재게 됨
+                result = es.search(index=index_name, body=search_body, request_cache=False)
+                took_total += result["took"]
+                hits = result["hits"]["total"]["value"]
+            query_stats[query] = {"avg_took_ms": took_total / repeat, "hits": hits}
+
+        report.append({"analyzer": name, "store_size": store_size, "queries": query_stats})
+        es.indices.delete(index=index_name)
+
+    return report
+
+def display_comparison(report):
+    """비교 결과 표시"""
+    for row in report:
+        print(f"\n🔧 {row['analyzer']} 분석기")
+        print(f"   💾 인덱스 크기: {row['store_size']:,} bytes")
+        for query, info in row["queries"].items():
+            print(f"   🔍 '{query}': {info['hits']}건, 평균 {info['avg_took_ms']:.2f}ms")
+
+def main():
+    print_section("한국어 분석기 비교")
+
+    if not es.ping():
+        print("❌ Elasticsearch 연결 실패")
+        return
+
+    # 1. 토큰 분석 결과 확인
+    print_section("토큰 분석 결과")
+    sample_texts = ["스토킹범죄의 처벌 등에 관한 법률", "스토킹범죄를 예방하고"]
+    analysis = build_korean_analysis(es, "bench_analyzer")
+    analyzer = analysis["analyzer"]["bench_analyzer"]
+    for text in sample_texts:
+        body = {"tokenizer": analyzer["tokenizer"], "filter": analyzer["filter"], "text": text}
+        if "tokenizer" in analysis:
+            body["tokenizer"] = analysis["tokenizer"][analyzer["tokenizer"]]
+        result = es.indices.analyze(body=body)
+        tokens = [token["token"] for token in result["tokens"]]
+        print(f"📝 '{text}' → {tokens}")
+
+    # 2. 인덱스 크기 및 지연시간 비교
+    print_section("인덱스 크기 / 검색 지연시간 비교")
+    paragraphs = load_sample_paragraphs()
+    report = compare_analyzers(paragraphs, ["스토킹범죄", "처벌", "피해자 보호"])
+    display_comparison(report)
+
+    print_section("✅ 분석기 비교 완료!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+법령 실시간 검색 (Search-as-you-type)
+- 키를 누를 때마다 검색, 입력이 멈출 때까지 잠시 기다린 뒤 요청 (디바운스)
+- 검색어가 바뀌면 진행 중인 비동기 요청 취소
+- 최근 검색 결과를 접두사별로 캐시
+- attachment.content.suggest (search_as_you_type) 필드 사용
+"""
+
+from es_client import create_async_client as create_instrumented_async_client
+import asyncio
+import codecs
+import os
+import sys
+import threading
+import time
+
+# 마지막 키 입력 후 검색을 보내기까지 기다리는 시간 (초)
+DEBOUNCE_SECONDS = 0.15
+
+# 접두사별로 캐시할 최근 결과 수
+MAX_CACHED_PREFIXES = 256
+
+# Esc 뒤에 이어지는 글자를 기다리는 시간 (초) - 이 안에 안 오면 단독 Esc(종료)
+ESCAPE_TIMEOUT = 0.05
+
+def print_section(title):
+    print("\n" + "="*60)
+    print(f"⚡ {title}")
+    print("="*60)
+
+def create_async_client():
+    """비동기 계측 클라이언트 생성 (aiohttp 필요) - 지표 / 트레이싱 / 느린 쿼리 기록은 동기 클라이언트와 공통"""
+    try:
+        return create_instrumented_async_client()
+    except ValueError as e:
+        print(f"⚠️  비동기 클라이언트 생성 실패: {e}")
+        print("   pip install aiohttp 후 다시 실행해주세요.")
+        return None
+
+def build_live_query(query, size=5):
+    """입력 중인 검색어용 쿼리 (마지막 단어는 접두사로 매칭)"""
+    return {
+        "query": {
+            "multi_match": {
+                "query": query,
+                "type": "bool_prefix",
+                "operator": "and",
+                "fields": [
+                    "attachment.content.suggest",
+                    "attachment.content.suggest._2gram",
+                    "attachment.content.suggest._3gram"
+                ]
+            }
+        },
+        "highlight": {
+            "fields": {
+                # index_options: offsets 로 저장된 오프셋을 사용하므로 본문 재분석 없음
+                "attachment.content.suggest": {
+                    "fragment_size": 80,
+                    "number_of_fragments": 1,
+                    "pre_tags": ["【"],
+                    "post_tags": ["】"]
+                }
+            }
+        },
+        "_source": ["filename", "legal_category"],
+        "size": size
+    }
+
+def cache_get(cache, query):
+    """접두사 캐시 조회
+
+    operator가 and이고 마지막 단어만 접두사로 매칭되므로, 어떤 검색어의 결과가
+    0건이면 그 뒤에 글자를 더 붙인 검색어도 0건입니다. 이 경우 요청을 생략합니다.
+    """
+    result = cache.pop(query, None)
+    if result is not None:
+        cache[query] = result  # 최근 사용으로 갱신
+        return result
+
+    for prefix, cached in cache.items():
+        if query.startswith(prefix) and cached["hits"]["total"]["value"] == 0:
+            return cached
+    return None
+
+def cache_put(cache, query, result):
+    """접두사 캐시 저장 (가장 오래된 항목부터 제거)"""
+    if len(cache) >= MAX_CACHED_PREFIXES:
+        cache.pop(next(iter(cache)))
+    cache[query] = result
+
+def _split_keys(chars, read_more):
+    """읽은 글자들 → 키 목록
+
+    방향키 / Home / End 등은 Esc로 시작하는 시퀀스(CSI "\x1b[...", SS3 "\x1bO?")로 들어오므로
+    통째로 버리고, 뒤따르는 글자가 없는 단독 Esc만 "\x1b"로 전달합니다.
+    read_more()는 ESCAPE_TIMEOUT 동안 더 읽은 글자 (없으면 "").
+    """
+    keys = []
+    i = 0
+    while i < len(chars):
+        ch = chars[i]
+        i += 1
+        if ch != "\x1b":
+            keys.append(ch)
+            continue
+        if i == len(chars):
+            chars += read_more()
+        if i == len(chars):
+            keys.append(ch)
+            continue
+
+        follower = chars[i]
+        i += 1
+        if follower == "[":
+            # CSI: 매개변수 / 중간 글자 뒤 최종 글자(@ ~ ~)까지
+            while True:
+                if i == len(chars):
+                    more = read_more()
+                    if not more:
+                        break
+                    chars += more
+                final = chars[i]
+                i += 1
+                if "@" <= final <= "~":
+                    break
+        elif follower == "O":
+            # SS3: 글자 하나 더 (일부 터미널의 방향키 / F1~F4)
+            if i == len(chars):
+                chars += read_more()
+            i = min(i + 1, len(chars))
+        # 그 밖의 Esc + 글자(Alt 조합)는 둘 다 버림
+    return keys
+
+def _read_keys(loop, queue, stop_event):
+    """별도 스레드에서 키 입력을 한 글자씩 읽어 asyncio 큐로 전달"""
+    # 종료 시 스레드가 키 하나를 삼키지 않도록 짧은 주기로 입력 여부만 확인
+    if os.name == "nt":
+        import msvcrt
+        while not stop_event.is_set():
+            if msvcrt.kbhit():
+                ch = msvcrt.getwch()
+                if ch in ("\x00", "\xe0"):
+                    # 방향키 / 기능키는 접두 글자 + 키 코드 두 글자 → 버림
+                    msvcrt.getwch()
+                    continue
+                loop.call_soon_threadsafe(queue.put_nowait, ch)
+            else:
+                time.sleep(0.02)
+        return
+
+    import select
+    import termios
+    import tty
+
+    fd = sys.stdin.fileno()
+    old_settings = termios.tcgetattr(fd)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+
+    def read_more():
+        readable, _, _ = select.select([fd], [], [], ESCAPE_TIMEOUT)
+        return decoder.decode(os.read(fd, 8)) if readable else ""
+
+    try:
+        tty.setcbreak(fd)
+        while not stop_event.is_set():
+            readable, _, _ = select.select([fd], [], [], 0.1)
+            if not readable:
+                continue
+            chars = decoder.decode(os.read(fd, 8))
+            for key in _split_keys(chars, read_more):
+                loop.call_soon_threadsafe(queue.put_nowait, key)
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+
+def render(query, result, elapsed_ms, source):
+    """화면을 지우고 현재 검색어와 결과 표시"""
+    lines = ["\033[2J\033[H⚡ 실시간 법령 검색 (Esc: 종료)", f"🔍 {query}▌", ""]
+
+    if result is not None:
+        total = result["hits"]["total"]["value"]
+        lines.append(f"📊 {total}건 ({elapsed_ms:.0f}ms, {source})")
+        for i, hit in enumerate(result["hits"]["hits"], 1):
+            fragments = hit.get("highlight", {}).get("attachment.content.suggest", [])
+            snippet = fragments[0].replace("\n", " ") if fragments else ""
+            lines.append(f"{i}. 📄 {hit['_source']['filename']} - {snippet}")
+
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+async def live_search(index_name="legal_documents"):
+    """키 입력마다 검색하는 실시간 검색 루프"""
+    async_es = create_async_client()
+    if async_es is None:
+        return
+
+    loop = asyncio.get_running_loop()
+    keys = asyncio.Queue()
+    stop_event = threading.Event()
+    reader = threading.Thread(target=_read_keys, args=(loop, keys, stop_event), daemon=True)
+    reader.start()
+
+    cache = {}  # 검색어 → 결과 (입력 순서 유지)
+    query = ""
+    pending = None  # 디바운스 후 실행될 검색 태스크
+
+    async def search_after_debounce(text):
+        await asyncio.sleep(DEBOUNCE_SECONDS)
+        start = time.perf_counter()
+        try:
+            result = await async_es.search(index=index_name, body=build_live_query(text))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            sys.stdout.write(f"❌ 검색 실패: {e}\n")
+            return
+        cache_put(cache, text, result)
+        render(text, result, (time.perf_counter() - start) * 1000, "서버")
+
+    render(query, None, 0, "")
+    try:
+        while True:
+            ch = await keys.get()
+
+            if ch in ("\x1b", "\x03", "\x04"):  # 단독 Esc, Ctrl+C, Ctrl+D
+                break
+            elif ch in ("\x7f", "\x08"):  # 백스페이스
+                query = query[:-1]
+            elif ch in ("\r", "\n"):
+                continue
+            elif ch.isprintable():
+                query += ch
+            else:
+                continue
+
+            # 검색어가 바뀌었으므로 진행 중인 요청 취소
+            if pending is not None and not pending.done():
+                pending.cancel()
+                pending = None
+
+            text = query.strip()
+            if not text:
+                render(query, None, 0, "")
+                continue
+
+            cached = cache_get(cache, text)
+            if cached is not None:
+                render(query, cached, 0, "캐시")
+                continue
+
+            render(query, None, 0, "")
+            pending = asyncio.create_task(search_after_debounce(text))
+    finally:
+        stop_event.set()
+        reader.join()  # 터미널 설정 복원까지 대기
+        if pending is not None and not pending.done():
+            pending.cancel()
+        await async_es.close()
+
+def main(index_name="legal_documents"):
+    print_section("법령 실시간 검색")
+
+    if not sys.stdin.isatty():
+        print("❌ 실시간 검색은 터미널에서만 사용할 수 있습니다.")
+        return
+
+    try:
+        asyncio.run(live_search(index_name))
+    except KeyboardInterrupt:
+        pass
+    print("\n👋 실시간 검색을 종료합니다.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+검색 부하 생성기 (open-loop)
+- real_world_search의 실제 쿼리 모양으로 가중치 워크로드 구성
+  (search_books 텍스트/필터/정렬/페이지, get_search_suggestions 접두사, get_facets)
+- 목표 QPS에 맞춰 요청을 예정 시각에 큐에 넣고, 비동기 워커 여러 개가 처리
+  → 응답이 늦어져도 요청 속도가 줄지 않음 (지연시간은 예정 시각부터 측정)
+- 구간별 달성 QPS / 지연시간 백분위 / 에러율, 종료 후 워크로드별 요약
+- --standin: 로컬 대역 서버를 띄워 Elasticsearch 없이도 실행
+"""
+
+from es_client import ES_URL, create_async_client, create_client
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from real_world_search import build_search_query, build_suggestion_query, build_facet_query
+import argparse
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+
+INDEX_NAME = "tech_books"
+
+SEARCH_TEXTS = ["Python 머신러닝", "웹개발", "JavaScript", "데이터사이언스", "프로그래밍", "Python", "클라우드 보안"]
+FILTER_EXAMPLES = [
+    ("Python", {"category": "머신러닝", "rating_min": 4.0}),
+    ("", {"price_range": {"gte": 30000, "lte": 40000}}),
+    ("웹", {"language": "JavaScript", "publish_year": 2023}),
+    ("Python", {"price_range": {"lte": 30000}, "rating_min": 4.0}),
+]
+SORT_OPTIONS = ["price_asc", "price_desc", "rating_desc", "newest", "pages_desc"]
+SUGGESTION_PREFIXES = ["Pyt", "웹", "머신", "Java", "데이", "클라"]
+
+# 워크로드 이름 → 가중치
+DEFAULT_WEIGHTS = {
+    "search_text": 40,
+    "search_filter": 20,
+    "search_sort": 10,
+    "search_pagination": 10,
+    "suggestions": 15,
+    "facets": 5,
+}
+
+def print_section(title):
+    print("\n" + "="*60)
+    print(f"🚦 {title}")
+    print("="*60)
+
+def build_request(name, rng):
+    """워크로드 이름 → 검색 본문 (실제 검색 함수와 같은 쿼리 빌더 사용)"""
+    if name == "search_text":
+        return build_search_query(rng.choice(SEARCH_TEXTS), size=10)
+    if name == "search_filter":
+        query_text, filters = rng.choice(FILTER_EXAMPLES)
+        return build_search_query(query_text, filters, size=10)
+    if name == "search_sort":
+        return build_search_query(rng.choice(["", "Python", "웹"]), sort_by=rng.choice(SORT_OPTIONS), size=10)
+    if name == "search_pagination":
+        return build_search_query(rng.choice(SEARCH_TEXTS), page=rng.randint(2, 5), size=5)
+    if name == "suggestions":
+        return build_suggestion_query(rng.choice(SUGGESTION_PREFIXES))
+    if name == "facets":
+        return build_facet_query()
+    raise ValueError(f"알 수 없는 워크로드: {name}")
+
+def parse_weights(value):
+    """"search_text=40,facets=5" → {"search_text": 40, "facets": 5}"""
+    weights = {}
+    for item in value.split(","):
+        name, weight = item.split("=")
+        if name.strip() not in DEFAULT_WEIGHTS:
+            raise ValueError(f"알 수 없는 워크로드: {name}")
+        weights[name.strip()] = float(weight)
+    return weights
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+def start_standin_server(port=0, latency_ms=5.0, error_rate=0.0):
+    """Elasticsearch 흉내를 내는 로컬 서버 (검색 응답 고정, 지연시간/429 에러 주입)
+
+    반환값: (서버, URL)
+    """
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            # 헤더와 본문을 따로 쓰므로 Nagle을 끄지 않으면 delayed ACK로 응답마다 ~40ms 지연
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def _respond(self, status, body):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("X-Elastic-Product", "Elasticsearch")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(payload)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            if length:
+                self.rfile.read(length)
+            if latency_ms > 0:
+                time.sleep(random.expovariate(1 / latency_ms) / 1000)
+            if random.random() < error_rate:
+                self._respond(429, {"error": {"type": "es_rejected_execution_exception"}, "status": 429})
+                return
+            self._respond(200, {
+                "took": int(latency_ms),
+                "timed_out": False,
+                "_shards": {"total": 1, "successful": 1, "skipped": 0, "failed": 0},
+                "hits": {"total": {"value": 0, "relation": "eq"}, "max_score": None, "hits": []}
+            })
+
+        def do_GET(self):
+            if self.path.split("?")[0] == "/":
+                self._respond(200, {"name": "standin", "version": {"number": "9.0.0"}, "tagline": "You Know, for Search"})
+            else:
+                self.do_POST()
+
+        def do_HEAD(self):
+            self._respond(200, {})
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="standin-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def create_executor(url, workers, max_retries=0):
+    """검색 실행 함수 (코루틴) 생성
+
+    aiohttp가 있으면 공용 비동기 계측 클라이언트, 없으면 동기 공용 클라이언트를 스레드 풀에서 실행합니다.
+    어느 쪽이든 es_client 지표(지연시간 / took / 바이트)와 ES_COMPRESSION 설정이 똑같이 적용됩니다.
+    기본적으로 재시도하지 않아 429 등 에러가 에러율에 그대로 드러납니다.
+    반환값: (execute, close, 설명)
+    """
+    try:
+        client = create_async_client(url, connections_per_node=workers, max_retries=max_retries)
+
+        async def execute(body):
+            return await client.search(index=INDEX_NAME, body=body)
+
+        return execute, client.close, "AsyncElasticsearch"
+    except ValueError:
+        pass
+
+    client = create_client(url, connections_per_node=workers, max_retries=max_retries)
+    pool = ThreadPoolExecutor(max_workers=workers)
+
+    async def execute(body):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, lambda: client.search(index=INDEX_NAME, body=body))
+
+    async def close():
+        pool.shutdown(wait=False)
+        client.close()
+
+    return execute, close, f"스레드 풀 {workers}개 (aiohttp 없음)"
+
+def _error_label(error):
+    status = getattr(getattr(error, "meta", None), "status", None)
+    return str(status) if status else type(error).__name__
+
+async def run_load(execute, weights, qps, duration, workers, report_interval=1.0, poisson=False, seed=42):
+    """목표 QPS로 duration초 동안 부하를 걸고 구간별 / 전체 통계 반환"""
+    rng = random.Random(seed)
+    names = list(weights)
+    weight_values = list(weights.values())
+    queue = asyncio.Queue()
+
+    windows = {}       # 구간 번호 → {"completed", "errors", "latencies"}
+    by_name = {name: {"latencies": [], "errors": 0} for name in names}
+    errors = {}
+    state = {"sent": 0, "completed": 0, "reported": 0}
+    start = time.perf_counter()
+
+    async def scheduler():
+        next_at = start
+        end = start + duration
+        while next_at < end:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            name = rng.choices(names, weights=weight_values)[0]
+            queue.put_nowait((next_at, name, build_request(name, rng)))
+            state["sent"] += 1
+            next_at += rng.expovariate(qps) if poisson else 1 / qps
+        for _ in range(workers):
+            queue.put_nowait(None)
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            scheduled_at, name, body = item
+            error = None
+            try:
+                await execute(body)
+            except Exception as e:
+                error = _error_label(e)
+            done = time.perf_counter()
+            latency_ms = (done - scheduled_at) * 1000  # 큐 대기 포함 (coordinated omission 방지)
+
+            window = windows.setdefault(int((done - start) / report_interval), {"completed": 0, "errors": 0, "latencies": []})
+            window["completed"] += 1
+            state["completed"] += 1
+            if error:
+                window["errors"] += 1
+                by_name[name]["errors"] += 1
+                errors[error] = errors.get(error, 0) + 1
+            else:
+                window["latencies"].append(latency_ms)
+                by_name[name]["latencies"].append(latency_ms)
+
+    def report(index, span):
+        window = windows.get(index, {"completed": 0, "errors": 0, "latencies": []})
+        latencies = sorted(window["latencies"])
+        backlog = state["sent"] - state["completed"]
+        print(f"   [{index * report_interval + span:6.1f}s] {window['completed'] / span:8.1f} qps | "
+              f"p50 {percentile(latencies, 50):7.1f}ms | p95 {percentile(latencies, 95):7.1f}ms | "
+              f"p99 {percentile(latencies, 99):7.1f}ms | 에러 {window['errors']} | 대기 {backlog}")
+        state["reported"] = index + 1
+
+    async def reporter():
+        while True:
+            index = state["reported"]
+            await asyncio.sleep(max(0.0, start + (index + 1) * report_interval - time.perf_counter()))
+            report(index, report_interval)
+
+    report_task = asyncio.create_task(reporter())
+    await asyncio.gather(scheduler(), *(worker() for _ in range(workers)))
+    report_task.cancel()
+    elapsed = time.perf_counter() - start
+
+    # 아직 출력하지 않은 마지막 구간(덜 찬 구간 포함)까지 출력 - 구간 길이만큼으로 qps 계산
+    for index in range(state["reported"], int(elapsed / report_interval) + 1):
+        span = min(report_interval, elapsed - index * report_interval)
+        if span > 0:
+            report(index, span)
+
+    all_latencies = sorted(latency for stats in by_name.values() for latency in stats["latencies"])
+    return {
+        "sent": state["sent"],
+        "completed": state["completed"],
+        "elapsed": elapsed,
+        "achieved_qps": state["completed"] / elapsed if elapsed else 0.0,
+        "error_count": sum(errors.values()),
+        "errors": errors,
+        "latency": {p: percentile(all_latencies, p) for p in (50, 90, 95, 99, 99.9)},
+        "by_name": {
+            name: {
+                "count": len(stats["latencies"]) + stats["errors"],
+                "errors": stats["errors"],
+                "p50": percentile(sorted(stats["latencies"]), 50),
+                "p99": percentile(sorted(stats["latencies"]), 99)
+            }
+            for name, stats in by_name.items()
+        }
+    }
+
+def display_summary(report, target_qps):
+    print(f"📨 요청 {report['sent']:,}건 / 완료 {report['completed']:,}건 ({report['elapsed']:.1f}초)")
+    print(f"🎯 목표 {target_qps:g} qps → 달성 {report['achieved_qps']:.1f} qps")
+    error_rate = report["error_count"] / report["completed"] if report["completed"] else 0.0
+    print(f"❌ 에러 {report['error_count']:,}건 ({error_rate:.2%})" +
+          (f" - {report['errors']}" if report["errors"] else ""))
+    print("⏱️  지연시간: " + " | ".join(f"p{p:g} {value:.1f}ms" for p, value in report["latency"].items()))
+
+    print("\n📋 워크로드별:")
+    for name, stats in report["by_name"].items():
+        print(f"   {name:>18}: {stats['count']:6,}건, 에러 {stats['errors']:,} | p50 {stats['p50']:.1f}ms | p99 {stats['p99']:.1f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="검색 부하 생성기 (open-loop)")
+    parser.add_argument("--qps", type=float, default=50, help="목표 초당 요청 수")
+    parser.add_argument("--duration", type=float, default=30, help="부하 시간 (초)")
+    parser.add_argument("--workers", type=int, default=64, help="동시 처리 워커 수")
+    parser.add_argument("--weights", help="워크로드 가중치 (예: search_text=40,facets=5)")
+    parser.add_argument("--poisson", action="store_true", help="요청 간격을 지수분포로 (실제 트래픽처럼 몰림 발생)")
+    parser.add_argument("--report-interval", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--retries", type=int, default=0, help="클라이언트 재시도 횟수 (기본 0 - 에러를 그대로 집계)")
+    parser.add_argument("--url", default=ES_URL)
+    parser.add_argument("--standin", action="store_true", help="로컬 대역 서버에 부하")
+    parser.add_argument("--standin-latency-ms", type=float, default=5.0)
+    parser.add_argument("--standin-error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    url = args.url
+    if args.standin:
+        server, url = start_standin_server(latency_ms=args.standin_latency_ms, error_rate=args.standin_error_rate)
+        print(f"🧪 대역 서버: {url} (평균 {args.standin_latency_ms:g}ms, 에러율 {args.standin_error_rate:.0%})")
+
+    weights = parse_weights(args.weights) if args.weights else DEFAULT_WEIGHTS
+
+    async def run():
+        execute, close, description = create_executor(url, args.workers, args.retries)
+        print_section(f"부하 시작: {args.qps:g} qps x {args.duration:g}초, 워커 {args.workers}개 ({description})")
+        try:
+            return await run_load(execute, weights, args.qps, args.duration, args.workers,
+                                  args.report_interval, args.poisson, args.seed)
+        finally:
+            await close()
+
+    report = asyncio.run(run())
+
+    print_section("부하 결과")
+    display_summary(report, args.qps)
+
+if __name__ == "__main__":
+    main()
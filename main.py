@@ -1,12 +1,62 @@
-from elasticsearch import Elasticsearch
+from es_client import es
+from index_versions import build_version, is_legacy_index
 import traceback
 import json
 
-# Elasticsearch 연결 설정
-es = Elasticsearch(
-    "http://localhost:9200",
-    basic_auth=("elastic", "OBIpKj46")
-)
+# books 인덱스 매핑
+BOOKS_MAPPING = {
+    "mappings": {
+        "properties": {
+            "title": {
+                "type": "text",
+                "analyzer": "standard"
+            },
+            "author": {
+                "type": "keyword"
+            },
+            "publish_date": {
+                "type": "date"
+            },
+            "price": {
+                "type": "float"
+            },
+            "pages": {
+                "type": "integer"
+            },
+            "description": {
+                "type": "text"
+            }
+        }
+    }
+}
+
+# 실습용 문서
+BOOKS = [
+    {
+        "title": "Python으로 배우는 머신러닝",
+        "author": "김철수",
+        "publish_date": "2023-01-15",
+        "price": 25000,
+        "pages": 450,
+        "description": "Python을 사용한 머신러닝 입문서"
+    },
+    {
+        "title": "Django 웹 개발",
+        "author": "이영희",
+        "publish_date": "2023-03-20",
+        "price": 30000,
+        "pages": 600,
+        "description": "Django를 이용한 웹 애플리케이션 개발"
+    },
+    {
+        "title": "Elasticsearch 완벽 가이드",
+        "author": "박민수",
+        "publish_date": "2023-05-10",
+        "price": 35000,
+        "pages": 800,
+        "description": "Elasticsearch 검색 엔진의 모든 것"
+    }
+]
 
 def print_section(title):
     print("\n" + "="*50)
@@ -27,80 +77,24 @@ def main():
             return
 
         # 2. 인덱스 생성
+        # 새 버전(books_v{n})을 만들어 채운 뒤 alias를 옮기므로 그동안 기존 books 검색은 계속 동작
         print_section("2. 인덱스 생성")
         index_name = "books"
         
-        # 인덱스가 이미 존재하는지 확인
-        if es.indices.exists(index=index_name):
-            print(f"📝 인덱스 '{index_name}'이(가) 이미 존재합니다. 삭제 후 재생성...")
-            es.indices.delete(index=index_name)
+        if is_legacy_index(es, index_name):
+            print(f"📝 '{index_name}'이(가) 실제 인덱스입니다. 새 버전을 채운 뒤 alias로 교체합니다...")
         
-        # 인덱스 생성 (매핑 설정)
-        mapping = {
-            "mappings": {
-                "properties": {
-                    "title": {
-                        "type": "text",
-                        "analyzer": "standard"
-                    },
-                    "author": {
-                        "type": "keyword"
-                    },
-                    "publish_date": {
-                        "type": "date"
-                    },
-                    "price": {
-                        "type": "float"
-                    },
-                    "pages": {
-                        "type": "integer"
-                    },
-                    "description": {
-                        "type": "text"
-                    }
-                }
-            }
-        }
-        
-        es.indices.create(index=index_name, body=mapping)
-        print(f"✅ 인덱스 '{index_name}' 생성 완료")
-
-        # 3. 문서 추가 (Indexing)
-        print_section("3. 문서 추가")
-        documents = [
-            {
-                "title": "Python으로 배우는 머신러닝",
-                "author": "김철수",
-                "publish_date": "2023-01-15",
-                "price": 25000,
-                "pages": 450,
-                "description": "Python을 사용한 머신러닝 입문서"
-            },
-            {
-                "title": "Django 웹 개발",
-                "author": "이영희",
-                "publish_date": "2023-03-20",
-                "price": 30000,
-                "pages": 600,
-                "description": "Django를 이용한 웹 애플리케이션 개발"
-            },
-            {
-                "title": "Elasticsearch 완벽 가이드",
-                "author": "박민수",
-                "publish_date": "2023-05-10",
-                "price": 35000,
-                "pages": 800,
-                "description": "Elasticsearch 검색 엔진의 모든 것"
-            }
-        ]
-        
-        for i, doc in enumerate(documents, 1):
-            es.index(index=index_name, id=i, body=doc)
-            print(f"📄 문서 {i} 추가: {doc['title']}")
+        with build_version(es, index_name, BOOKS_MAPPING) as version_index:
+            print(f"✅ 인덱스 '{version_index}' 생성 완료")
+
+            # 3. 문서 추가 (Indexing)
+            print_section("3. 문서 추가")
+            for i, doc in enumerate(BOOKS, 1):
+                es.index(index=version_index, id=i, body=doc)
+                print(f"📄 문서 {i} 추가: {doc['title']}")
         
-        # 인덱스 새로고침 (검색 가능하도록)
-        es.indices.refresh(index=index_name)
-        print("🔄 인덱스 새로고침 완료")
+        # 새로고침 + 예열 후 alias 전환까지 끝난 상태
+        print(f"🔀 alias '{index_name}' → '{version_index}' 전환 완료 (새로고침 / 예열 포함)")
 
         # 4. 문서 조회
         print_section("4. 문서 조회")
@@ -0,0 +1,687 @@
+#!/usr/bin/env python3
+"""
+오프라인 법령 검색 엔진 (Elasticsearch 없이 동작)
+- 포지션 포함 배열 기반 역색인 + BM25 점수 (numpy로 포스팅 단위 일괄 계산)
+- 메모리 매핑(mmap) 단일 파일 포맷 → 수 ms 안에 로드
+- search_legal_content가 사용하는 쿼리(match / match_phrase / bool / fuzziness, prefix_length)와
+  응답 형식(hits.hits[]._score, highlight ...)을 Elasticsearch와 동일하게 제공
+
+파일 구조 (모든 배열은 little-endian uint32, 4바이트 정렬):
+    MAGIC(4) | 헤더 길이(uint32) | 헤더 JSON | 섹션들...
+    term_offsets / term_blob      : 정렬된 텀 사전
+    post_start / post_docs / post_tf : 텀별 포스팅 (문서 번호, 텀 빈도)
+    pos_start / positions         : 포스팅별 포지션
+    doc_lengths                   : 문서별 토큰 수
+    text_offsets / text_blob      : 문서 원문 (하이라이트/조회용)
+"""
+
+from array import array
+from bisect import bisect_left
+import argparse
+import json
+import math
+import mmap
+import re
+import struct
+import sys
+import time
+
+import numpy as np
+
+from document_finder import _lower_preserving_offsets
+
+MAGIC = b"LGIX"
+FORMAT_VERSION = 1
+DEFAULT_INDEX_PATH = "legal_offline.idx"
+
+# BM25 파라미터 (Elasticsearch 기본값과 동일)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 구문 검색 위치 비교에 비트맵을 쓸 최대 범위 (bool 1바이트씩 → 16MB)
+PHRASE_BITMAP_MAX = 16 * 1024 * 1024
+
+SECTION_NAMES = [
+    "term_offsets", "term_blob", "post_start", "post_docs", "post_tf",
+    "pos_start", "positions", "doc_lengths", "text_offsets", "text_blob",
+]
+
+_WORD_RE = re.compile(r"\w+")
+
+def print_section(title):
+    print("\n" + "="*60)
+    print(f"🧳 {title}")
+    print("="*60)
+
+def _is_cjk(ch):
+    """한글/한자/가나 여부"""
+    code = ord(ch)
+    return (
+        0xAC00 <= code <= 0xD7AF      # 한글 음절
+        or 0x1100 <= code <= 0x11FF   # 한글 자모
+        or 0x3130 <= code <= 0x318F   # 한글 호환 자모
+        or 0x4E00 <= code <= 0x9FFF   # 한자
+        or 0x3040 <= code <= 0x30FF   # 히라가나/가타카나
+    )
+
+def tokenize(text):
+    """(토큰, 시작, 끝) 목록 - korean_analysis의 cjk_bigram 분석기와 같은 방식
+
+    한글/한자 연속 구간은 2글자씩(1글자 구간은 그대로), 나머지는 단어 단위로 자릅니다.
+    """
+    lowered = _lower_preserving_offsets(text)
+    tokens = []
+    for match in _WORD_RE.finditer(lowered):
+        word = match.group()
+        base = match.start()
+        run_start = 0
+        for i in range(1, len(word) + 1):
+            if i < len(word) and _is_cjk(word[i]) == _is_cjk(word[run_start]):
+                continue
+            run = word[run_start:i]
+            start = base + run_start
+            if _is_cjk(run[0]) and len(run) > 1:
+                for j in range(len(run) - 1):
+                    tokens.append((run[j:j + 2], start + j, start + j + 2))
+            else:
+                tokens.append((run, start, start + len(run)))
+            run_start = i
+    return tokens
+
+def split_articles(text, filename):
+    """법령 텍스트를 조문(제N조) 단위 문서로 분리"""
+    parts = re.split(r"(?=제\d+조(?:의\d+)?\s*\()", text)
+    documents = []
+    for part in parts:
+        part = part.strip()
+        if not part:
+            continue
+        title = part.split("\n", 1)[0][:60]
+        documents.append({"filename": filename, "title": title, "content": part})
+    return documents
+
+def _u32(values):
+    arr = array("I", values)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr.tobytes()
+
+def build_index(documents, path=DEFAULT_INDEX_PATH):
+    """문서 목록({"content", ...})으로 오프라인 인덱스 파일 생성"""
+    postings = {}  # term → {docnum: [positions]}
+    doc_lengths = []
+    texts = []
+    docs_meta = []
+
+    for docnum, doc in enumerate(documents):
+        content = doc["content"]
+        tokens = tokenize(content)
+        doc_lengths.append(len(tokens))
+        texts.append(content.encode("utf-8"))
+        docs_meta.append({
+            "_id": str(doc.get("_id", docnum)),
+            **{k: v for k, v in doc.items() if k not in ("_id", "content")},
+            "content_length": len(content)
+        })
+        for position, (token, _, _) in enumerate(tokens):
+            postings.setdefault(token, {}).setdefault(docnum, []).append(position)
+
+    terms = sorted(postings)
+    term_offsets, term_blob = [0], bytearray()
+    post_start, post_docs, post_tf = [0], [], []
+    pos_start, positions = [0], []
+    for term in terms:
+        term_blob += term.encode("utf-8")
+        term_offsets.append(len(term_blob))
+        for docnum in sorted(postings[term]):
+            doc_positions = postings[term][docnum]
+            post_docs.append(docnum)
+            post_tf.append(len(doc_positions))
+            positions.extend(doc_positions)
+            pos_start.append(len(positions))
+        post_start.append(len(post_docs))
+
+    text_offsets, text_blob = [0], bytearray()
+    for text in texts:
+        text_blob += text
+        text_offsets.append(len(text_blob))
+
+    sections = {
+        "term_offsets": _u32(term_offsets),
+        "term_blob": bytes(term_blob),
+        "post_start": _u32(post_start),
+        "post_docs": _u32(post_docs),
+        "post_tf": _u32(post_tf),
+        "pos_start": _u32(pos_start),
+        "positions": _u32(positions),
+        "doc_lengths": _u32(doc_lengths),
+        "text_offsets": _u32(text_offsets),
+        "text_blob": bytes(text_blob),
+    }
+
+    header = {
+        "version": FORMAT_VERSION,
+        "doc_count": len(doc_lengths),
+        "term_count": len(terms),
+        "avg_doc_length": (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0,
+        "docs": docs_meta,
+        "sections": {}
+    }
+
+    # 섹션 오프셋은 헤더 크기에 따라 달라지므로 고정점이 될 때까지 계산
+    header_bytes = b""
+    while True:
+        offset = len(MAGIC) + 4 + len(header_bytes)
+        offset += -offset % 4
+        layout = {}
+        for name in SECTION_NAMES:
+            layout[name] = [offset, len(sections[name])]
+            offset += len(sections[name])
+            offset += -offset % 4
+        header["sections"] = layout
+        new_header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        done = len(new_header_bytes) == len(header_bytes)
+        header_bytes = new_header_bytes
+        if done:
+            break
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for name in SECTION_NAMES:
+            start, _ = layout[name]
+            f.write(b"\0" * (start - f.tell()))
+            f.write(sections[name])
+
+    return header
+
+def _fuzzy_max_edits(term, fuzziness):
+    """Elasticsearch fuzziness 값 → 허용 편집 거리"""
+    if fuzziness in (None, 0, "0"):
+        return 0
+    if str(fuzziness).upper() == "AUTO":
+        if len(term) <= 2:
+            return 0
+        return 1 if len(term) <= 5 else 2
+    return int(fuzziness)
+
+def _edit_distance(a, b, max_edits, transpositions=True):
+    """a, b의 편집 거리 (max_edits를 넘으면 max_edits + 1에서 조기 종료)
+
+    transpositions=True면 인접 글자 자리바꿈도 한 번의 편집 (Elasticsearch fuzzy_transpositions 기본값)
+    """
+    if abs(len(a) - len(b)) > max_edits:
+        return max_edits + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if transpositions and i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > max_edits:
+            return max_edits + 1
+        before, previous = previous, current
+    return min(previous[-1], max_edits + 1)
+
+def _contains_sorted(sorted_values, values):
+    """정렬된 values 각각이 정렬된 배열 sorted_values에 있는지 (bool 배열)
+
+    values가 범위에 비해 많으면 비트맵 한 번 표시/조회 (O(n)), 적거나 범위가 PHRASE_BITMAP_MAX보다 넓으면 이진 탐색
+    """
+    if not len(sorted_values) or not len(values):
+        return np.zeros(len(values), dtype=bool)
+    lo, hi = int(values[0]), int(values[-1])
+    if hi - lo < min(PHRASE_BITMAP_MAX, len(values) * 512):
+        inside = sorted_values[np.searchsorted(sorted_values, lo):np.searchsorted(sorted_values, hi, side="right")]
+        bitmap = np.zeros(hi - lo + 1, dtype=bool)
+        bitmap[inside - lo] = True
+        return bitmap[values - lo]
+    found = np.minimum(np.searchsorted(sorted_values, values), len(sorted_values) - 1)
+    return sorted_values[found] == values
+
+class OfflineIndex:
+    """메모리 매핑된 오프라인 인덱스
+
+    Elasticsearch 클라이언트처럼 search(index=..., query=..., highlight=..., size=...)와
+    get(index=..., id=...)를 제공하므로 검색 코드가 백엔드를 구분하지 않아도 됩니다.
+    점수는 문서 수 크기의 numpy 배열(점수, 일치 여부)로 포스팅 단위 한 번에 계산합니다.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:4] != MAGIC:
+            raise ValueError(f"오프라인 인덱스 파일이 아닙니다: {path}")
+        (header_len,) = struct.unpack_from("<I", self._mmap, 4)
+        self.header = json.loads(self._mmap[8:8 + header_len])
+        if self.header["version"] != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 인덱스 버전: {self.header['version']}")
+
+        # 텀/원문은 memoryview, 나머지 uint32 섹션은 복사 없이 numpy 배열로
+        self._view = memoryview(self._mmap)
+        for name, (start, length) in self.header["sections"].items():
+            if name.endswith("_blob"):
+                section = self._view[start:start + length]
+            else:
+                section = np.frombuffer(self._mmap, dtype="<u4", count=length // 4, offset=start)
+            setattr(self, name, section)
+
+        self.docs = self.header["docs"]
+        self.doc_count = self.header["doc_count"]
+        self.term_count = self.header["term_count"]
+        self.avg_doc_length = self.header["avg_doc_length"] or 1.0
+        self._doc_ids = {doc["_id"]: docnum for docnum, doc in enumerate(self.docs)}
+        self._norms = None
+        self._fuzzy_terms = None
+        self._fuzzy_cache = {}
+        self._term_ids = {}
+
+    def close(self):
+        # numpy 배열이 mmap 버퍼를 잡고 있으면 close가 실패하므로 참조부터 끊음
+        for name in SECTION_NAMES:
+            section = getattr(self, name)
+            if isinstance(section, memoryview):
+                section.release()
+            setattr(self, name, None)
+        self._view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def ping(self):
+        return True
+
+    # --- 텀 사전 ---
+
+    def _term(self, i):
+        return bytes(self.term_blob[self.term_offsets[i]:self.term_offsets[i + 1]]).decode("utf-8")
+
+    def _find_term(self, term):
+        """텀 번호 (없으면 -1) - 정렬된 사전에서 이진 탐색, 찾은 결과는 기억해 둠"""
+        if term not in self._term_ids:
+            lo = bisect_left(range(self.term_count), term, key=self._term)
+            self._term_ids[term] = lo if lo < self.term_count and self._term(lo) == term else -1
+        return self._term_ids[term]
+
+    def _fuzzy_lookup(self):
+        """퍼지 확장용 (텀 목록, 텀 길이 배열, 글자 → 그 글자를 가진 텀 번호 배열) - 처음 필요할 때 한 번 생성"""
+        if self._fuzzy_terms is None:
+            offsets = self.term_offsets.tolist()
+            blob = bytes(self.term_blob)
+            terms = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(self.term_count)]
+            by_char = {}
+            for term_id, term in enumerate(terms):
+                for ch in set(term):
+                    by_char.setdefault(ch, []).append(term_id)
+            self._fuzzy_terms = (
+                terms,
+                np.array([len(term) for term in terms], dtype=np.int32),
+                {ch: np.array(ids, dtype=np.int32) for ch, ids in by_char.items()},
+            )
+        return self._fuzzy_terms
+
+    def _expand_fuzzy(self, term, max_edits, prefix_length=0, max_expansions=50, transpositions=True):
+        """편집 거리 max_edits 이내의 텀 번호 (Elasticsearch fuzzy와 같은 의미)
+
+        - prefix_length: 앞 몇 글자는 정확히 일치해야 하는지 (기본 0 = 첫 글자부터 오타 허용)
+        - max_expansions: 편집 거리가 가까운 순으로 이 개수까지만 사용
+        후보는 길이 차이가 max_edits 이내이고, 검색어의 서로 다른 글자 중
+        (개수 - max_edits)개 이상을 가진 텀으로 먼저 좁힌 뒤 편집 거리를 계산합니다.
+        """
+        if max_edits == 0:
+            found = self._find_term(term)
+            return [found] if found >= 0 else []
+
+        cache_key = (term, max_edits, prefix_length, max_expansions, transpositions)
+        if cache_key in self._fuzzy_cache:
+            return self._fuzzy_cache[cache_key]
+
+        terms, lengths, by_char = self._fuzzy_lookup()
+        chars = set(term)
+        shared = np.zeros(self.term_count, dtype=np.int32)
+        for ch in chars:
+            if ch in by_char:
+                shared[by_char[ch]] += 1
+        candidate = (np.abs(lengths - len(term)) <= max_edits) & (shared >= len(chars) - max_edits)
+        prefix = term[:prefix_length]
+        if prefix:
+            lo = bisect_left(terms, prefix)
+            hi = bisect_left(terms, prefix + "\U0010ffff", lo)
+            candidate[:lo] = False
+            candidate[hi:] = False
+
+        matches = []
+        for term_id in np.flatnonzero(candidate).tolist():
+            distance = _edit_distance(term, terms[term_id], max_edits, transpositions)
+            if distance <= max_edits:
+                matches.append((distance, term_id))
+        matches = [term_id for _, term_id in sorted(matches)[:max_expansions]]
+        self._fuzzy_cache[cache_key] = matches
+        return matches
+
+    def _match_terms(self, spec, token):
+        """match 쿼리 토큰 하나 → 확장된 텀 번호 목록"""
+        return self._expand_fuzzy(
+            token,
+            _fuzzy_max_edits(token, spec.get("fuzziness")),
+            prefix_length=spec.get("prefix_length", 0),
+            max_expansions=spec.get("max_expansions", 50),
+            transpositions=spec.get("fuzzy_transpositions", True),
+        )
+
+    # --- 점수 계산 ---
+
+    def _idf(self, doc_freq):
+        return math.log(1 + (self.doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def _bm25(self, tf, docnums, idf):
+        """tf / 문서 번호 배열 → BM25 점수 배열"""
+        return idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * self._length_norms()[docnums])
+
+    def _empty(self):
+        return np.zeros(self.doc_count), np.zeros(self.doc_count, dtype=bool)
+
+    def _term_scores(self, term_ids):
+        """텀(들)에 대한 문서별 BM25 (점수, 일치) 배열 (퍼지 확장 텀은 최고 점수만 사용)"""
+        scores, matched = self._empty()
+        for term_id in term_ids:
+            start, end = int(self.post_start[term_id]), int(self.post_start[term_id + 1])
+            docnums = self.post_docs[start:end]
+            term_scores = self._bm25(self.post_tf[start:end].astype(np.float64), docnums, self._idf(end - start))
+            np.maximum.at(scores, docnums, term_scores)
+            matched[docnums] = True
+        return scores, matched
+
+    def _length_norms(self):
+        """문서별 BM25 길이 정규화 값 (처음 필요할 때 한 번 계산)"""
+        if self._norms is None:
+            self._norms = 1 - BM25_B + BM25_B * self.doc_lengths / self.avg_doc_length
+        return self._norms
+
+    # --- 쿼리 ---
+
+    def _match(self, spec):
+        if isinstance(spec, str):
+            spec = {"query": spec}
+        boost = spec.get("boost", 1.0)
+        operator = spec.get("operator", "or").lower()
+
+        clauses = [self._term_scores(self._match_terms(spec, token)) for token, _, _ in tokenize(spec["query"])]
+        if not clauses:
+            return self._empty()
+        scores = boost * np.sum([clause_scores for clause_scores, _ in clauses], axis=0)
+        combine = np.logical_and if operator == "and" else np.logical_or
+        matched = combine.reduce([clause_matched for _, clause_matched in clauses])
+        return np.where(matched, scores, 0.0), matched
+
+    def _phrase_keys(self, term_id, offset, stride):
+        """텀의 모든 출현을 (문서 번호 * stride + 포지션 - offset) 정렬 배열로
+
+        한 텀의 포지션은 파일에서 문서 순으로 이어져 있으므로 구간 하나를 그대로 읽습니다.
+        """
+        start, end = int(self.post_start[term_id]), int(self.post_start[term_id + 1])
+        bounds = self.pos_start[start:end + 1].astype(np.int64)
+        bases = self.post_docs[start:end].astype(np.int64) * stride - offset
+        return np.repeat(bases, np.diff(bounds)) + self.positions[bounds[0]:bounds[-1]]
+
+    def _match_phrase(self, spec):
+        if isinstance(spec, str):
+            spec = {"query": spec}
+        boost = spec.get("boost", 1.0)
+
+        term_ids = [self._find_term(token) for token, _, _ in tokenize(spec["query"])]
+        if not term_ids or min(term_ids) < 0:
+            return self._empty()
+
+        # 출현 횟수가 가장 적은 텀의 (문서, 구문 시작 위치)에서 시작해
+        # 나머지 텀이 offset만큼 뒤에 있는 것만 남김 (출현 횟수는 pos_start 차이로 바로 알 수 있음)
+        stride = int(self.doc_lengths.max()) + len(term_ids)
+        occurrences = [
+            int(self.pos_start[self.post_start[term_id + 1]]) - int(self.pos_start[self.post_start[term_id]])
+            for term_id in term_ids
+        ]
+        order = sorted(range(len(term_ids)), key=occurrences.__getitem__)
+        starts = self._phrase_keys(term_ids[order[0]], order[0], stride)
+        for offset in order[1:]:
+            starts = starts[_contains_sorted(self._phrase_keys(term_ids[offset], offset, stride), starts)]
+            if not len(starts):
+                return self._empty()
+
+        phrase_freq = np.bincount(starts // stride, minlength=self.doc_count)
+        matched = phrase_freq > 0
+        idf = sum(self._idf(int(self.post_start[term_id + 1] - self.post_start[term_id])) for term_id in term_ids)
+        scores = np.zeros(self.doc_count)
+        scores[matched] = boost * self._bm25(phrase_freq[matched].astype(np.float64), matched, idf)
+        return scores, matched
+
+    def _bool(self, spec):
+        must = [self._evaluate(clause) for clause in spec.get("must", [])]
+        must += [(np.zeros(self.doc_count), matched)
+                 for _, matched in (self._evaluate(clause) for clause in spec.get("filter", []))]
+        should = [self._evaluate(clause) for clause in spec.get("should", [])]
+
+        if must:
+            matched = np.logical_and.reduce([clause_matched for _, clause_matched in must])
+        elif should:
+            matched = np.logical_or.reduce([clause_matched for _, clause_matched in should])
+        else:
+            return self._empty()
+
+        scores = np.sum([clause_scores for clause_scores, _ in must + should], axis=0)
+        return np.where(matched, scores, 0.0), matched
+
+    def _evaluate(self, query):
+        """쿼리 DSL 일부(match, match_phrase, bool, match_all) 평가 → (문서별 점수, 일치 여부) 배열"""
+        (query_type, spec), = query.items()
+        if query_type == "match_all":
+            return np.ones(self.doc_count), np.ones(self.doc_count, dtype=bool)
+        if query_type == "bool":
+            return self._bool(spec)
+
+        # 오프라인 인덱스는 본문(content) 필드 하나만 가짐
+        (_, field_spec), = spec.items()
+        if query_type == "match":
+            return self._match(field_spec)
+        if query_type == "match_phrase":
+            return self._match_phrase(field_spec)
+        raise ValueError(f"오프라인 검색에서 지원하지 않는 쿼리: {query_type}")
+
+    def _document_text(self, docnum):
+        return bytes(self.text_blob[self.text_offsets[docnum]:self.text_offsets[docnum + 1]]).decode("utf-8")
+
+    def _highlight(self, text, query_tokens, field_spec):
+        """검색어 토큰 위치를 기준으로 하이라이트 조각 생성"""
+        fragment_size = field_spec.get("fragment_size", 100)
+        number_of_fragments = field_spec.get("number_of_fragments", 5)
+        pre_tag = field_spec.get("pre_tags", ["<em>"])[0]
+        post_tag = field_spec.get("post_tags", ["</em>"])[0]
+
+        # 겹치거나 맞닿은 토큰(bigram)은 하나의 구간으로 합침: 【스토】【킹범】 → 【스토킹범죄】
+        spans = []
+        for token, start, end in tokenize(text):
+            if token not in query_tokens:
+                continue
+            if spans and start <= spans[-1][1]:
+                spans[-1] = (spans[-1][0], max(end, spans[-1][1]))
+            else:
+                spans.append((start, end))
+        fragments = []
+        last_end = -1
+        for start, end in spans:
+            if start < last_end:
+                continue
+            frag_start = max(0, start - fragment_size // 2)
+            frag_end = min(len(text), frag_start + fragment_size)
+            inner = [(s, e) for s, e in spans if s >= frag_start and e <= frag_end]
+            pieces, cursor = [], frag_start
+            for s, e in inner:
+                if s < cursor:
+                    continue
+                pieces.append(text[cursor:s] + pre_tag + text[s:e] + post_tag)
+                cursor = e
+            pieces.append(text[cursor:frag_end])
+            fragments.append("".join(pieces))
+            last_end = frag_end
+            if len(fragments) >= number_of_fragments:
+                break
+        return fragments
+
+    def _query_terms(self, query):
+        """하이라이트용으로 쿼리 안의 모든 검색어 텀 수집 (퍼지 확장으로 찾은 텀 포함)"""
+        (query_type, spec), = query.items()
+        if query_type == "bool":
+            terms = set()
+            for key in ("must", "should", "filter"):
+                for clause in spec.get(key, []):
+                    terms |= self._query_terms(clause)
+            return terms
+        if query_type not in ("match", "match_phrase"):
+            return set()
+        (_, field_spec), = spec.items()
+        if isinstance(field_spec, str):
+            field_spec = {"query": field_spec}
+        tokens = {token for token, _, _ in tokenize(field_spec["query"])}
+        if query_type == "match" and field_spec.get("fuzziness"):
+            for token in list(tokens):
+                tokens.update(self._term(term_id) for term_id in self._match_terms(field_spec, token))
+        return tokens
+
+    def _source(self, docnum, includes=None, excludes=None):
+        source = {k: v for k, v in self.docs[docnum].items() if k != "_id"}
+        if includes is None or "content" in includes:
+            source["content"] = self._document_text(docnum)
+        if includes is not None:
+            source = {k: v for k, v in source.items() if k in includes}
+        for key in excludes or []:
+            source.pop(key, None)
+        return source
+
+    def search(self, index=None, query=None, size=10, highlight=None,
+               source_excludes=None, source_includes=None, body=None, **kwargs):
+        """Elasticsearch search()와 같은 형식의 응답 반환"""
+        start = time.perf_counter()
+        if body is not None:
+            query = body.get("query", query)
+            size = body.get("size", size)
+            highlight = body.get("highlight", highlight)
+        query = query or {"match_all": {}}
+
+        scores, matched = self._evaluate(query)
+        # 점수 내림차순, 같은 점수는 문서 번호 순 (상위 size개 경계 점수 이상만 골라서 정렬)
+        docnums = np.flatnonzero(matched)
+        top_docs = docnums
+        if 0 < size < len(docnums):
+            candidate_scores = scores[docnums]
+            cutoff = np.partition(candidate_scores, len(docnums) - size)[len(docnums) - size]
+            top_docs = docnums[candidate_scores >= cutoff]
+        ranked_docs = top_docs[np.argsort(-scores[top_docs], kind="stable")[:size]]
+        ranked = [(docnum, float(scores[docnum])) for docnum in ranked_docs.tolist()]
+
+        query_tokens = self._query_terms(query) if highlight else set()
+
+        hits = []
+        for docnum, score in ranked:
+            hit = {
+                "_index": index,
+                "_id": self.docs[docnum]["_id"],
+                "_score": score,
+                "_seq_no": 0,
+                "_primary_term": 1,
+                "_source": self._source(docnum, source_includes, source_excludes),
+            }
+            if highlight:
+                text = self._document_text(docnum)
+                hit["highlight"] = {}
+                for field, field_spec in highlight.get("fields", {}).items():
+                    fragments = self._highlight(text, query_tokens, field_spec)
+                    if fragments:
+                        hit["highlight"][field] = fragments
+            hits.append(hit)
+
+        return {
+            "took": int((time.perf_counter() - start) * 1000),
+            "timed_out": False,
+            "hits": {
+                "total": {"value": len(docnums), "relation": "eq"},
+                "max_score": ranked[0][1] if ranked else None,
+                "hits": hits
+            }
+        }
+
+    def get(self, index=None, id=None, source_includes=None, **kwargs):
+        """Elasticsearch get()과 같은 형식으로 문서 반환"""
+        docnum = self._doc_ids[str(id)]
+        return {
+            "_index": index,
+            "_id": str(id),
+            "found": True,
+            "_seq_no": 0,
+            "_primary_term": 1,
+            "_source": self._source(docnum, source_includes)
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 법령 검색")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="PDF에서 오프라인 인덱스 생성")
+    build_parser.add_argument("pdf_paths", nargs="+")
+    build_parser.add_argument("--output", default=DEFAULT_INDEX_PATH)
+
+    search_parser = subparsers.add_parser("search", help="오프라인 인덱스 검색")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--index", default=DEFAULT_INDEX_PATH)
+    search_parser.add_argument("--size", type=int, default=5)
+    search_parser.add_argument("--prefix-length", type=int, default=0, help="오타를 허용하지 않을 앞 글자 수 (Elasticsearch 기본 0)")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        from pdf_legal_search_fixed import extract_text_from_pdf
+
+        print_section("오프라인 인덱스 생성")
+        documents = []
+        for pdf_path in args.pdf_paths:
+            text = extract_text_from_pdf(pdf_path)
+            if text:
+                documents.extend(split_articles(text, pdf_path))
+
+        start = time.perf_counter()
+        header = build_index(documents, args.output)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"✅ {args.output}: 문서 {header['doc_count']:,}개, 텀 {header['term_count']:,}개 ({elapsed_ms:.0f}ms)")
+        return
+
+    start = time.perf_counter()
+    index = OfflineIndex(args.index)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    query = args.query
+    if query.startswith('"') and query.endswith('"'):
+        search_query = {"match_phrase": {"content": query.strip('"')}}
+    else:
+        search_query = {"match": {"content": {"query": query, "fuzziness": "AUTO", "prefix_length": args.prefix_length}}}
+
+    start = time.perf_counter()
+    result = index.search(
+        query=search_query,
+        size=args.size,
+        highlight={"fields": {"content": {"fragment_size": 120, "number_of_fragments": 2,
+                                          "pre_tags": ["【"], "post_tags": ["】"]}}}
+    )
+    search_ms = (time.perf_counter() - start) * 1000
+
+    print(f"📂 로드 {load_ms:.2f}ms / 검색 {search_ms:.2f}ms - {result['hits']['total']['value']}건")
+    for i, hit in enumerate(result["hits"]["hits"], 1):
+        print(f"\n📋 {i}. {hit['_source'].get('title', hit['_id'])} (관련도: {hit['_score']:.2f})")
+        for fragment in hit.get("highlight", {}).get("content", []):
+            print(f"   💡 {fragment}")
+
+    index.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+멀티 프로세스 벌크 로더
+- 전체 문서를 블록 단위 파티션으로 나눠 프로세스 풀에 분배
+- 각 워커는 (seed, partition, partition_count)로 자기 몫의 문서를 직접 생성해 _bulk로 전송
+  → 워커끼리 _id 범위가 겹치지 않고, 같은 seed면 몇 개 프로세스로 나눠도 같은 데이터
+- 문서는 sample_data의 NDJSON 블록을 그대로 잘라서 보냄 (dict 변환 / 직렬화 없음)
+- 로딩하는 동안 refresh를 끄고, 끝나면 원래 설정으로 되돌린 뒤 refresh
+- 전송은 bulk_retry.bulk_with_retry - 429 / 타임아웃은 백오프 후 재시도, 영구 실패는 dead-letter 파일로
+"""
+
+from es_client import ES_URL, create_client, es
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager
+import argparse
+import os
+import time
+
+import numpy as np
+
+from bulk_retry import DEAD_LETTER_PATH, DeadLetterWriter, bulk_with_retry, merge_stats, new_stats
+from index_versions import IncompleteLoadError, build_version, ensure_complete
+from sample_data import BLOCK_SIZE, DEFAULT_END_DATE, END_DATE_HELP, iter_ndjson_blocks, parse_end_date, partition_range
+
+DOCS_PER_REQUEST = 5000
+
+def print_section(title):
+    print("\n" + "="*60)
+    print(f"🚚 {title}")
+    print("="*60)
+
+def split_bulk_body(block, docs_per_request=DOCS_PER_REQUEST, lines_per_doc=2):
+    """NDJSON 블록을 문서 경계에서 docs_per_request개씩 잘라 → (요청 본문, 문서 수)"""
+    newlines = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord("\n"))
+    doc_ends = (newlines[lines_per_doc - 1::lines_per_doc] + 1).tolist()
+    start = 0
+    for first in range(0, len(doc_ends), docs_per_request):
+        last = min(first + docs_per_request, len(doc_ends))
+        end = doc_ends[last - 1]
+        yield block[start:end], last - first
+        start = end
+
+def send_bodies(client, bodies, index_name=None, concurrency=8, dead_letter=None):
+    """(본문, 문서 수) 스트림을 스레드 concurrency개로 동시에 _bulk 전송 → 통계 dict
+
+    index_name을 주면 /{index}/_bulk로 보냄 (액션 줄에 _index가 없는 덤프용).
+    본문은 bytes 그대로 보내므로 스레드는 대부분 응답을 기다리는 동안 GIL을 놓고 있습니다.
+    대기 중인 요청은 concurrency x 2개까지만 두어 입력을 미리 다 읽어 쌓아 두지 않습니다.
+    """
+    dead_letter = dead_letter or DeadLetterWriter()
+    stats = {**new_stats(), "send_seconds": 0.0}
+
+    def send(body):
+        started = time.perf_counter()
+        result = bulk_with_retry(client, body, index_name, dead_letter)
+        result["send_seconds"] = time.perf_counter() - started
+        return result
+
+    def collect(futures):
+        for future in futures:
+            result = future.result()
+            merge_stats(stats, result)
+            stats["send_seconds"] += result["send_seconds"]
+
+    pending = set()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for body, docs in bodies:
+            if len(pending) >= concurrency * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending.add(pool.submit(send, body))
+        collect(wait(pending).done)
+    return stats
+
+_client = None
+
+def _get_client(url):
+    """워커 프로세스마다 클라이언트 하나 (fork된 연결을 공유하지 않도록 새로 생성)"""
+    global _client
+    if _client is None:
+        _client = create_client(url, request_timeout=120)
+    return _client
+
+def load_partition(task):
+    """워커: 파티션 하나를 생성해서 전송 → 통계 dict"""
+    start, stop = partition_range(task["count"], task["partition"], task["partition_count"], task["block_size"])
+    stats = {
+        **new_stats(),
+        "partition": task["partition"],
+        "id_range": (task["start_id"] + start, task["start_id"] + stop - 1),
+        "generate_seconds": 0.0, "send_seconds": 0.0, "pid": os.getpid()
+    }
+    client = None if task["dry_run"] else _get_client(task["url"])
+    dead_letter = DeadLetterWriter(task["dead_letter"])
+
+    blocks = iter_ndjson_blocks(
+        task["count"], task["seed"], task["index_name"], task["start_id"], task["block_size"],
+        end_date=task["end_date"], partition=task["partition"], partition_count=task["partition_count"]
+    )
+    while True:
+        started = time.perf_counter()
+        block = next(blocks, None)
+        stats["generate_seconds"] += time.perf_counter() - started
+        if block is None:
+            return stats
+
+        for body, docs in split_bulk_body(block, task["docs_per_request"]):
+            if client is None:
+                stats["docs"] += docs
+                stats["bytes"] += len(body)
+                continue
+            started = time.perf_counter()
+            merge_stats(stats, bulk_with_retry(client, body, dead_letter=dead_letter))
+            stats["send_seconds"] += time.perf_counter() - started
+
+@contextmanager
+def bulk_load_settings(client, index_name):
+    """로딩하는 동안 refresh 끄기 → 끝나면 원래 값으로 되돌리고 refresh"""
+    current = client.indices.get_settings(index=index_name, name="index.refresh_interval")
+    previous = {name: value.get("settings", {}).get("index", {}).get("refresh_interval") for name, value in current.items()}
+    client.indices.put_settings(index=index_name, settings={"index": {"refresh_interval": "-1"}})
+    try:
+        yield
+    finally:
+        for name, interval in previous.items():
+            client.indices.put_settings(index=name, settings={"index": {"refresh_interval": interval}})
+        client.indices.refresh(index=index_name)
+
+def run_parallel_load(count, seed, index_name="tech_books", workers=None, partitions=None,
+                      url=ES_URL, docs_per_request=DOCS_PER_REQUEST, block_size=BLOCK_SIZE,
+                      start_id=1, end_date=None, dry_run=False, dead_letter_path=DEAD_LETTER_PATH):
+    """프로세스 풀로 파티션별 생성 + 벌크 인덱싱 → 전체 요약 dict
+
+    partitions는 작업 단위 수 (기본 워커 수 x 4 - 먼저 끝난 워커가 남은 파티션을 가져감).
+    end_date는 여기서 한 번 정해서 모든 워커에 같은 값을 넘깁니다.
+    """
+    workers = workers or os.cpu_count() or 1
+    partitions = partitions or workers * 4
+    base = {
+        "count": count, "seed": seed, "index_name": index_name, "start_id": start_id,
+        "block_size": block_size, "docs_per_request": docs_per_request,
+        "end_date": end_date or DEFAULT_END_DATE, "partition_count": partitions,
+        "url": url, "dry_run": dry_run, "dead_letter": dead_letter_path
+    }
+
+    results = []
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(load_partition, {**base, "partition": p}) for p in range(partitions)]
+        for future in as_completed(futures):
+            stats = future.result()
+            results.append(stats)
+            if stats["docs"] or stats["dead"]:
+                print(f"   ✅ 파티션 {stats['partition']:3d} (pid {stats['pid']}) "
+                      f"_id {stats['id_range'][0]:,}~{stats['id_range'][1]:,}: {stats['docs']:,}건, "
+                      f"재시도 {stats['retried']}, dead-letter {stats['dead']}")
+    elapsed = time.perf_counter() - started
+
+    return {
+        "workers": workers,
+        "partitions": partitions,
+        "elapsed": elapsed,
+        "docs": sum(r["docs"] for r in results),
+        "bytes": sum(r["bytes"] for r in results),
+        "requests": sum(r["requests"] for r in results),
+        "retried": sum(r["retried"] for r in results),
+        "dead": sum(r["dead"] for r in results),
+        "errors": [e for r in results for e in r["errors"]][:5],
+        "dead_letter": dead_letter_path,
+        "generate_seconds": sum(r["generate_seconds"] for r in results),
+        "send_seconds": sum(r["send_seconds"] for r in results),
+        "processes": len({r["pid"] for r in results})
+    }
+
+def display_summary(summary):
+    elapsed = summary["elapsed"]
+    print(f"📄 문서 {summary['docs']:,}건, {summary['bytes'] / 1024 / 1024:,.1f}MB, 요청 {summary['requests']:,}회, {elapsed:.2f}초")
+    print(f"⚡ {summary['docs'] / elapsed:,.0f} docs/s, {summary['bytes'] / 1024 / 1024 / elapsed:,.1f}MB/s "
+          f"(워커 {summary['workers']}개, 실제 사용 프로세스 {summary['processes']}개, 파티션 {summary['partitions']}개)")
+    print(f"⏱️  워커 누적: 생성 {summary['generate_seconds']:.2f}초 / 전송 {summary['send_seconds']:.2f}초")
+    if summary["retried"]:
+        print(f"♻️  재시도 {summary['retried']:,}건 (429 / 타임아웃)")
+    if summary["dead"]:
+        print(f"❌ dead-letter {summary['dead']:,}건 → {summary['dead_letter']} (python bulk_retry.py replay --index <인덱스>)")
+        for error in summary["errors"]:
+            print(f"   - [{error['status']}] {error['error']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="멀티 프로세스 샘플 데이터 벌크 로더")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--index", default="tech_books")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--partitions", type=int, help="작업 단위 수 (기본 워커 수 x 4)")
+    parser.add_argument("--docs-per-request", type=int, default=DOCS_PER_REQUEST)
+    parser.add_argument("--end-date", type=parse_end_date, help=END_DATE_HELP)
+    parser.add_argument("--url", default=ES_URL)
+    parser.add_argument("--recreate", action="store_true", help="bulk_operations 매핑으로 새 버전(<index>_v{n})에 로딩한 뒤 alias 전환")
+    parser.add_argument("--dry-run", action="store_true", help="전송 없이 생성만 (생성 속도 측정)")
+    args = parser.parse_args()
+
+    print_section(f"병렬 벌크 로딩 ({args.index}, {args.count:,}건)")
+
+    if args.dry_run:
+        display_summary(run_parallel_load(
+            args.count, args.seed, args.index, args.workers, args.partitions,
+            docs_per_request=args.docs_per_request, end_date=args.end_date, dry_run=True
+        ))
+        return
+
+    client = es if args.url == ES_URL else create_client(args.url)
+    if not client.ping():
+        print("❌ Elasticsearch 연결 실패")
+        return
+
+    if args.recreate:
+        # 새 버전은 처음부터 refresh 끔 / 복제본 0으로 만들어지고, 로딩이 끝나면 설정 복원 + 예열 + alias 전환
+        from bulk_operations import build_index_settings
+        try:
+            with build_version(client, args.index, build_index_settings(client)) as version_index:
+                print(f"🏗️ '{version_index}' 인덱스 생성 완료 (alias '{args.index}'는 로딩이 끝나면 전환)")
+                summary = run_parallel_load(
+                    args.count, args.seed, version_index, args.workers, args.partitions, args.url,
+                    args.docs_per_request, end_date=args.end_date
+                )
+                # dead-letter가 있거나 문서가 모자라면 전환하지 않고 새 버전 삭제
+                ensure_complete(summary, args.count)
+        except IncompleteLoadError as e:
+            display_summary(summary)
+            print(f"❌ 로딩 미완료: {e} → '{version_index}' 삭제, alias '{args.index}'는 기존 버전 유지")
+            return
+        print(f"🔀 alias '{args.index}' → '{version_index}' 전환 완료")
+    elif not client.indices.exists(index=args.index):
+        print(f"❌ '{args.index}' 인덱스가 존재하지 않습니다. (--recreate로 생성)")
+        return
+    else:
+        with bulk_load_settings(client, args.index):
+            summary = run_parallel_load(
+                args.count, args.seed, args.index, args.workers, args.partitions, args.url,
+                args.docs_per_request, end_date=args.end_date
+            )
+    display_summary(summary)
+    print(f"📊 인덱스 문서 수: {client.count(index=args.index)['count']:,}개")
+
+    print_section("✅ 병렬 벌크 로딩 완료!")
+
+if __name__ == "__main__":
+    main()
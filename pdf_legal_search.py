@@ -1,4 +1,4 @@
-from elasticsearch import Elasticsearch
+from es_client import es
 import base64
 import os
 import json
@@ -6,12 +6,26 @@ import traceback
 from pathlib import Path
 import re
 from datetime import datetime
+import time
+from collections import OrderedDict
+from highlighting import build_highlight
+from index_versions import abandon_version, create_version, promote_version
+from korean_analysis import build_korean_analysis
+from legal_live_search import main as live_search_main
+from query_profiler import resolve_profile_mode, print_profile_report
+from search_history import load_history, save_history, record_query, top_queries
 
-# Elasticsearch 연결 설정
-es = Elasticsearch(
-    "http://localhost:9200",
-    basic_auth=("elastic", "OBIpKj46")
-)
+# 법령 인덱스 주 샤드 수
+LEGAL_INDEX_SHARDS = 3
+
+# 검색은 alias로, 실제 데이터는 legal_documents_v{n}에
+LEGAL_INDEX = "legal_documents"
+
+# 검색 결과 캐시: (alias, 검색어, 검색 방식, 분류) → (저장 시각, 응답)
+# 오래된 것부터 밀어내는 LRU, 다른 프로세스가 alias를 바꿔도 TTL이 지나면 새로 조회
+SEARCH_CACHE_SIZE = int(os.environ.get("ES_SEARCH_CACHE_SIZE", "256"))
+SEARCH_CACHE_TTL_SECONDS = float(os.environ.get("ES_SEARCH_CACHE_TTL", "60"))
+_search_cache = OrderedDict()
 
 def print_section(title):
     print("\n" + "="*60)
@@ -83,36 +97,72 @@ def create_legal_pipeline():
     es.ingest.put_pipeline(id="legal_attachment", body=pipeline)
     print("✅ 법령 전용 파이프라인 생성 완료")
 
-def create_legal_index():
-    """법령 문서 전용 인덱스 생성"""
-    index_name = "legal_documents"
-    
-    # 기존 인덱스 삭제
-    if es.indices.exists(index=index_name):
-        es.indices.delete(index=index_name)
-        print(f"🗑️ 기존 인덱스 '{index_name}' 삭제")
+def build_legal_index_body(client=es):
+    """법령 인덱스 설정 / 매핑"""
+    # 한국어 분석기 (nori 플러그인이 있으면 nori, 없으면 cjk_bigram)
+    analysis = build_korean_analysis(client, "legal_analyzer")
     
     # 법령 검색에 최적화된 매핑 설정
-    mapping = {
+    return {
         "settings": {
+            # legal_category 라우팅으로 분류별 문서가 한 샤드에 모이므로 분류 검색은 샤드 하나만 조회
+            "number_of_shards": LEGAL_INDEX_SHARDS,
             "analysis": {
                 "analyzer": {
-                    "legal_analyzer": {
+                    **analysis["analyzer"],
+                    "exact_match": {
+                        "type": "keyword"
+                    },
+                    # 어형 변화 없이 원문 그대로의 단어로 구문 일치 (exact 서브필드용)
+                    "legal_exact_analyzer": {
                         "type": "custom",
                         "tokenizer": "standard",
                         "filter": [
-                            "lowercase",
-                            "stop",
-                            "snowball"
+                            "cjk_width",
+                            "lowercase"
                         ]
                     },
-                    "exact_match": {
-                        "type": "keyword"
+                    "legal_ngram_analyzer": {
+                        "type": "custom",
+                        "tokenizer": "legal_bigram_tokenizer",
+                        "filter": [
+                            "lowercase"
+                        ]
+                    },
+                    "legal_unigram_analyzer": {
+                        "type": "custom",
+                        "tokenizer": "legal_unigram_tokenizer",
+                        "filter": [
+                            "lowercase"
+                        ]
+                    }
+                },
+                "tokenizer": {
+                    **analysis.get("tokenizer", {}),
+                    # 부분 문자열 검색용 2-gram 토크나이저
+                    # min_gram == max_gram 이므로 연속된 gram의 position이 원문 순서와 일치 →
+                    # match_phrase 한 번으로 Ctrl+F 같은 부분 문자열 매칭이 가능
+                    "legal_bigram_tokenizer": {
+                        "type": "ngram",
+                        "min_gram": 2,
+                        "max_gram": 2,
+                        "token_chars": ["letter", "digit"]
+                    },
+                    # 한 글자 검색용 1-gram 토크나이저 (2-gram에는 한 글자 어절이나 어절 끝 글자가 gram 앞글자로 남지 않음)
+                    "legal_unigram_tokenizer": {
+                        "type": "ngram",
+                        "min_gram": 1,
+                        "max_gram": 1,
+                        "token_chars": ["letter", "digit"]
                     }
                 }
             }
         },
         "mappings": {
+            # 라우팅 값(legal_category) 없이 색인하면 거부 → 분류별 샤드 배치 보장
+            "_routing": {
+                "required": True
+            },
             "properties": {
                 "filename": {
                     "type": "keyword"
@@ -134,10 +184,36 @@ def create_legal_index():
                         "content": {
                             "type": "text",
                             "analyzer": "legal_analyzer",
+                            "term_vector": "with_positions_offsets",  # fvh 하이라이트용
+                            # 2단어 shingle을 별도 필드로 색인 → match_phrase가 포지션 비교 대신 텀 조회
+                            "index_phrases": True,
+                            # 1~5글자 접두사를 색인 → prefix 쿼리가 텀 사전 순회 없이 텀 조회
+                            "index_prefixes": {
+                                "min_chars": 1,
+                                "max_chars": 5
+                            },
                             "fields": {
+                                "exact": {
+                                    "type": "text",
+                                    "analyzer": "legal_exact_analyzer",
+                                    "index_phrases": True
+                                },
                                 "ngram": {
                                     "type": "text",
-                                    "analyzer": "standard"
+                                    "analyzer": "legal_ngram_analyzer"
+                                },
+                                # 글자 포함 여부만 보므로 빈도 / 위치 / norms 없이 저장
+                                "char": {
+                                    "type": "text",
+                                    "analyzer": "legal_unigram_analyzer",
+                                    "index_options": "docs",
+                                    "norms": False
+                                },
+                                # 실시간 검색용: 접두사/shingle 서브필드 자동 생성
+                                "suggest": {
+                                    "type": "search_as_you_type",
+                                    "analyzer": "standard",
+                                    "index_options": "offsets"
                                 }
                             }
                         },
@@ -162,9 +238,15 @@ def create_legal_index():
             }
         }
     }
-    
-    es.indices.create(index=index_name, body=mapping)
-    print(f"✅ 법령 전용 인덱스 '{index_name}' 생성 완료")
+
+
+def create_legal_index():
+    """법령 문서 전용 새 버전 인덱스(legal_documents_v{n}) 생성 → 인덱스 이름
+
+    legal_documents alias는 promote_version을 호출할 때까지 이전 버전을 가리킵니다.
+    """
+    index_name = create_version(es, LEGAL_INDEX, build_legal_index_body())
+    print(f"✅ 법령 전용 인덱스 '{index_name}' 생성 완료 (alias '{LEGAL_INDEX}' 전환 전)")
     return index_name
 
 def index_stalker_pdf(index_name):
@@ -204,7 +286,8 @@ def index_stalker_pdf(index_name):
         result = es.index(
             index=index_name,
             body=doc,
-            pipeline="legal_attachment"
+            pipeline="legal_attachment",
+            routing=doc["legal_category"]
         )
         
         print(f"✅ 스토킹 법령 PDF 인덱싱 완료!")
@@ -218,8 +301,44 @@ def index_stalker_pdf(index_name):
         traceback.print_exc()
         return False
 
-def search_legal_content(query, index_name, search_type="standard"):
-    """법령 내용에서 키워드 검색 - Ctrl+F 스타일"""
+def substring_query(query, boost=1.5):
+    """부분 문자열(Ctrl+F) 검색 쿼리 생성
+
+    *query* 와일드카드는 텀 사전 전체를 훑기 때문에 가장 느린 쿼리입니다.
+    대신 2-gram 서브필드에 match_phrase를 걸어 텀 조회만으로 부분 문자열을 찾습니다.
+    한 글자는 1-gram 서브필드(char)에서 찾고, 빈 검색어는 아무 문서와도 일치하지 않습니다.
+    """
+    stripped = query.strip()
+    if not stripped:
+        return {"match_none": {}}
+
+    if len(stripped) == 1:
+        return {
+            "match": {
+                "attachment.content.char": {
+                    "query": stripped,
+                    "boost": boost
+                }
+            }
+        }
+
+    return {
+        "match_phrase": {
+            "attachment.content.ngram": {
+                "query": query,
+                "boost": boost
+            }
+        }
+    }
+
+def search_legal_content(query, index_name, search_type="standard", legal_category=None, profile=None,
+                         cache_index=None):
+    """법령 내용에서 키워드 검색 - Ctrl+F 스타일
+    
+    legal_category를 지정하면 해당 분류의 샤드로만 검색 요청을 보냅니다.
+    profile이 True/"text"/"json"이면 프로파일 요약을 출력합니다 (캐시 사용 안 함).
+    cache_index를 주면 index_name 대신 그 이름으로 캐시합니다 (전환 전 버전 인덱스를 alias 키로 예열).
+    """
     
     if search_type == "exact":
         # 정확한 구문 검색 (따옴표 검색)
@@ -236,9 +355,9 @@ def search_legal_content(query, index_name, search_type="standard"):
                             }
                         },
                         {
-                            "term": {
+                            "match_phrase": {
                                 "attachment.content.exact": {
-                                    "value": query,
+                                    "query": query,
                                     "boost": 2.0
                                 }
                             }
@@ -246,17 +365,7 @@ def search_legal_content(query, index_name, search_type="standard"):
                     ]
                 }
             },
-            "highlight": {
-                "fields": {
-                    "attachment.content": {
-                        "fragment_size": 200,
-                        "number_of_fragments": 5,
-                        "pre_tags": ["<mark>"],
-                        "post_tags": ["</mark>"]
-                    }
-                },
-                "require_field_match": False
-            },
+            "highlight": build_highlight("attachment.content", require_field_match=False),
             "_source": ["filename", "legal_category", "file_size", "upload_date"]
         }
     else:
@@ -274,46 +383,98 @@ def search_legal_content(query, index_name, search_type="standard"):
                                 }
                             }
                         },
-                        {
-                            "match": {
-                                "attachment.content.ngram": {
-                                    "query": query,
-                                    "boost": 1.5
-                                }
-                            }
-                        },
-                        {
-                            "wildcard": {
-                                "attachment.content": {
-                                    "value": f"*{query}*",
-                                    "boost": 1.0
-                                }
-                            }
-                        }
+                        substring_query(query)
                     ]
                 }
             },
-            "highlight": {
-                "fields": {
-                    "attachment.content": {
-                        "fragment_size": 200,
-                        "number_of_fragments": 5,
-                        "pre_tags": ["<mark>"],
-                        "post_tags": ["</mark>"]
-                    }
-                },
-                "require_field_match": False
-            },
+            "highlight": build_highlight("attachment.content", require_field_match=False),
             "_source": ["filename", "legal_category", "file_size", "upload_date"]
         }
     
+    search_params = {}
+    if legal_category:
+        # 라우팅으로 샤드를 고르고, 같은 샤드의 다른 분류 문서는 필터로 제외
+        search_body["query"]["bool"]["filter"] = [{"term": {"legal_category": legal_category}}]
+        search_params["routing"] = legal_category
+    
+    profile_mode = resolve_profile_mode(profile)
+    if profile_mode:
+        search_body["profile"] = True
+    
+    cache_key = (cache_index or index_name, query, search_type, legal_category)
+    if not profile_mode:
+        cached = _cached_search(cache_key)
+        if cached is not None:
+            return cached
+    
     try:
-        result = es.search(index=index_name, body=search_body)
+        result = es.search(index=index_name, body=search_body, **search_params)
+        if profile_mode:
+            print_profile_report(search_body, result, profile_mode)
+        else:
+            _store_search(cache_key, result)
         return result
     except Exception as e:
         print(f"❌ 검색 실패: {e}")
         return None
 
+def _cached_search(cache_key):
+    """캐시된 응답 반환 (없거나 TTL이 지났으면 None)"""
+    entry = _search_cache.get(cache_key)
+    if entry is None:
+        return None
+    stored_at, result = entry
+    if time.monotonic() - stored_at > SEARCH_CACHE_TTL_SECONDS:
+        del _search_cache[cache_key]
+        return None
+    _search_cache.move_to_end(cache_key)
+    return result
+
+def _store_search(cache_key, result):
+    """응답 저장, 상한을 넘으면 가장 오래 안 쓴 항목부터 제거"""
+    _search_cache[cache_key] = (time.monotonic(), result)
+    _search_cache.move_to_end(cache_key)
+    while len(_search_cache) > SEARCH_CACHE_SIZE:
+        _search_cache.popitem(last=False)
+
+def clear_search_cache():
+    """검색 결과 캐시 초기화 (인덱스 재생성/새로고침 후 호출)"""
+    _search_cache.clear()
+
+def warm_search_caches(index_name, top_n=10, alias=None):
+    """자주 쓰던 검색어를 미리 실행하여 캐시 예열
+    
+    - 클라이언트 결과 캐시(_search_cache)를 채움 (alias를 주면 전환 후 검색이 쓰는 alias 키로 저장)
+    - 노드 쿼리 캐시 / 파일시스템 캐시에 필요한 세그먼트를 올림
+    - size: 0 건수 조회는 샤드 request cache에 저장됨
+    """
+    queries = top_queries(load_history(), top_n)
+    if not queries:
+        return
+    
+    start = time.perf_counter()
+    for history_query in queries:
+        legal_category, query = parse_category(history_query)
+        if query.startswith('"') and query.endswith('"'):
+            search_legal_content(query[1:-1], index_name, "exact", legal_category, cache_index=alias)
+            count_query = {"match_phrase": {"attachment.content": query[1:-1]}}
+        else:
+            search_legal_content(query, index_name, "standard", legal_category, cache_index=alias)
+            count_query = {"match": {"attachment.content": {"query": query, "operator": "and"}}}
+        
+        count_params = {}
+        if legal_category:
+            count_query = {"bool": {"must": [count_query], "filter": [{"term": {"legal_category": legal_category}}]}}
+            count_params["routing"] = legal_category
+        
+        try:
+            es.search(index=index_name, query=count_query, size=0, request_cache=True, **count_params)
+        except Exception as e:
+            print(f"⚠️  캐시 예열 실패 ('{query}'): {e}")
+    
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"🔥 자주 쓰는 검색어 {len(queries)}개로 캐시 예열 완료 ({elapsed_ms:.0f}ms)")
+
 def display_search_results(query, result, search_type="standard"):
     """검색 결과를 보기 좋게 표시"""
     if not result or result['hits']['total']['value'] == 0:
@@ -343,16 +504,26 @@ def display_search_results(query, result, search_type="standard"):
         
         print("   " + "-" * 50)
 
+def parse_category(query):
+    """'@분류 검색어' → (분류, 검색어), 분류가 없으면 (None, 검색어)"""
+    if query.startswith('@') and ' ' in query:
+        legal_category, rest = query[1:].split(' ', 1)
+        return legal_category, rest.strip()
+    return None, query
+
 def legal_quick_search(index_name):
     """법령 빠른 검색 - Ctrl+F 스타일"""
     print_section("⚡ 법령 빠른 검색 (Ctrl+F 스타일)")
     print("🔍 검색 팁:")
     print("  • 일반 검색: 키워드 입력")
     print("  • 정확한 구문: \"따옴표로 감싸서 입력\"")
+    print("  • 분류 지정: @스토킹범죄 처벌")
+    print("  • 실시간 검색: 'live', '실시간'")
     print("  • 종료: 'quit', 'exit', '종료'")
     print("  • 도움말: 'help', '도움말'")
     
-    search_history = []
+    # 이전 세션의 검색 기록 (검색어별 사용 횟수)
+    search_history = load_history()
     
     while True:
         query = input("\n🔍 검색어: ").strip()
@@ -362,19 +533,26 @@ def legal_quick_search(index_name):
         elif query.lower() in ['help', '도움말']:
             show_help()
             continue
+        elif query.lower() in ['live', '실시간']:
+            live_search_main(index_name)
+            continue
         elif not query:
             continue
         
         # 검색 기록 저장
-        search_history.append(query)
+        record_query(search_history, query)
+        save_history(search_history)
+        
+        # '@분류 검색어' 형식이면 해당 분류 샤드에서만 검색
+        legal_category, query = parse_category(query)
         
         # 따옴표로 감싸진 경우 정확한 구문 검색
         if query.startswith('"') and query.endswith('"'):
             clean_query = query[1:-1]  # 따옴표 제거
-            result = search_legal_content(clean_query, index_name, "exact")
+            result = search_legal_content(clean_query, index_name, "exact", legal_category)
             display_search_results(clean_query, result, "exact")
         else:
-            result = search_legal_content(query, index_name, "standard")
+            result = search_legal_content(query, index_name, "standard", legal_category)
             display_search_results(query, result, "standard")
 
 def show_help():
@@ -392,6 +570,7 @@ def show_help():
     print("  • 처벌 조항: 처벌")
     print("  • 신고 방법: 신고")
     print("  • 보호 조치: \"보호조치\"")
+    print("  • 분류 지정: @스토킹범죄 \"보호조치\"")
 
 def demo_legal_searches(index_name):
     """법령 검색 데모"""
@@ -440,19 +619,22 @@ def main():
         print_section("⚙️ 법령 전용 파이프라인 설정")
         create_legal_pipeline()
         
-        # 4. 법령 전용 인덱스 생성
+        # 4. 법령 전용 인덱스 생성 (새 버전 - 기존 legal_documents 검색은 전환 전까지 그대로)
         print_section("📁 법령 전용 인덱스 생성")
-        index_name = create_legal_index()
+        version_index = create_legal_index()
         
         # 5. stalker.pdf 인덱싱
         print_section("📄 스토킹 법령 PDF 인덱싱")
-        if not index_stalker_pdf(index_name):
-            print("❌ stalker.pdf 인덱싱에 실패했습니다.")
+        if not index_stalker_pdf(version_index):
+            print("❌ stalker.pdf 인덱싱에 실패했습니다. (기존 인덱스 유지)")
+            abandon_version(es, version_index)
             return
         
-        # 인덱스 새로고침
-        es.indices.refresh(index=index_name)
-        print("🔄 인덱스 새로고침 완료")
+        # 새로고침 → 자주 쓰던 검색어로 새 버전 예열 (클라이언트 캐시는 alias 키로) → alias 전환
+        promote_version(es, LEGAL_INDEX, version_index,
+                        warm=lambda name: warm_search_caches(name, alias=LEGAL_INDEX))
+        index_name = LEGAL_INDEX
+        print(f"🔀 alias '{index_name}' → '{version_index}' 전환 완료")
         
         # 6. 검색 데모
         demo_legal_searches(index_name)
@@ -5,17 +5,22 @@
 - 최신 API 호출 방식 적용
 """
 
-from elasticsearch import Elasticsearch
+from es_client import es
 import base64
 import json
 import traceback
 import os
+from highlighting import build_highlight
+from index_versions import abandon_version, create_version, promote_version
+from korean_analysis import build_korean_analysis
+from document_finder import find_in_document, is_cached
+from offline_search import OfflineIndex, build_index, split_articles, DEFAULT_INDEX_PATH as OFFLINE_INDEX_PATH
 
-# Elasticsearch 연결 설정
-es = Elasticsearch(
-    "http://localhost:9200",
-    basic_auth=("elastic", "OBIpKj46")
-)
+# 검색은 alias로, 실제 데이터는 legal-documents-stable_v{n}에
+LEGAL_INDEX = "legal-documents-stable"
+
+# 검색 백엔드: 기본은 Elasticsearch, 연결 실패 시 오프라인 인덱스(OfflineIndex)
+search_backend = es
 
 def print_section(title):
     """섹션 제목 출력"""
@@ -24,16 +29,12 @@ def print_section(title):
     print("="*60)
 
 def create_legal_index():
-    """법령 문서 전용 인덱스 생성"""
+    """법령 문서 전용 새 버전 인덱스 생성 → 인덱스 이름 (실패 시 None)
+
+    alias는 promote_version을 호출할 때까지 이전 버전을 가리킵니다.
+    """
     print("📚 법령 인덱스 생성 중...")
     
-    index_name = "legal-documents-stable"
-    
-    # 기존 인덱스 삭제
-    if es.indices.exists(index=index_name):
-        es.indices.delete(index=index_name)
-        print(f"🗑️  기존 인덱스 '{index_name}' 삭제")
-    
     # 인덱스 매핑 설정 (간단한 방식)
     mapping = {
         "properties": {
@@ -45,7 +46,7 @@ def create_legal_index():
             },
             "content": {
                 "type": "text",
-                "analyzer": "standard",
+                "analyzer": "legal_analyzer",
                 "term_vector": "with_positions_offsets"  # 하이라이트용
             },
             "content_length": {
@@ -57,27 +58,17 @@ def create_legal_index():
     settings = {
         "number_of_shards": 1,
         "number_of_replicas": 0,
-        "analysis": {
-            "analyzer": {
-                "legal_analyzer": {
-                    "type": "standard",
-                    "stopwords": "_none_"  # 법령에서는 모든 단어가 중요
-                }
-            }
-        }
+        # 조사가 붙은 어절도 텀으로 일치하도록 한국어 분석기 사용
+        "analysis": build_korean_analysis(es, "legal_analyzer")
     }
     
     try:
-        es.indices.create(
-            index=index_name, 
-            mappings=mapping,
-            settings=settings
-        )
-        print(f"✅ 인덱스 '{index_name}' 생성 완료")
-        return True
+        index_name = create_version(es, LEGAL_INDEX, {"mappings": mapping, "settings": settings})
+        print(f"✅ 인덱스 '{index_name}' 생성 완료 (alias '{LEGAL_INDEX}' 전환 전)")
+        return index_name
     except Exception as e:
         print(f"❌ 인덱스 생성 실패: {e}")
-        return False
+        return None
 
 def extract_text_from_pdf(pdf_path):
     """PDF에서 텍스트 추출 (단순한 방식)"""
@@ -144,7 +135,7 @@ def extract_text_from_pdf(pdf_path):
         print(f"❌ 텍스트 추출 실패: {e}")
         return None
 
-def index_pdf_content(pdf_path, doc_id="stalker-laws"):
+def index_pdf_content(pdf_path, index_name=LEGAL_INDEX, doc_id="stalker-laws"):
     """PDF 내용을 직접 인덱싱"""
     print(f"📄 PDF 문서 인덱싱: {pdf_path}")
     
@@ -171,7 +162,7 @@ def index_pdf_content(pdf_path, doc_id="stalker-laws"):
         
         # 직접 인덱싱
         result = es.index(
-            index="legal-documents-stable",
+            index=index_name,
             id=doc_id,
             document=document
         )
@@ -180,8 +171,12 @@ def index_pdf_content(pdf_path, doc_id="stalker-laws"):
         print(f"📍 문서 ID: {result['_id']}")
         print(f"📝 추출된 텍스트 길이: {len(content):,} 문자")
         
+        # 같은 텍스트로 오프라인 인덱스도 생성 (Elasticsearch 없는 환경용)
+        header = build_index(split_articles(content, os.path.basename(pdf_path)), OFFLINE_INDEX_PATH)
+        print(f"🧳 오프라인 인덱스 저장: {OFFLINE_INDEX_PATH} (조문 {header['doc_count']}개)")
+        
         # 인덱스 새로고침
-        es.indices.refresh(index="legal-documents-stable")
+        es.indices.refresh(index=index_name)
         
         return True
         
@@ -190,13 +185,13 @@ def index_pdf_content(pdf_path, doc_id="stalker-laws"):
         traceback.print_exc()
         return False
 
-def verify_indexing():
+def verify_indexing(index_name=LEGAL_INDEX):
     """인덱싱 결과 확인"""
     print("🔍 인덱싱 결과 확인 중...")
     
     try:
         # 문서 가져오기
-        result = es.get(index="legal-documents-stable", id="stalker-laws")
+        result = es.get(index=index_name, id="stalker-laws")
         
         source = result['_source']
         print(f"✅ 문서 처리 완료:")
@@ -230,16 +225,10 @@ def search_legal_content(query, max_results=5):
                     }
                 }
             },
-            "highlight": {
-                "fields": {
-                    "content": {
-                        "pre_tags": ["<mark>"],
-                        "post_tags": ["</mark>"],
-                        "fragment_size": 200,
-                        "number_of_fragments": 3
-                    }
-                }
-            },
+            "highlight": build_highlight("content", number_of_fragments=3),
+            # 본문은 Ctrl+F 폴백이 필요할 때만 따로 가져옴
+            "source_excludes": ["content"],
+            "seq_no_primary_term": True,
             "size": max_results
         }
         search_type = f'정확한 구문 "{clean_query}"'
@@ -269,22 +258,16 @@ def search_legal_content(query, max_results=5):
                     ]
                 }
             },
-            "highlight": {
-                "fields": {
-                    "content": {
-                        "pre_tags": ["<mark>"],
-                        "post_tags": ["</mark>"],
-                        "fragment_size": 200,
-                        "number_of_fragments": 3
-                    }
-                }
-            },
+            "highlight": build_highlight("content", number_of_fragments=3),
+            # 본문은 Ctrl+F 폴백이 필요할 때만 따로 가져옴
+            "source_excludes": ["content"],
+            "seq_no_primary_term": True,
             "size": max_results
         }
         search_type = f'키워드 "{query}"'
     
     try:
-        result = es.search(index="legal-documents-stable", **search_query)
+        result = search_backend.search(index=LEGAL_INDEX, **search_query)
         hits = result['hits']['hits']
         
         print(f"\n🔍 {search_type} 검색 결과: {len(hits)}개 발견")
@@ -304,24 +287,16 @@ def search_legal_content(query, max_results=5):
                         print(f"💡 {display_fragment}")
                         print()
                 else:
-                    # 하이라이트가 없는 경우 원본 내용의 일부 표시
-                    content = hit['_source']['content']
-                    # 검색어가 포함된 부분 찾기
-                    query_lower = query.lower().strip('"')
-                    content_lower = content.lower()
+                    # 하이라이트가 없는 경우 문서 내 찾기 인덱스로 모든 일치 위치 표시
+                    cache_key = (hit['_id'], hit['_seq_no'], hit['_primary_term'])
+                    content = None
+                    if not is_cached(cache_key):
+                        doc = search_backend.get(index=LEGAL_INDEX, id=hit['_id'], source_includes=["content"])
+                        content = doc['_source']['content']
                     
-                    if query_lower in content_lower:
-                        start_pos = content_lower.find(query_lower)
-                        start = max(0, start_pos - 100)
-                        end = min(len(content), start_pos + len(query_lower) + 100)
-                        snippet = content[start:end]
-                        
-                        if start > 0:
-                            snippet = "..." + snippet
-                        if end < len(content):
-                            snippet = snippet + "..."
-                            
-                        print(f"📝 {snippet}")
+                    matches = find_in_document(cache_key, content, query, max_matches=3)
+                    for match in matches:
+                        print(f"📝 {match['snippet']}")
                         print()
         else:
             print(f"❌ '{query}' 검색 결과가 없습니다.")
@@ -333,6 +308,19 @@ def search_legal_content(query, max_results=5):
         print(f"❌ 검색 오류: {e}")
         return False
 
+def use_offline_index(path=OFFLINE_INDEX_PATH):
+    """검색 백엔드를 오프라인 인덱스로 전환"""
+    global search_backend
+    
+    if not os.path.exists(path):
+        print(f"❌ 오프라인 인덱스가 없습니다: {path}")
+        print("   Elasticsearch 연결 상태에서 한 번 실행하거나 'python offline_search.py build stalker.pdf'로 생성하세요.")
+        return False
+    
+    search_backend = OfflineIndex(path)
+    print(f"🧳 오프라인 모드: {path} (조문 {search_backend.doc_count}개)")
+    return True
+
 def show_help():
     """도움말 표시"""
     print("\n" + "="*60)
@@ -375,28 +363,34 @@ def main():
     print_section("법령 검색 시스템 - 안정화 버전")
     
     try:
-        # 1. Elasticsearch 연결 확인
+        # 1. Elasticsearch 연결 확인 (실패 시 오프라인 인덱스 사용)
         if not es.ping():
             print("❌ Elasticsearch 연결 실패")
-            return
-        
-        print("✅ Elasticsearch 연결 성공")
-        
-        # 2. 인덱스 생성
-        if not create_legal_index():
-            print("❌ 인덱스 생성 실패")
-            return
-        
-        # 3. PDF 문서 인덱싱
-        pdf_path = "stalker.pdf"
-        if not index_pdf_content(pdf_path):
-            print("❌ PDF 인덱싱 실패")
-            return
-        
-        # 4. 인덱싱 결과 확인
-        if not verify_indexing():
-            print("❌ 인덱싱 확인 실패")
-            return
+            if not use_offline_index():
+                return
+        else:
+            print("✅ Elasticsearch 연결 성공")
+            
+            # 2. 새 버전 인덱스 생성 (기존 alias 검색은 전환 전까지 그대로)
+            version_index = create_legal_index()
+            if not version_index:
+                print("❌ 인덱스 생성 실패")
+                return
+            
+            # 3. PDF 문서 인덱싱
+            pdf_path = "stalker.pdf"
+            if not index_pdf_content(pdf_path, version_index):
+                print("❌ PDF 인덱싱 실패 (기존 인덱스 유지)")
+                abandon_version(es, version_index)
+                return
+            
+            # 4. 인덱싱 결과 확인 후 alias 전환
+            if not verify_indexing(version_index):
+                print("❌ 인덱싱 확인 실패 (기존 인덱스 유지)")
+                abandon_version(es, version_index)
+                return
+            promote_version(es, LEGAL_INDEX, version_index)
+            print(f"🔀 alias '{LEGAL_INDEX}' → '{version_index}' 전환 완료")
         
         print_section("법령 검색 시스템 준비 완료! 🎉")
         print("💡 'help' 입력시 도움말, 'demo' 입력시 데모 실행")
@@ -6,17 +6,16 @@
 - 더 효율적인 메모리 사용
 """
 
-from elasticsearch import Elasticsearch
+from es_client import es
 import base64
 import json
 import traceback
 import os
+from highlighting import build_highlight
+from index_versions import abandon_version, create_version, promote_version
 
-# Elasticsearch 연결 설정
-es = Elasticsearch(
-    "http://localhost:9200",
-    basic_auth=("elastic", "OBIpKj46")
-)
+# 검색은 alias로, 실제 데이터는 legal-documents-v2_v{n}에
+LEGAL_INDEX = "legal-documents-v2"
 
 def print_section(title):
     """섹션 제목 출력"""
@@ -62,16 +61,12 @@ def create_attachment_pipeline():
         return False
 
 def create_legal_index():
-    """법령 문서 전용 인덱스 생성"""
+    """법령 문서 전용 새 버전 인덱스 생성 → 인덱스 이름 (실패 시 None)
+
+    alias는 promote_version을 호출할 때까지 이전 버전을 가리킵니다.
+    """
     print("📚 법령 인덱스 생성 중...")
     
-    index_name = "legal-documents-v2"
-    
-    # 기존 인덱스 삭제
-    if es.indices.exists(index=index_name):
-        es.indices.delete(index=index_name)
-        print(f"🗑️  기존 인덱스 '{index_name}' 삭제")
-    
     # 인덱스 매핑 설정
     mapping = {
         "settings": {
@@ -122,14 +117,14 @@ def create_legal_index():
     }
     
     try:
-        es.indices.create(index=index_name, mappings=mapping["mappings"], settings=mapping["settings"])
-        print(f"✅ 인덱스 '{index_name}' 생성 완료")
-        return True
+        index_name = create_version(es, LEGAL_INDEX, mapping)
+        print(f"✅ 인덱스 '{index_name}' 생성 완료 (alias '{LEGAL_INDEX}' 전환 전)")
+        return index_name
     except Exception as e:
         print(f"❌ 인덱스 생성 실패: {e}")
-        return False
+        return None
 
-def index_pdf_document(pdf_path, doc_id="stalker-laws"):
+def index_pdf_document(pdf_path, index_name=LEGAL_INDEX, doc_id="stalker-laws"):
     """PDF 문서를 attachment processor로 인덱싱"""
     print(f"📄 PDF 문서 인덱싱: {pdf_path}")
     
@@ -154,7 +149,7 @@ def index_pdf_document(pdf_path, doc_id="stalker-laws"):
         
         # attachment processor 파이프라인을 통해 인덱싱
         result = es.index(
-            index="legal-documents-v2",
+            index=index_name,
             id=doc_id,
             document=document,  # body 대신 document 사용
             pipeline="legal-attachment"  # 파이프라인 지정
@@ -164,7 +159,7 @@ def index_pdf_document(pdf_path, doc_id="stalker-laws"):
         print(f"📍 문서 ID: {result['_id']}")
         
         # 인덱스 새로고침
-        es.indices.refresh(index="legal-documents-v2")
+        es.indices.refresh(index=index_name)
         
         return True
         
@@ -173,13 +168,13 @@ def index_pdf_document(pdf_path, doc_id="stalker-laws"):
         traceback.print_exc()
         return False
 
-def verify_indexing():
+def verify_indexing(index_name=LEGAL_INDEX):
     """인덱싱 결과 확인"""
     print("🔍 인덱싱 결과 확인 중...")
     
     try:
         # 문서 가져오기
-        result = es.get(index="legal-documents-v2", id="stalker-laws")
+        result = es.get(index=index_name, id="stalker-laws")
         
         if 'attachment' in result['_source']:
             attachment = result['_source']['attachment']
@@ -219,16 +214,7 @@ def search_legal_content(query, max_results=5):
                     }
                 }
             },
-            "highlight": {
-                "fields": {
-                    "attachment.content": {
-                        "pre_tags": ["<mark>"],
-                        "post_tags": ["</mark>"],
-                        "fragment_size": 200,
-                        "number_of_fragments": 3
-                    }
-                }
-            },
+            "highlight": build_highlight("attachment.content", number_of_fragments=3),
             "size": max_results
         }
         search_type = f'정확한 구문 "{clean_query}"'
@@ -258,22 +244,13 @@ def search_legal_content(query, max_results=5):
                     ]
                 }
             },
-            "highlight": {
-                "fields": {
-                    "attachment.content": {
-                        "pre_tags": ["<mark>"],
-                        "post_tags": ["</mark>"],
-                        "fragment_size": 200,
-                        "number_of_fragments": 3
-                    }
-                }
-            },
+            "highlight": build_highlight("attachment.content", number_of_fragments=3),
             "size": max_results
         }
         search_type = f'키워드 "{query}"'
     
     try:
-        result = es.search(index="legal-documents-v2", **search_query)
+        result = es.search(index=LEGAL_INDEX, **search_query)
         hits = result['hits']['hits']
         
         print(f"\n🔍 {search_type} 검색 결과: {len(hits)}개 발견")
@@ -375,21 +352,26 @@ def main():
             print("❌ 파이프라인 생성 실패")
             return
         
-        # 3. 인덱스 생성
-        if not create_legal_index():
+        # 3. 새 버전 인덱스 생성 (기존 alias 검색은 전환 전까지 그대로)
+        version_index = create_legal_index()
+        if not version_index:
             print("❌ 인덱스 생성 실패")
             return
         
         # 4. PDF 문서 인덱싱
         pdf_path = "stalker.pdf"
-        if not index_pdf_document(pdf_path):
-            print("❌ PDF 인덱싱 실패")
+        if not index_pdf_document(pdf_path, version_index):
+            print("❌ PDF 인덱싱 실패 (기존 인덱스 유지)")
+            abandon_version(es, version_index)
             return
         
-        # 5. 인덱싱 결과 확인
-        if not verify_indexing():
-            print("❌ 인덱싱 확인 실패")
+        # 5. 인덱싱 결과 확인 후 alias 전환
+        if not verify_indexing(version_index):
+            print("❌ 인덱싱 확인 실패 (기존 인덱스 유지)")
+            abandon_version(es, version_index)
             return
+        promote_version(es, LEGAL_INDEX, version_index)
+        print(f"🔀 alias '{LEGAL_INDEX}' → '{version_index}' 전환 완료")
         
         print_section("법령 검색 시스템 준비 완료! 🎉")
         print("💡 'help' 입력시 도움말, 'demo' 입력시 데모 실행")
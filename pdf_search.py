@@ -1,15 +1,51 @@
-from elasticsearch import Elasticsearch
+from es_client import es
 import base64
 import os
 import json
 import traceback
 from pathlib import Path
+from index_versions import abandon_version, create_version, promote_version
+from query_profiler import resolve_profile_mode, print_profile_report
 
-# Elasticsearch 연결 설정
-es = Elasticsearch(
-    "http://localhost:9200",
-    basic_auth=("elastic", "OBIpKj46")
-)
+# 검색은 alias로, 실제 데이터는 pdf_documents_v{n}에
+PDF_INDEX = "pdf_documents"
+
+# 매핑 설정
+PDF_MAPPING = {
+    "mappings": {
+        "properties": {
+            "filename": {
+                "type": "keyword"
+            },
+            "upload_date": {
+                "type": "date"
+            },
+            "file_size": {
+                "type": "long"
+            },
+            "attachment": {
+                "properties": {
+                    "content": {
+                        "type": "text",
+                        "analyzer": "standard"
+                    },
+                    "title": {
+                        "type": "text"
+                    },
+                    "author": {
+                        "type": "keyword"
+                    },
+                    "content_type": {
+                        "type": "keyword"
+                    },
+                    "content_length": {
+                        "type": "long"
+                    }
+                }
+            }
+        }
+    }
+}
 
 def print_section(title):
     print("\n" + "="*60)
@@ -67,53 +103,13 @@ def create_attachment_pipeline():
     print("✅ Attachment 파이프라인 생성 완료")
 
 def create_pdf_index():
-    """PDF 문서 저장을 위한 인덱스 생성"""
-    index_name = "pdf_documents"
-    
-    # 기존 인덱스 삭제
-    if es.indices.exists(index=index_name):
-        es.indices.delete(index=index_name)
-        print(f"🗑️ 기존 인덱스 '{index_name}' 삭제")
-    
-    # 매핑 설정
-    mapping = {
-        "mappings": {
-            "properties": {
-                "filename": {
-                    "type": "keyword"
-                },
-                "upload_date": {
-                    "type": "date"
-                },
-                "file_size": {
-                    "type": "long"
-                },
-                "attachment": {
-                    "properties": {
-                        "content": {
-                            "type": "text",
-                            "analyzer": "standard"
-                        },
-                        "title": {
-                            "type": "text"
-                        },
-                        "author": {
-                            "type": "keyword"
-                        },
-                        "content_type": {
-                            "type": "keyword"
-                        },
-                        "content_length": {
-                            "type": "long"
-                        }
-                    }
-                }
-            }
-        }
-    }
-    
-    es.indices.create(index=index_name, body=mapping)
-    print(f"✅ 인덱스 '{index_name}' 생성 완료")
+    """PDF 문서 저장용 새 버전 인덱스(pdf_documents_v{n}) 생성 → 인덱스 이름
+
+    pdf_documents alias는 promote_version을 호출할 때까지 이전 버전을 가리키므로
+    PDF를 다시 올리는 동안에도 검색은 계속 동작합니다.
+    """
+    index_name = create_version(es, PDF_INDEX, PDF_MAPPING)
+    print(f"✅ 인덱스 '{index_name}' 생성 완료 (alias '{PDF_INDEX}' 전환 전)")
     return index_name
 
 def create_sample_pdf():
@@ -253,8 +249,8 @@ def index_pdf_file(filename, index_name):
         print(f"❌ PDF 인덱싱 실패 - {filename}: {e}")
         return False
 
-def search_pdf_content(query, index_name):
-    """PDF 내용에서 키워드 검색"""
+def search_pdf_content(query, index_name, profile=None):
+    """PDF 내용에서 키워드 검색 (profile: True/"text"/"json"이면 프로파일 출력)"""
     search_body = {
         "query": {
             "bool": {
@@ -297,8 +293,14 @@ def search_pdf_content(query, index_name):
         "_source": ["filename", "file_size", "upload_date"]
     }
     
+    profile_mode = resolve_profile_mode(profile)
+    if profile_mode:
+        search_body["profile"] = True
+    
     try:
         result = es.search(index=index_name, body=search_body)
+        if profile_mode:
+            print_profile_report(search_body, result, profile_mode)
         return result
     except Exception as e:
         print(f"❌ 검색 실패: {e}")
@@ -369,11 +371,7 @@ def main():
         print_section("⚙️ Attachment 파이프라인 설정")
         create_attachment_pipeline()
         
-        # 4. 인덱스 생성
-        print_section("📁 PDF 인덱스 생성")
-        index_name = create_pdf_index()
-        
-        # 5. 샘플 PDF 생성
+        # 4. 샘플 PDF 생성
         print_section("📄 샘플 PDF 생성")
         pdf_files = create_sample_pdf()
         
@@ -384,20 +382,26 @@ def main():
                 print("❌ PDF 파일이 없습니다. 샘플 PDF 생성을 위해 reportlab을 설치하거나 PDF 파일을 추가해주세요.")
                 return
         
-        # 6. PDF 파일 인덱싱
+        # 5. 새 버전 인덱스 생성
+        print_section("📁 PDF 인덱스 생성")
+        version_index = create_pdf_index()
+        
+        # 6. PDF 파일 인덱싱 (새 버전에 직접)
         print_section("📥 PDF 파일 인덱싱")
         success_count = 0
         for pdf_file in pdf_files:
-            if index_pdf_file(pdf_file, index_name):
+            if index_pdf_file(pdf_file, version_index):
                 success_count += 1
         
         if success_count == 0:
-            print("❌ 인덱싱된 PDF가 없습니다.")
+            print("❌ 인덱싱된 PDF가 없습니다. (기존 인덱스 유지)")
+            abandon_version(es, version_index)
             return
         
-        # 인덱스 새로고침
-        es.indices.refresh(index=index_name)
-        print(f"🔄 인덱스 새로고침 완료 ({success_count}개 파일)")
+        # 새로고침 + 예열 후 alias 전환 - 이후 검색은 alias로
+        promote_version(es, PDF_INDEX, version_index)
+        index_name = PDF_INDEX
+        print(f"🔀 alias '{index_name}' → '{version_index}' 전환 완료 ({success_count}개 파일)")
         
         # 7. 검색 테스트
         advanced_pdf_search(index_name)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+구문/접두사 검색 성능 비교 (index_phrases / index_prefixes 적용 전후)
+- before: 일반 text 필드 → match_phrase가 후보 문서마다 포지션 비교
+- after: index_phrases(2단어 shingle) + index_prefixes(접두사 텀) 사용
+"""
+
+from es_client import es
+from elasticsearch.helpers import bulk
+from highlight_benchmark import LEGAL_PARAGRAPHS
+import random
+
+VARIANTS = {
+    "phrase-bench-before": {"type": "text", "analyzer": "standard"},
+    "phrase-bench-after": {
+        "type": "text",
+        "analyzer": "standard",
+        "index_phrases": True,
+        "index_prefixes": {"min_chars": 1, "max_chars": 5}
+    },
+}
+
+PHRASE_QUERIES = ["이하의 징역", "피해자의 신변보호와", "3년 이하의 징역 또는"]
+PREFIX_QUERIES = ["스토", "처벌", "피해"]
+
+def print_section(title):
+    print("\n" + "="*60)
+    print(f"📐 {title}")
+    print("="*60)
+
+def generate_corpus(doc_count, paragraphs_per_doc, seed=42):
+    """법령 문단을 섞어 doc_count개의 문서 생성"""
+    rng = random.Random(seed)
+    for i in range(doc_count):
+        paragraphs = rng.choices(LEGAL_PARAGRAPHS, k=paragraphs_per_doc)
+        yield i, "\n".join(f"제{rng.randint(1, 300)}조 {p}" for p in paragraphs)
+
+def setup_index(index_name, content_mapping, doc_count, paragraphs_per_doc):
+    """벤치마크용 인덱스 생성 및 코퍼스 인덱싱"""
+    if es.indices.exists(index=index_name):
+        es.indices.delete(index=index_name)
+
+    es.indices.create(
+        index=index_name,
+        settings={"number_of_shards": 1, "number_of_replicas": 0, "refresh_interval": "-1"},
+        mappings={"properties": {"content": content_mapping}}
+    )
+
+    actions = (
+        {"_index": index_name, "_id": i, "_source": {"content": content}}
+        for i, content in generate_corpus(doc_count, paragraphs_per_doc)
+    )
+    bulk(es, actions, chunk_size=1000)
+    es.indices.refresh(index=index_name)
+    es.indices.forcemerge(index=index_name, max_num_segments=1)
+
+def measure(index_name, query, repeat):
+    """request_cache 없이 반복 실행한 평균 took(ms)"""
+    took_total = 0
+    hits = 0
+    for _ in range(repeat):
+        result = es.search(index=index_name, query=query, size=10, request_cache=False)
+        took_total += result["took"]
+        hits = result["hits"]["total"]["value"]
+    return took_total / repeat, hits
+
+def main(doc_count=50000, paragraphs_per_doc=40, repeat=20):
+    print_section(f"구문 검색 벤치마크 (문서 {doc_count:,}개)")
+
+    if not es.ping():
+        print("❌ Elasticsearch 연결 실패")
+        return
+
+    report = {}
+    for index_name, content_mapping in VARIANTS.items():
+        print(f"📦 {index_name} 인덱싱 중...")
+        setup_index(index_name, content_mapping, doc_count, paragraphs_per_doc)
+
+        stats = es.indices.stats(index=index_name, metric="store")
+        rows = [("💾 인덱스 크기", f"{stats['indices'][index_name]['total']['store']['size_in_bytes']:,} bytes")]
+        for phrase in PHRASE_QUERIES:
+            took, hits = measure(index_name, {"match_phrase": {"content": phrase}}, repeat)
+            rows.append((f"🔍 구문 '{phrase}'", f"{took:.2f}ms ({hits:,}건)"))
+        for prefix in PREFIX_QUERIES:
+            took, hits = measure(index_name, {"prefix": {"content": prefix}}, repeat)
+            rows.append((f"🔤 접두사 '{prefix}'", f"{took:.2f}ms ({hits:,}건)"))
+        report[index_name] = rows
+
+        es.indices.delete(index=index_name)
+
+    for index_name, rows in report.items():
+        print(f"\n🔧 {index_name}")
+        for label, value in rows:
+            print(f"   {label}: {value}")
+
+    print_section("✅ 구문 검색 벤치마크 완료!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+검색 쿼리 프로파일링 도구
+- "profile": true 응답의 프로파일 트리를 샤드별로 요약
+  (쿼리 절별 시간, rewrite 시간, collector 시간, 집계 시간)
+- 느리다고 알려진 쿼리 구성(선행 와일드카드, fuzziness: AUTO 등) 경고
+- 사람이 읽는 텍스트 / JSON 출력
+"""
+
+import json
+import os
+
+# 기본 프로파일 모드: ES_PROFILE=text 또는 ES_PROFILE=json 환경 변수로 전체 검색에 적용
+PROFILE_MODE = os.environ.get("ES_PROFILE", "").lower()
+
+def resolve_profile_mode(profile=None):
+    """검색 함수의 profile 인자 → None / "text" / "json"
+
+    None이면 ES_PROFILE 환경 변수를 따르고, True는 "text"로 취급합니다.
+    """
+    if profile is None:
+        profile = PROFILE_MODE
+    if profile is True:
+        return "text"
+    if profile in ("text", "json"):
+        return profile
+    return None
+
+def _ms(nanos):
+    return round(nanos / 1_000_000, 3)
+
+def _summarize_query_node(node, depth=0):
+    """쿼리 프로파일 노드를 (깊이, 타입, 설명, ms) 목록으로 평탄화"""
+    rows = [{
+        "depth": depth,
+        "type": node["type"],
+        "description": node["description"],
+        "time_ms": _ms(node["time_in_nanos"])
+    }]
+    for child in node.get("children", []):
+        rows.extend(_summarize_query_node(child, depth + 1))
+    return rows
+
+def _summarize_collector(node, depth=0):
+    rows = [{
+        "depth": depth,
+        "name": node["name"],
+        "reason": node["reason"],
+        "time_ms": _ms(node["time_in_nanos"])
+    }]
+    for child in node.get("children", []):
+        rows.extend(_summarize_collector(child, depth + 1))
+    return rows
+
+def summarize_profile(result):
+    """검색 응답의 profile 트리를 샤드별 요약으로 변환"""
+    shards = []
+    for shard in result.get("profile", {}).get("shards", []):
+        queries, collectors = [], []
+        rewrite_nanos = 0
+        for search in shard.get("searches", []):
+            for node in search.get("query", []):
+                queries.extend(_summarize_query_node(node))
+            for node in search.get("collector", []):
+                collectors.extend(_summarize_collector(node))
+            rewrite_nanos += search.get("rewrite_time", 0)
+
+        aggregations = [
+            {"type": agg["type"], "description": agg["description"], "time_ms": _ms(agg["time_in_nanos"])}
+            for agg in shard.get("aggregations", [])
+        ]
+
+        query_ms = sum(row["time_ms"] for row in queries if row["depth"] == 0)
+        collector_ms = sum(row["time_ms"] for row in collectors if row["depth"] == 0)
+        shards.append({
+            "shard": shard["id"],
+            "query_ms": round(query_ms, 3),
+            "rewrite_ms": _ms(rewrite_nanos),
+            "collector_ms": round(collector_ms, 3),
+            "aggregation_ms": round(sum(agg["time_ms"] for agg in aggregations), 3),
+            "fetch_ms": _ms(shard.get("fetch", {}).get("time_in_nanos", 0)),
+            "queries": queries,
+            "collectors": collectors,
+            "aggregations": aggregations
+        })
+    return shards
+
+def find_expensive_clauses(search_body):
+    """검색 본문에서 느린 것으로 알려진 쿼리 구성 찾기"""
+    warnings = []
+
+    def walk(node, path):
+        if isinstance(node, list):
+            for i, item in enumerate(node):
+                walk(item, f"{path}[{i}]")
+            return
+        if not isinstance(node, dict):
+            return
+
+        for key, value in node.items():
+            current = f"{path}.{key}" if path else key
+
+            if key in ("wildcard", "query_string") and isinstance(value, dict):
+                for field, spec in value.items():
+                    pattern = spec.get("value", spec.get("query", "")) if isinstance(spec, dict) else spec
+                    if isinstance(pattern, str) and pattern[:1] in ("*", "?"):
+                        warnings.append({
+                            "path": current,
+                            "construct": "leading_wildcard",
+                            "detail": f"{field}: '{pattern}' - 텀 사전 전체를 순회합니다 (ngram/wildcard 필드 권장)"
+                        })
+            elif key == "regexp":
+                warnings.append({
+                    "path": current,
+                    "construct": "regexp",
+                    "detail": "정규식 쿼리는 텀 사전을 오토마톤으로 순회합니다"
+                })
+            elif key == "fuzziness" and value not in (0, "0"):
+                warnings.append({
+                    "path": path,
+                    "construct": "fuzziness",
+                    "detail": f"fuzziness: {value} - 검색어마다 편집 거리 후보 텀을 확장합니다"
+                })
+            elif key == "script" and path.endswith("query"):
+                warnings.append({
+                    "path": current,
+                    "construct": "script_query",
+                    "detail": "스크립트 쿼리는 문서마다 스크립트를 실행합니다"
+                })
+            elif key == "from" and isinstance(value, int) and value >= 1000:
+                warnings.append({
+                    "path": current,
+                    "construct": "deep_pagination",
+                    "detail": f"{value}건을 건너뜀 - search_after 사용을 권장합니다"
+                })
+
+            walk(value, current)
+
+    walk(search_body, "")
+    return warnings
+
+def build_profile_report(search_body, result):
+    """프로파일 요약 + 경고를 하나의 리포트로 구성"""
+    return {
+        "took_ms": result.get("took"),
+        "warnings": find_expensive_clauses(search_body),
+        "shards": summarize_profile(result)
+    }
+
+def format_profile_report(report):
+    """리포트를 사람이 읽기 쉬운 텍스트로 변환"""
+    lines = [f"🧪 프로파일 (took: {report['took_ms']}ms)"]
+
+    for warning in report["warnings"]:
+        lines.append(f"   ⚠️  [{warning['construct']}] {warning['path']}: {warning['detail']}")
+
+    for shard in report["shards"]:
+        lines.append(f"   🧩 {shard['shard']}")
+        lines.append(
+            f"      query {shard['query_ms']}ms | rewrite {shard['rewrite_ms']}ms | "
+            f"collector {shard['collector_ms']}ms | aggs {shard['aggregation_ms']}ms | fetch {shard['fetch_ms']}ms"
+        )
+        for row in shard["queries"]:
+            indent = "  " * row["depth"]
+            description = row["description"]
+            if len(description) > 80:
+                description = description[:77] + "..."
+            lines.append(f"      {indent}- {row['type']} {row['time_ms']}ms: {description}")
+        for row in shard["collectors"]:
+            indent = "  " * row["depth"]
+            lines.append(f"      {indent}▸ {row['name']} ({row['reason']}) {row['time_ms']}ms")
+        for agg in shard["aggregations"]:
+            lines.append(f"      Σ {agg['type']} '{agg['description']}' {agg['time_ms']}ms")
+
+    return "\n".join(lines)
+
+def print_profile_report(search_body, result, output="text"):
+    """프로파일 리포트 출력 (output: "text" 또는 "json")"""
+    report = build_profile_report(search_body, result)
+    if output == "json":
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print(format_profile_report(report))
+    return report
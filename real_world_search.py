@@ -1,19 +1,18 @@
-from elasticsearch import Elasticsearch
+from es_client import es
 import json
+from query_profiler import resolve_profile_mode, print_profile_report
+from tracing import get_tracer, traced
 
-# Elasticsearch 연결 설정
-es = Elasticsearch(
-    "http://localhost:9200",
-    basic_auth=("elastic", "OBIpKj46")
-)
+tracer = get_tracer(__name__)
 
 def print_section(title):
     print("\n" + "="*60)
     print(f"🔍 {title}")
     print("="*60)
 
-def search_books(query_text, filters=None, sort_by=None, page=1, size=10):
-    """실제 검색 서비스와 같은 검색 함수"""
+@traced("build_search_query")
+def build_search_query(query_text, filters=None, sort_by=None, page=1, size=10):
+    """검색어 / 필터 / 정렬 / 페이지로 bool 쿼리 본문 구성"""
     
     # 기본 검색 쿼리 구성
     search_query = {
@@ -83,8 +82,24 @@ def search_books(query_text, filters=None, sort_by=None, page=1, size=10):
         elif sort_by == "pages_desc":
             search_query["sort"] = [{"pages": {"order": "desc"}}]
     
-    return es.search(index="tech_books", body=search_query)
+    return search_query
 
+@traced("search_books")
+def search_books(query_text, filters=None, sort_by=None, page=1, size=10, profile=None):
+    """실제 검색 서비스와 같은 검색 함수 (profile: True/"text"/"json"이면 프로파일 출력)"""
+    
+    search_query = build_search_query(query_text, filters, sort_by, page, size)
+    
+    profile_mode = resolve_profile_mode(profile)
+    if profile_mode:
+        search_query["profile"] = True
+    
+    result = es.search(index="tech_books", body=search_query)
+    if profile_mode:
+        print_profile_report(search_query, result, profile_mode)
+    return result
+
+@traced("display_search_results")
 def display_search_results(result, query_text=""):
     """검색 결과를 보기 좋게 표시"""
     total = result['hits']['total']['value']
@@ -121,8 +136,8 @@ def display_search_results(result, query_text=""):
             print("   점수: N/A (정렬됨)")
         print()
 
-def get_search_suggestions(query_text, size=5):
-    """검색 제안 (자동완성 기능)"""
+def build_suggestion_query(query_text, size=5):
+    """검색 제안용 쿼리 본문"""
     
     suggestion_query = {
         "suggest": {
@@ -151,10 +166,15 @@ def get_search_suggestions(query_text, size=5):
         "_source": ["title", "category", "language"]
     }
     
-    return es.search(index="tech_books", body=prefix_query)
+    return prefix_query
 
-def get_facets():
-    """패싯 정보 가져오기 (필터 옵션)"""
+@traced("get_search_suggestions")
+def get_search_suggestions(query_text, size=5):
+    """검색 제안 (자동완성 기능)"""
+    return es.search(index="tech_books", body=build_suggestion_query(query_text, size))
+
+def build_facet_query():
+    """패싯(필터 옵션) 집계 쿼리 본문"""
     
     facet_query = {
         "size": 0,
@@ -194,7 +214,12 @@ def get_facets():
         }
     }
     
-    return es.search(index="tech_books", body=facet_query)
+    return facet_query
+
+@traced("get_facets")
+def get_facets():
+    """패싯 정보 가져오기 (필터 옵션)"""
+    return es.search(index="tech_books", body=build_facet_query())
 
 def main():
     print_section("실제 검색 서비스 시뮬레이션")
@@ -211,8 +236,10 @@ def main():
     
     for query in search_queries:
         print(f"\n🔍 '{query}' 검색:")
-        result = search_books(query, size=3)
-        display_search_results(result, query)
+        # 검색 페이지 한 번 = 트레이스 하나 (쿼리 구성 → 전송 → 디코딩 → 결과 출력)
+        with tracer.start_as_current_span("search_page", attributes={"query": query}):
+            result = search_books(query, size=3)
+            display_search_results(result, query)
     
     # 2. 필터링 검색
     print_section("2. 필터링 검색")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+legal_category 라우팅 효과 비교
+- broadcast: 분류 필터만 사용 → 모든 샤드에 요청
+- routing: 분류 값으로 라우팅 + 필터 → 해당 분류 샤드에만 요청
+"""
+
+from es_client import es
+from elasticsearch.helpers import bulk
+from highlight_benchmark import LEGAL_PARAGRAPHS
+import random
+import statistics
+import time
+
+INDEX_NAME = "routing-bench"
+
+def print_section(title):
+    print("\n" + "="*60)
+    print(f"🧭 {title}")
+    print("="*60)
+
+def setup_index(categories, shards, docs_per_category, seed=42):
+    """분류별 라우팅으로 문서를 색인한 다중 샤드 인덱스 생성"""
+    if es.indices.exists(index=INDEX_NAME):
+        es.indices.delete(index=INDEX_NAME)
+
+    es.indices.create(
+        index=INDEX_NAME,
+        settings={"number_of_shards": shards, "number_of_replicas": 0},
+        mappings={
+            "_routing": {"required": True},
+            "properties": {
+                "legal_category": {"type": "keyword"},
+                "content": {"type": "text"}
+            }
+        }
+    )
+
+    rng = random.Random(seed)
+
+    def doc_generator():
+        for category in categories:
+            for i in range(docs_per_category):
+                yield {
+                    "_index": INDEX_NAME,
+                    "_id": f"{category}-{i}",
+                    "_routing": category,
+                    "_source": {
+                        "legal_category": category,
+                        "content": " ".join(rng.choices(LEGAL_PARAGRAPHS, k=5))
+                    }
+                }
+
+    bulk(es, doc_generator(), chunk_size=1000)
+    es.indices.refresh(index=INDEX_NAME)
+
+def run_queries(categories, queries, use_routing, repeat):
+    """분류별 검색을 반복 실행하여 지연시간과 조회 샤드 수 측정"""
+    client_ms = []
+    took_ms = []
+    shards_total = []
+
+    for _ in range(repeat):
+        for category in categories:
+            for query in queries:
+                params = {"routing": category} if use_routing else {}
+                start = time.perf_counter()
+                result = es.search(
+                    index=INDEX_NAME,
+                    query={
+                        "bool": {
+                            "must": [{"match": {"content": query}}],
+                            "filter": [{"term": {"legal_category": category}}]
+                        }
+                    },
+                    size=10,
+                    request_cache=False,
+                    **params
+                )
+                client_ms.append((time.perf_counter() - start) * 1000)
+                took_ms.append(result["took"])
+                shards_total.append(result["_shards"]["total"])
+
+    return {
+        "avg_shards": statistics.mean(shards_total),
+        "avg_took_ms": statistics.mean(took_ms),
+        "p50_client_ms": statistics.median(client_ms),
+        "p95_client_ms": statistics.quantiles(client_ms, n=20)[-1]
+    }
+
+def main(category_count=60, shards=12, docs_per_category=200, repeat=3):
+    print_section(f"라우팅 벤치마크 (분류 {category_count}개, 샤드 {shards}개)")
+
+    if not es.ping():
+        print("❌ Elasticsearch 연결 실패")
+        return
+
+    categories = [f"분류{i:03d}" for i in range(category_count)]
+    print("📦 문서 색인 중...")
+    setup_index(categories, shards, docs_per_category)
+
+    queries = ["스토킹범죄", "징역", "피해자 보호"]
+    for label, use_routing in [("broadcast (필터만)", False), ("routing (라우팅 + 필터)", True)]:
+        stats = run_queries(categories, queries, use_routing, repeat)
+        print(f"\n🔧 {label}")
+        print(f"   🧩 평균 조회 샤드 수: {stats['avg_shards']:.1f}")
+        print(f"   ⏱️  평균 took: {stats['avg_took_ms']:.2f}ms")
+        print(f"   📶 클라이언트 p50 / p95: {stats['p50_client_ms']:.2f}ms / {stats['p95_client_ms']:.2f}ms")
+
+    es.indices.delete(index=INDEX_NAME)
+    print_section("✅ 라우팅 벤치마크 완료!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+tech_books 샘플 데이터 대량 생성기 (NumPy 벡터화)
+- 블록 단위로 열(카테고리, 저자, 날짜, 가격, 평점, 태그 ...)을 난수 배열로 한 번에 생성
+- 값 조합이 적은 필드는 JSON 조각을 미리 만들어 두고 배열 인덱싱으로 이어 붙임
+  → 문서마다 random / datetime / json.dumps 를 호출하지 않음
+- 출력: bulk 액션 dict 스트림 또는 bulk NDJSON 블록(bytes) 스트림
+- 같은 seed면 같은 데이터, (seed, partition, partition_count)로 나눠 만들면 _id 범위가 겹치지 않음
+- 출판일은 고정 기준일(DEFAULT_END_DATE) 기준 - 실행한 날짜와 상관없이 같은 데이터 (--end-date today로 오늘 기준)
+"""
+
+from datetime import date, timedelta
+from functools import lru_cache
+import argparse
+import json
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CATEGORIES = ['프로그래밍', '데이터사이언스', '웹개발', '머신러닝', '인공지능', '클라우드', '보안', '모바일']
+AUTHORS = ['김철수', '이영희', '박민수', '최지은', '정동훈', '홍길동', '김영수', '이민정']
+LANGUAGES = ['Python', 'Java', 'JavaScript', 'C++', 'Go', 'Rust', 'TypeScript', 'Kotlin']
+ADJECTIVES = ['완벽한', '실용적인', '전문가를 위한', '초보자를 위한', '고급', '기초', '심화']
+EXTRA_TAGS = ['tutorial', 'advanced', 'beginner', 'expert']
+
+# random.sample(EXTRA_TAGS, 2)와 같은 분포 - 서로 다른 두 태그의 순열 12가지
+TAG_PAIRS = [(a, b) for a in EXTRA_TAGS for b in EXTRA_TAGS if a != b]
+
+DATE_RANGE_DAYS = 730
+# 출판일 기준일 - 오늘 날짜를 쓰면 같은 seed라도 날마다 데이터가 달라지므로 고정
+DEFAULT_END_DATE = date(2025, 1, 1)
+PRICE_RANGE = (15000, 50000)
+PAGES_RANGE = (200, 800)
+RATING_RANGE = (30, 50)  # 0.1 단위 정수 (3.0 ~ 5.0)
+
+BLOCK_SIZE = 10_000
+
+def print_section(title):
+    print("\n" + "="*60)
+    print(f"🏭 {title}")
+    print("="*60)
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("sample_data 생성기는 numpy가 필요합니다: pip install numpy")
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False)
+
+def _combo_fields(adjective, language, category):
+    """(형용사, 언어, 카테고리)로 정해지는 필드들"""
+    return {
+        "title": f"{adjective} {language} {category}",
+        "category": category,
+        "language": language,
+        "description": f"{language}를 사용한 {category} 전문서적. {adjective} 접근 방식으로 실무에 바로 적용할 수 있습니다."
+    }
+
+def _tags(language, category, pair):
+    return [language.lower(), category, "programming", *pair]
+
+END_DATE_HELP = f"출판일 기준일 (YYYY-MM-DD 또는 today, 기본 {DEFAULT_END_DATE})"
+
+def parse_end_date(value):
+    """--end-date 값 → date ("today"면 실행한 날짜 - 날마다 데이터가 달라짐)"""
+    return date.today() if value == "today" else date.fromisoformat(value)
+
+def _date_strings(end_date):
+    """end_date 기준 최근 2년의 날짜 문자열 (인덱스 = 시작일부터 지난 일수)"""
+    start_date = end_date - timedelta(days=DATE_RANGE_DAYS)
+    return [(start_date + timedelta(days=d)).strftime("%Y-%m-%d") for d in range(DATE_RANGE_DAYS + 1)]
+
+def _byte_table(values):
+    """길이가 같은 bytes 조각 목록 → (개수, 길이) uint8 배열 (행 인덱싱으로 한 번에 복사)"""
+    width = len(values[0])
+    assert all(len(value) == width for value in values), "조각 길이가 모두 같아야 합니다"
+    return np.frombuffer(b"".join(values), dtype=np.uint8).reshape(len(values), width)
+
+class _Fragments:
+    """필드 값 조합별 JSON 조각 (한 번만 생성)
+
+    한 줄 = {가변 부분 + 고정 폭 부분}
+    - 가변 부분: 제목/카테고리/언어/설명/태그 - (형용사, 언어, 카테고리, 태그 순열)로 결정되는 5,376가지
+    - 고정 폭 부분: 저자/출판일/가격/페이지/평점 - 값마다 바이트 길이가 같아서 열 단위로 이어 붙이면 됨
+    """
+
+    def __init__(self, end_date):
+        self.dates = _date_strings(end_date)
+
+        # 가변 부분 번호 = 조합 번호 * 12 + 태그 순열
+        # 조합 번호 = (형용사 * 언어 수 + 언어) * 카테고리 수 + 카테고리
+        heads = []
+        for adjective in ADJECTIVES:
+            for language in LANGUAGES:
+                for category in CATEGORIES:
+                    fields = _combo_fields(adjective, language, category)
+                    for pair in TAG_PAIRS:
+                        fields["tags"] = _tags(language, category, pair)
+                        heads.append(_dumps(fields)[:-1].encode())
+
+        # 가변 부분은 길이별로 나눠 (개수, 길이) 배열로 보관
+        self.head_lengths = np.array([len(head) for head in heads])
+        self.head_widths = np.unique(self.head_lengths)
+        self.head_width_class = np.searchsorted(self.head_widths, self.head_lengths)
+        self.head_tables = []
+        self.head_local = np.empty(len(heads), dtype=np.intp)
+        for width in self.head_widths:
+            members = np.flatnonzero(self.head_lengths == width)
+            self.head_local[members] = np.arange(len(members))
+            self.head_tables.append(_byte_table([heads[i] for i in members]))
+
+        self.authors = _byte_table([f', "author": {_dumps(author)}'.encode() for author in AUTHORS])
+        self.date_fragments = _byte_table([f', "publish_date": "{d}"'.encode() for d in self.dates])
+        self.prices = _byte_table([f', "price": {p}'.encode() for p in range(PRICE_RANGE[0], PRICE_RANGE[1] + 1)])
+        self.pages = _byte_table([f', "pages": {p}'.encode() for p in range(PAGES_RANGE[0], PAGES_RANGE[1] + 1)])
+        self.ratings = _byte_table([f', "rating": {r / 10}'.encode() for r in range(RATING_RANGE[0], RATING_RANGE[1] + 1)])
+
+    @property
+    def fixed_width(self):
+        return sum(table.shape[1] for table in (self.authors, self.date_fragments, self.prices, self.pages, self.ratings))
+
+    def fixed_part(self, columns):
+        """고정 폭 부분 (문서 수, 폭) uint8 배열"""
+        return np.concatenate([
+            self.authors[columns["author"]],
+            self.date_fragments[columns["day"]],
+            self.prices[columns["price"]],
+            self.pages[columns["pages"]],
+            self.ratings[columns["rating"]],
+        ], axis=1)
+
+@lru_cache(maxsize=4)
+def _fragments_for(end_date):
+    """기준일별 조각 테이블 (같은 프로세스에서 파티션을 여러 개 처리할 때 재사용)"""
+    return _Fragments(end_date)
+
+def generate_columns(rng, count):
+    """문서 count개 분량의 열 (모두 정수 인덱스 배열)"""
+    return {
+        "adjective": rng.integers(0, len(ADJECTIVES), count),
+        "language": rng.integers(0, len(LANGUAGES), count),
+        "category": rng.integers(0, len(CATEGORIES), count),
+        "author": rng.integers(0, len(AUTHORS), count),
+        "day": rng.integers(0, DATE_RANGE_DAYS + 1, count),
+        "price": rng.integers(0, PRICE_RANGE[1] - PRICE_RANGE[0] + 1, count),
+        "pages": rng.integers(0, PAGES_RANGE[1] - PAGES_RANGE[0] + 1, count),
+        "rating": rng.integers(0, RATING_RANGE[1] - RATING_RANGE[0] + 1, count),
+        "tag_pair": rng.integers(0, len(TAG_PAIRS), count),
+    }
+
+def _combo_index(columns):
+    return (columns["adjective"] * len(LANGUAGES) + columns["language"]) * len(CATEGORIES) + columns["category"]
+
+def partition_range(count, partition=0, partition_count=1, block_size=BLOCK_SIZE):
+    """파티션이 맡을 문서 위치 [start, stop)
+
+    블록 단위로 나누므로 파티션끼리 겹치지 않고,
+    몇 개로 나누든 각 위치의 문서는 한 번에 만들 때와 같습니다.
+    """
+    if not 0 <= partition < partition_count:
+        raise ValueError(f"partition은 0 이상 {partition_count} 미만이어야 합니다: {partition}")
+    blocks = -(-count // block_size)
+    first = blocks * partition // partition_count
+    last = blocks * (partition + 1) // partition_count
+    return min(first * block_size, count), min(last * block_size, count)
+
+def iter_column_blocks(count, seed=None, block_size=BLOCK_SIZE, partition=0, partition_count=1):
+    """(offset, 열) 블록 스트림
+
+    블록마다 (seed, 블록 번호)로 난수 생성기를 따로 만들므로
+    같은 seed / block_size면 count나 파티션 수와 상관없이 같은 위치의 문서는 항상 같습니다.
+    seed가 None이면 실행마다 달라지므로 여러 프로세스로 나눌 때는 seed를 정해서 넘겨야 합니다.
+    """
+    root = np.random.SeedSequence(seed)
+    start, stop = partition_range(count, partition, partition_count, block_size)
+    for offset in range(start, stop, block_size):
+        rng = np.random.default_rng(np.random.SeedSequence(root.entropy, spawn_key=(offset // block_size,)))
+        # 마지막 블록도 block_size만큼 뽑고 잘라 씀 (그래야 count가 달라도 같은 난수열)
+        columns = generate_columns(rng, block_size)
+        size = min(block_size, count - offset)
+        yield offset, {name: values[:size] for name, values in columns.items()}
+
+def _digit_count(ids):
+    return np.searchsorted(10 ** np.arange(1, 19, dtype=np.int64), ids, side="right") + 1
+
+def _digits(ids, width):
+    """정수 배열 → (개수, width) ASCII 숫자 배열 (모두 width 자리인 경우)"""
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    return (ids[:, None] // powers % 10 + ord("0")).astype(np.uint8)
+
+def iter_ndjson_blocks(count, seed=None, index_name="tech_books", start_id=1, block_size=BLOCK_SIZE,
+                       with_action=True, end_date=None, partition=0, partition_count=1):
+    """bulk NDJSON을 블록(bytes) 단위로 생성
+
+    with_action=True면 문서마다 {"index": {...}} 액션 줄을 앞에 붙여 _bulk에 바로 보낼 수 있습니다.
+    블록 안에서는 길이가 같은 줄끼리 모아 2차원 배열로 만든 뒤 통째로 bytes로 바꾸므로
+    줄 순서가 _id 순서와 다를 수 있습니다 (_id와 내용의 대응은 seed로 고정).
+    partition / partition_count를 주면 그 파티션 몫의 블록만 만듭니다 (partition_range 참고).
+    """
+    _require_numpy()
+    fragments = _fragments_for(end_date or DEFAULT_END_DATE)
+    # index_name=None이면 액션 줄에 _index를 넣지 않음 (/{index}/_bulk로 보낼 덤프용)
+    target = f'"_index": {_dumps(index_name)}, ' if index_name else ""
+    action_prefix = np.frombuffer(f'{{"index": {{{target}"_id": "'.encode(), dtype=np.uint8)
+    action_suffix = np.frombuffer(b'"}}\n', dtype=np.uint8)
+    line_end = np.frombuffer(b"}\n", dtype=np.uint8)
+    n_widths = len(fragments.head_widths)
+    fixed_width = fragments.fixed_width + len(line_end)
+    action_width = len(action_prefix) + len(action_suffix) if with_action else 0
+
+    for offset, columns in iter_column_blocks(count, seed, block_size, partition, partition_count):
+        size = len(columns["author"])
+        head = _combo_index(columns) * len(TAG_PAIRS) + columns["tag_pair"]
+        fixed = fragments.fixed_part(columns)
+        ids = np.arange(start_id + offset, start_id + offset + size, dtype=np.int64)
+        id_width = _digit_count(ids) if with_action else np.zeros(size, dtype=np.int64)
+
+        # 줄 길이를 결정하는 (id 자릿수, 가변 부분 길이)가 같은 행끼리 묶음
+        group = id_width * n_widths + fragments.head_width_class[head]
+        order = np.argsort(group, kind="stable")
+        keys, starts, counts = np.unique(group[order], return_index=True, return_counts=True)
+        digits, width_classes = np.divmod(keys, n_widths)
+        widths = action_width + digits + fragments.head_widths[width_classes] + fixed_width
+
+        # 블록 전체를 담을 버퍼 하나에 그룹별 (행 수, 줄 길이) 2차원 구역으로 채움
+        buffer = np.empty(int(np.dot(counts, widths)), dtype=np.uint8)
+        position = 0
+        for begin, rows_count, digit, width_class, width in zip(
+                starts.tolist(), counts.tolist(), digits.tolist(), width_classes.tolist(), widths.tolist()):
+            rows = order[begin:begin + rows_count]
+            parts = [action_prefix, _digits(ids[rows], digit), action_suffix] if with_action else []
+            parts += [
+                fragments.head_tables[width_class][fragments.head_local[head[rows]]],
+                fixed[rows],
+                line_end,
+            ]
+            out = buffer[position:position + rows_count * width].reshape(rows_count, width)
+            column = 0
+            for part in parts:
+                out[:, column:column + part.shape[-1]] = part
+                column += part.shape[-1]
+            position += rows_count * width
+        yield buffer.tobytes()
+
+def iter_ndjson_lines(count, seed=None, **kwargs):
+    """문서(본문) 한 줄씩 생성 (액션 줄 없음)"""
+    for block in iter_ndjson_blocks(count, seed, with_action=False, **kwargs):
+        yield from block.splitlines(keepends=True)
+
+def iter_documents(count, seed=None, index_name="tech_books", start_id=1, block_size=BLOCK_SIZE,
+                   end_date=None, partition=0, partition_count=1):
+    """bulk 헬퍼에 바로 넘길 수 있는 액션 dict 스트림 ({"_index", "_id", "_source"})"""
+    _require_numpy()
+    dates = _date_strings(end_date or DEFAULT_END_DATE)
+    combos = [
+        _combo_fields(adjective, language, category)
+        for adjective in ADJECTIVES for language in LANGUAGES for category in CATEGORIES
+    ]
+
+    for offset, columns in iter_column_blocks(count, seed, block_size, partition, partition_count):
+        rows = zip(
+            _combo_index(columns).tolist(),
+            columns["author"].tolist(),
+            columns["day"].tolist(),
+            (columns["price"] + PRICE_RANGE[0]).tolist(),
+            (columns["pages"] + PAGES_RANGE[0]).tolist(),
+            ((columns["rating"] + RATING_RANGE[0]) / 10).tolist(),
+            columns["tag_pair"].tolist(),
+        )
+        for i, (combo, author, day, price, pages, rating, tag_pair) in enumerate(rows):
+            fields = combos[combo]
+            yield {
+                "_index": index_name,
+                "_id": start_id + offset + i,
+                "_source": {
+                    "title": fields["title"],
+                    "author": AUTHORS[author],
+                    "category": fields["category"],
+                    "language": fields["language"],
+                    "publish_date": dates[day],
+                    "price": price,
+                    "pages": pages,
+                    "rating": rating,
+                    "description": fields["description"],
+                    "tags": _tags(fields["language"], fields["category"], TAG_PAIRS[tag_pair])
+                }
+            }
+
+def main():
+    parser = argparse.ArgumentParser(description="tech_books 샘플 데이터 생성")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="NDJSON 저장 경로 ('-'면 stdout, 없으면 생성 속도만 측정)")
+    parser.add_argument("--no-action", action="store_true", help="bulk 액션 줄 없이 문서만")
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE)
+    parser.add_argument("--end-date", type=parse_end_date, default=DEFAULT_END_DATE, help=END_DATE_HELP)
+    args = parser.parse_args()
+
+    blocks = iter_ndjson_blocks(args.count, args.seed, block_size=args.block_size, with_action=not args.no_action,
+                                end_date=args.end_date)
+
+    start = time.perf_counter()
+    total_bytes = 0
+    if args.output == "-":
+        for block in blocks:
+            sys.stdout.buffer.write(block)
+            total_bytes += len(block)
+        return
+
+    output = open(args.output, "wb") if args.output else None
+    try:
+        for block in blocks:
+            total_bytes += len(block)
+            if output:
+                output.write(block)
+    finally:
+        if output:
+            output.close()
+    elapsed = time.perf_counter() - start
+
+    print_section("샘플 데이터 생성")
+    print(f"📄 문서 {args.count:,}개, {total_bytes / 1024 / 1024:,.1f}MB, {elapsed:.2f}초")
+    print(f"⚡ {args.count / elapsed:,.0f} docs/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+검색 기록 저장소
+- 검색어별 사용 횟수와 마지막 사용 시각을 JSON 파일에 저장
+- 재시작 후 자주 쓰던 검색어로 캐시 예열(warm-up)에 사용
+"""
+
+from datetime import datetime
+from pathlib import Path
+import json
+import os
+
+DEFAULT_HISTORY_PATH = Path(__file__).with_name("legal_search_history.json")
+
+def load_history(path=DEFAULT_HISTORY_PATH):
+    """검색 기록 로드 (없거나 손상된 파일이면 빈 기록)"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"⚠️  검색 기록을 읽지 못했습니다: {e}")
+        return {}
+
+def save_history(history, path=DEFAULT_HISTORY_PATH):
+    """검색 기록 저장 (임시 파일에 쓴 뒤 교체하여 중간에 끊겨도 파일이 깨지지 않음)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(history, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+def record_query(history, query):
+    """검색어 사용 횟수 증가"""
+    entry = history.setdefault(query, {"count": 0, "last_used": None})
+    entry["count"] += 1
+    entry["last_used"] = datetime.now().isoformat()
+    return entry
+
+def top_queries(history, n=10):
+    """자주 사용한 검색어 상위 n개 (동률이면 최근 사용 순)"""
+    ranked = sorted(
+        history.items(),
+        key=lambda item: (item[1]["count"], item[1]["last_used"] or ""),
+        reverse=True
+    )
+    return [query for query, _ in ranked[:n]]
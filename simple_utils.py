@@ -1,13 +1,45 @@
-from elasticsearch import Elasticsearch
+from es_client import es
+import argparse
 import json
 
-# Elasticsearch 연결 설정
-es = Elasticsearch(
-    "http://localhost:9200",
-    basic_auth=("elastic", "OBIpKj46")
-)
+# 이름 → 건수를 셀 쿼리 (한 번의 요청에서 filters 집계로 모두 계산)
+COUNT_QUERIES = {
+    "'Python' 검색": {"match": {"title": "Python"}},
+    "3만원 이상": {"range": {"price": {"gte": 30000}}},
+}
+
+def collect_stats(index_name, count_queries=COUNT_QUERIES):
+    """전체 문서 수 + 샘플 문서 1개 + 이름별 건수를 size: 1 요청 하나로 조회
+    
+    쿼리를 몇 개 추가해도 요청 수는 늘지 않습니다.
+    """
+    body = {
+        "query": {"match_all": {}},
+        "size": 1,
+        "track_total_hits": True
+    }
+    if count_queries:
+        body["aggs"] = {"counts": {"filters": {"filters": count_queries}}}
+    
+    result = es.search(index=index_name, body=body)
+    hits = result['hits']['hits']
+    buckets = result.get('aggregations', {}).get('counts', {}).get('buckets', {})
+    return {
+        "total": result['hits']['total']['value'],
+        "sample": hits[0]['_source'] if hits else None,
+        "counts": {name: buckets[name]['doc_count'] for name in count_queries}
+    }
 
 def main():
+    parser = argparse.ArgumentParser(description="Elasticsearch 간단 유틸리티")
+    parser.add_argument("--counts", help="이름 → 쿼리 JSON 파일 (기본 건수 쿼리 대신 사용)")
+    args = parser.parse_args()
+    
+    count_queries = COUNT_QUERIES
+    if args.counts:
+        with open(args.counts, encoding="utf-8") as f:
+            count_queries = json.load(f)
+    
     print("🔍 Elasticsearch 간단 유틸리티")
     print("=" * 50)
     
@@ -22,44 +54,32 @@ def main():
     print("\n📚 books 인덱스 정보:")
     index_name = "books"
     
-    if es.indices.exists(index=index_name):
-        # 문서 수 확인
-        count = es.count(index=index_name)
-        print(f"  - 문서 수: {count['count']}개")
+    index_exists = es.indices.exists(index=index_name)
+    if index_exists:
+        # 문서 수 / 샘플 문서 / 건수 통계를 한 번에 조회
+        stats = collect_stats(index_name, count_queries)
+        print(f"  - 문서 수: {stats['total']}개")
         
         # 매핑 확인
         mapping = es.indices.get_mapping(index=index_name)
-        properties = mapping[index_name]['mappings']['properties']
+        # books는 alias라서 응답 키는 실제 인덱스(books_v{n}) 이름
+        properties = next(iter(mapping.values()))['mappings']['properties']
         print(f"  - 필드 수: {len(properties)}개")
         print(f"  - 필드 목록: {list(properties.keys())}")
         
-        # 샘플 문서 1개 조회
-        sample = es.search(index=index_name, body={"query": {"match_all": {}}, "size": 1})
-        if sample['hits']['hits']:
-            doc = sample['hits']['hits'][0]['_source']
-            print(f"  - 샘플 문서: {doc['title']}")
+        # 샘플 문서
+        if stats['sample']:
+            print(f"  - 샘플 문서: {stats['sample']['title']}")
     else:
         print("  - 인덱스가 존재하지 않습니다.")
     
     # 3. 간단한 검색 테스트
     print("\n🔍 간단한 검색 테스트:")
     
-    if es.indices.exists(index=index_name):
-        # 전체 문서 검색
-        all_docs = es.search(index=index_name, body={"query": {"match_all": {}}})
-        print(f"  - 전체 문서: {all_docs['hits']['total']['value']}개")
-        
-        # 키워드 검색
-        search_results = es.search(index=index_name, body={
-            "query": {"match": {"title": "Python"}}
-        })
-        print(f"  - 'Python' 검색: {search_results['hits']['total']['value']}개")
-        
-        # 범위 검색
-        price_results = es.search(index=index_name, body={
-            "query": {"range": {"price": {"gte": 30000}}}
-        })
-        print(f"  - 3만원 이상: {price_results['hits']['total']['value']}개")
+    if index_exists:
+        print(f"  - 전체 문서: {stats['total']}개")
+        for name, count in stats['counts'].items():
+            print(f"  - {name}: {count}개")
     
     # 4. 인덱스 목록 (시스템 인덱스 제외)
     print("\n📁 사용자 인덱스 목록:")
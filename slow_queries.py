@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+느린 쿼리 기록기
+- 공용 클라이언트(es_client)에서 검색 요청이 기준 시간을 넘으면 기록
+  (쿼리 본문, 인덱스, 파라미터, took, 클라이언트 지연시간, 히트 수, 응답 크기, 호출 위치)
+- 기록은 큐에 넣기만 하고 파일 쓰기는 백그라운드 스레드가 담당 → 요청 경로를 막지 않음
+- NDJSON 파일이 커지면 .1, .2 ... 로 교체 (rotating)
+- python slow_queries.py report : 쿼리 모양(값을 지운 구조)별로 묶어서 요약
+
+환경 변수
+- ES_SLOW_QUERY_MS: 기준 시간 (기본 1000ms, 0 이하이면 기록 안 함)
+- ES_SLOW_QUERY_LOG: 기록 파일 경로 (기본 slow_queries.ndjson)
+"""
+
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import queue
+import sys
+import threading
+from datetime import datetime
+
+DEFAULT_LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "slow_queries.ndjson")
+
+SLOW_QUERY_MS = float(os.environ.get("ES_SLOW_QUERY_MS", "1000"))
+SLOW_QUERY_LOG = os.environ.get("ES_SLOW_QUERY_LOG", DEFAULT_LOG_PATH)
+
+# 기록 대상 API (endpoint_id)
+SLOW_QUERY_OPERATIONS = {"search", "msearch", "count"}
+
+# 파일 하나의 최대 크기 / 보관할 이전 파일 수
+MAX_LOG_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 3
+
+# 쓰기 스레드가 밀리면 새 기록은 버림 (요청 경로에서 대기하지 않음)
+QUEUE_SIZE = 10000
+
+# 호출 위치를 찾을 때 건너뛸 모듈 (클라이언트 내부)
+_INTERNAL_MODULES = ("es_client", "slow_queries", "tracing", "elasticsearch", "elastic_transport")
+
+def print_section(title):
+    print("\n" + "="*60)
+    print(f"🐢 {title}")
+    print("="*60)
+
+class SlowQueryWriter:
+    """큐에 쌓인 기록을 백그라운드 스레드에서 NDJSON 파일로 쓰고 크기에 따라 교체"""
+
+    def __init__(self, path, max_bytes=MAX_LOG_BYTES, backup_count=BACKUP_COUNT):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._run, name="slow-query-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, entry):
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout=2.0):
+        """남은 기록을 모두 쓰고 스레드 종료"""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _rotate(self):
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+            try:
+                if os.path.exists(self.path) and os.path.getsize(self.path) + len(line) > self.max_bytes:
+                    self._rotate()
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+            except OSError as e:
+                print(f"⚠️  느린 쿼리 기록 실패: {e}", file=sys.stderr)
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def _get_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = SlowQueryWriter(SLOW_QUERY_LOG)
+                atexit.register(_writer.close)
+    return _writer
+
+def _caller():
+    """클라이언트 내부를 벗어난 첫 호출 위치 (느린 쿼리일 때만 계산)"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.split(".")[0] not in _INTERNAL_MODULES:
+            return f"{module}.{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return None
+
+def record_if_slow(operation, path_parts, params, body, response, client_ms, took_ms, response_bytes, status=None):
+    """기준 시간을 넘은 검색 요청이면 기록 큐에 추가
+
+    status는 실패한 요청의 상태 코드 / 예외 이름 - 타임아웃처럼 오래 기다리다 실패한 요청도 기록합니다.
+    """
+    if SLOW_QUERY_MS <= 0 or operation not in SLOW_QUERY_OPERATIONS:
+        return
+    if client_ms < SLOW_QUERY_MS and (took_ms is None or took_ms < SLOW_QUERY_MS):
+        return
+
+    hits = None
+    if isinstance(response, dict) and "hits" in response:
+        total = response["hits"].get("total")
+        hits = total.get("value") if isinstance(total, dict) else total
+    elif isinstance(response, dict) and "count" in response:
+        hits = response["count"]
+
+    entry = {
+        "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+        "operation": operation,
+        "index": (path_parts or {}).get("index"),
+        "params": params or {},
+        "body": body,
+        "took_ms": took_ms,
+        "client_ms": round(client_ms, 2),
+        "hits": hits,
+        "response_bytes": response_bytes,
+        "caller": _caller()
+    }
+    if status is not None:
+        entry["status"] = status
+    _get_writer().submit(entry)
+
+def query_shape(node):
+    """값을 '?'로 지운 쿼리 구조 (같은 모양의 쿼리를 하나로 묶기 위함)"""
+    if isinstance(node, dict):
+        return {key: query_shape(value) for key, value in sorted(node.items())}
+    if isinstance(node, list):
+        shapes = [query_shape(item) for item in node]
+        # 값만 다른 목록은 하나로 ([1, 2, 3] → ["?"]), 구조가 다른 절 목록은 유지
+        unique = []
+        for shape in shapes:
+            if shape not in unique:
+                unique.append(shape)
+        return unique
+    return "?"
+
+def shape_id(operation, body):
+    shape = json.dumps([operation, query_shape(body)], sort_keys=True, ensure_ascii=False)
+    return hashlib.md5(shape.encode("utf-8")).hexdigest()[:10]
+
+def load_entries(path=SLOW_QUERY_LOG):
+    """현재 파일 + 교체된 이전 파일의 기록 (오래된 것부터)"""
+    paths = [f"{path}.{i}" for i in range(BACKUP_COUNT, 0, -1)] + [path]
+    for current in paths:
+        if not os.path.exists(current):
+            continue
+        with open(current, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def group_by_shape(entries):
+    """쿼리 모양별 건수 / 지연시간 통계 / 호출 위치 / 예시"""
+    groups = {}
+    for entry in entries:
+        key = shape_id(entry["operation"], entry.get("body"))
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                "shape_id": key,
+                "operation": entry["operation"],
+                "shape": query_shape(entry.get("body")),
+                "client_ms": [],
+                "took_ms": [],
+                "indices": set(),
+                "errors": {},
+                "callers": {},
+                "example": entry
+            }
+        group["client_ms"].append(entry["client_ms"])
+        if entry.get("took_ms") is not None:
+            group["took_ms"].append(entry["took_ms"])
+        if entry.get("index"):
+            group["indices"].add(str(entry["index"]))
+        if entry.get("status") is not None:
+            status = str(entry["status"])
+            group["errors"][status] = group["errors"].get(status, 0) + 1
+        caller = entry.get("caller") or "?"
+        group["callers"][caller] = group["callers"].get(caller, 0) + 1
+        if entry["client_ms"] > group["example"]["client_ms"]:
+            group["example"] = entry
+
+    rows = []
+    for group in groups.values():
+        client_ms = sorted(group["client_ms"])
+        rows.append({
+            **group,
+            "count": len(client_ms),
+            "total_ms": sum(client_ms),
+            "p95_ms": client_ms[min(len(client_ms) - 1, int(len(client_ms) * 0.95))],
+            "max_ms": client_ms[-1],
+            "avg_took_ms": sum(group["took_ms"]) / len(group["took_ms"]) if group["took_ms"] else None
+        })
+    rows.sort(key=lambda row: row["total_ms"], reverse=True)
+    return rows
+
+def display_groups(rows, top=10, show_shape=False):
+    for row in rows[:top]:
+        took = f", took 평균 {row['avg_took_ms']:.0f}ms" if row["avg_took_ms"] is not None else ""
+        print(f"\n🔎 [{row['shape_id']}] {row['operation']} on {', '.join(sorted(row['indices'])) or '-'}")
+        print(f"   {row['count']}회 | 합계 {row['total_ms']:.0f}ms | p95 {row['p95_ms']:.0f}ms | 최대 {row['max_ms']:.0f}ms{took}")
+        if row["errors"]:
+            print("   ❌ 실패: " + ", ".join(f"{status} {count}회" for status, count in sorted(row["errors"].items())))
+        for caller, count in sorted(row["callers"].items(), key=lambda item: item[1], reverse=True)[:3]:
+            print(f"   📍 {caller} ({count}회)")
+        if show_shape:
+            print("   🧩 " + json.dumps(row["shape"], ensure_ascii=False))
+        example = json.dumps(row["example"].get("body"), ensure_ascii=False)
+        print(f"   📝 예시: {example[:200]}{'...' if len(example) > 200 else ''}")
+
+def main():
+    parser = argparse.ArgumentParser(description="느린 쿼리 기록 요약")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    report_parser = subparsers.add_parser("report", help="쿼리 모양별 느린 쿼리 요약")
+    report_parser.add_argument("--file", default=SLOW_QUERY_LOG)
+    report_parser.add_argument("--top", type=int, default=10)
+    report_parser.add_argument("--shape", action="store_true", help="정규화된 쿼리 구조도 출력")
+
+    args = parser.parse_args()
+
+    entries = list(load_entries(args.file))
+    print_section(f"느린 쿼리 요약 ({len(entries):,}건, 기준 {SLOW_QUERY_MS:g}ms)")
+    if not entries:
+        print("기록된 느린 쿼리가 없습니다.")
+        return
+    display_groups(group_by_shape(entries), args.top, args.shape)
+
+if __name__ == "__main__":
+    main()
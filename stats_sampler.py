@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+클러스터 지표 샘플러
+- _stats / _nodes/stats 를 일정 간격으로 폴링
+- 샘플은 고정 크기 링 버퍼(array 하나에 행 단위로 저장)에 보관 - 오래된 샘플부터 덮어씀
+- 구간별 인덱싱 속도 / 검색 속도 / 쿼리·인덱싱 지연시간 / refresh·merge 시간 계산
+- 실시간 출력 + CSV 내보내기
+"""
+
+from es_client import es
+from array import array
+from datetime import datetime
+import argparse
+import csv
+import math
+import threading
+import time
+
+# 원본 샘플 열: (이름, _stats 또는 _nodes/stats 응답 경로)
+# _stats 값은 _all.total 기준 누적 카운터, 노드 값은 전체 노드 합계(heap은 최댓값)
+INDEX_FIELDS = (
+    ("index_total", ("indexing", "index_total")),
+    ("index_time_ms", ("indexing", "index_time_in_millis")),
+    ("query_total", ("search", "query_total")),
+    ("query_time_ms", ("search", "query_time_in_millis")),
+    ("fetch_total", ("search", "fetch_total")),
+    ("refresh_total", ("refresh", "total")),
+    ("refresh_time_ms", ("refresh", "total_time_in_millis")),
+    ("merge_total", ("merges", "total")),
+    ("merge_time_ms", ("merges", "total_time_in_millis")),
+    ("docs_count", ("docs", "count")),
+    ("store_bytes", ("store", "size_in_bytes")),
+)
+NODE_FIELDS = (
+    ("heap_used_percent", ("jvm", "mem", "heap_used_percent")),
+    ("search_rejected", ("thread_pool", "search", "rejected")),
+    ("write_rejected", ("thread_pool", "write", "rejected")),
+)
+SAMPLE_FIELDS = tuple(name for name, _ in INDEX_FIELDS + NODE_FIELDS)
+
+DERIVED_FIELDS = (
+    "indexing_rate", "search_rate", "query_latency_ms", "indexing_latency_ms",
+    "interval_refresh_ms", "interval_merge_ms", "heap_percent", "rejected"
+)
+
+def print_section(title):
+    print("\n" + "="*60)
+    print(f"📉 {title}")
+    print("="*60)
+
+class SampleRing:
+    """고정 크기 링 버퍼 - (timestamp, 필드...) 행을 array('d') 하나에 연속 저장"""
+
+    def __init__(self, capacity, fields=SAMPLE_FIELDS):
+        self.capacity = capacity
+        self.fields = fields
+        self._stride = len(fields) + 1
+        self._data = array("d", bytes(8 * capacity * self._stride))
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def append(self, timestamp, values):
+        with self._lock:
+            offset = self._next * self._stride
+            self._data[offset] = timestamp
+            self._data[offset + 1:offset + self._stride] = array("d", values)
+            self._next = (self._next + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def rows(self):
+        """오래된 샘플부터 (timestamp, values) 목록"""
+        with self._lock:
+            first = (self._next - self._size) % self.capacity
+            rows = []
+            for i in range(self._size):
+                offset = ((first + i) % self.capacity) * self._stride
+                row = self._data[offset:offset + self._stride]
+                rows.append((row[0], row[1:]))
+            return rows
+
+    def last(self, n=2):
+        return self.rows()[-n:]
+
+def _dig(data, path):
+    for key in path:
+        data = data.get(key, {}) if isinstance(data, dict) else {}
+    return data if isinstance(data, (int, float)) else math.nan
+
+def collect_sample(index_name="_all"):
+    """현재 누적 카운터 한 행 (SAMPLE_FIELDS 순서)"""
+    stats = es.indices.stats(index=index_name, metric=["indexing", "search", "refresh", "merge", "docs", "store"])
+    total = stats["_all"]["total"]
+    values = [_dig(total, path) for _, path in INDEX_FIELDS]
+
+    nodes = es.nodes.stats(metric=["jvm", "thread_pool"])["nodes"].values()
+    for name, path in NODE_FIELDS:
+        node_values = [_dig(node, path) for node in nodes]
+        if name == "heap_used_percent":
+            values.append(max(node_values, default=math.nan))
+        else:
+            values.append(sum(node_values))
+    return values
+
+def derive(previous, current, fields=SAMPLE_FIELDS):
+    """연속된 두 샘플로 구간 지표 계산 (카운터가 줄었으면 - 노드 재시작 등 - nan)"""
+    prev_ts, prev_values = previous
+    ts, values = current
+    prev = dict(zip(fields, prev_values))
+    cur = dict(zip(fields, values))
+    seconds = ts - prev_ts
+
+    def delta(name):
+        value = cur[name] - prev[name]
+        return value if value >= 0 else math.nan
+
+    query_count = delta("query_total")
+    index_count = delta("index_total")
+    return {
+        "indexing_rate": index_count / seconds if seconds > 0 else math.nan,
+        "search_rate": query_count / seconds if seconds > 0 else math.nan,
+        "query_latency_ms": delta("query_time_ms") / query_count if query_count else 0.0,
+        "indexing_latency_ms": delta("index_time_ms") / index_count if index_count else 0.0,
+        "interval_refresh_ms": delta("refresh_time_ms"),
+        "interval_merge_ms": delta("merge_time_ms"),
+        "heap_percent": cur["heap_used_percent"],
+        "rejected": delta("search_rejected") + delta("write_rejected"),
+    }
+
+def start_sampler(ring, interval=5.0, index_name="_all", on_sample=None):
+    """백그라운드 스레드에서 interval초마다 샘플 수집 → (스레드, 중지 이벤트)"""
+    stop = threading.Event()
+
+    def run():
+        next_time = time.monotonic()
+        while not stop.is_set():
+            try:
+                values = collect_sample(index_name)
+                ring.append(time.time(), values)
+                if on_sample:
+                    on_sample(ring)
+            except Exception as e:
+                print(f"⚠️  샘플 수집 실패: {e}")
+            # 호출 시간만큼 간격이 밀리지 않도록 다음 시각 기준으로 대기
+            next_time += interval
+            stop.wait(max(0.0, next_time - time.monotonic()))
+
+    thread = threading.Thread(target=run, name="stats-sampler", daemon=True)
+    thread.start()
+    return thread, stop
+
+def format_live_row(timestamp, metrics):
+    when = datetime.fromtimestamp(timestamp).strftime("%H:%M:%S")
+    return (f"{when} | 인덱싱 {metrics['indexing_rate']:8.1f}/s ({metrics['indexing_latency_ms']:6.2f}ms) | "
+            f"검색 {metrics['search_rate']:8.1f}/s ({metrics['query_latency_ms']:6.2f}ms) | "
+            f"refresh {metrics['interval_refresh_ms']:6.0f}ms | merge {metrics['interval_merge_ms']:6.0f}ms | "
+            f"heap {metrics['heap_percent']:3.0f}% | 거부 {metrics['rejected']:.0f}")
+
+def print_live(ring):
+    """샘플이 추가될 때마다 직전 구간 지표 한 줄 출력"""
+    rows = ring.last(2)
+    if len(rows) == 2:
+        print(format_live_row(rows[1][0], derive(rows[0], rows[1], ring.fields)))
+
+def export_csv(ring, path):
+    """링 버퍼의 원본 샘플 + 구간 지표를 CSV로 저장"""
+    rows = ring.rows()
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("timestamp",) + ring.fields + DERIVED_FIELDS)
+        previous = None
+        for row in rows:
+            derived = derive(previous, row, ring.fields) if previous else {}
+            writer.writerow(
+                [datetime.fromtimestamp(row[0]).isoformat(timespec="seconds")]
+                + list(row[1])
+                + [derived.get(name, "") for name in DERIVED_FIELDS]
+            )
+            previous = row
+    return len(rows)
+
+def main():
+    parser = argparse.ArgumentParser(description="클러스터 지표 샘플러")
+    parser.add_argument("--index", default="_all")
+    parser.add_argument("--interval", type=float, default=5.0, help="샘플 간격 (초)")
+    parser.add_argument("--capacity", type=int, default=720, help="링 버퍼 크기 (기본 5초 x 720 = 1시간)")
+    parser.add_argument("--duration", type=float, default=0, help="수집 시간 (초, 0 = Ctrl+C까지)")
+    parser.add_argument("--csv", help="종료 시 CSV로 저장할 경로")
+    args = parser.parse_args()
+
+    print_section(f"지표 샘플링 ({args.index}, {args.interval:g}초 간격)")
+
+    if not es.ping():
+        print("❌ Elasticsearch 연결 실패")
+        return
+
+    ring = SampleRing(args.capacity)
+    thread, stop = start_sampler(ring, args.interval, args.index, on_sample=print_live)
+    try:
+        if args.duration:
+            time.sleep(args.duration)
+        else:
+            while thread.is_alive():
+                thread.join(timeout=1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        thread.join()
+
+    if args.csv:
+        count = export_csv(ring, args.csv)
+        print(f"\n💾 {args.csv} 저장 완료 (샘플 {count}개)")
+
+    print_section("✅ 지표 샘플링 완료!")
+
+if __name__ == "__main__":
+    main()
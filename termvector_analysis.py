@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+텀 벡터 대량 분석 도구
+- 문서 id를 scan으로 훑으면서 _mtermvectors로 배치 단위 텀 벡터 조회
+- 필드별로 텀 → 번호 사전 + array 카운터(term_freq 합계, 문서 빈도)에 누적
+  (응답은 배치마다 집계 후 버림 - 전체 응답을 메모리에 두지 않음)
+- 필드별 상위 텀 / 문서당 토큰 수 / 고유 텀 수 리포트 (분석기 튜닝, 비대한 필드 찾기)
+"""
+
+from es_client import es
+from elasticsearch.helpers import scan
+from array import array
+import argparse
+import heapq
+import time
+
+def print_section(title):
+    print("\n" + "="*60)
+    print(f"🧮 {title}")
+    print("="*60)
+
+def new_field_counter():
+    """필드 하나의 누적 카운터
+
+    텀 문자열은 vocab에 한 번만 저장하고, 빈도는 번호 순서대로 array에 보관합니다.
+    """
+    return {
+        "vocab": {},              # 텀 → 번호
+        "terms": [],              # 번호 → 텀
+        "ttf": array("Q"),        # 번호 → 샘플 내 전체 출현 수
+        "df": array("I"),         # 번호 → 샘플 내 문서 빈도
+        "docs": 0,                # 이 필드가 있는 문서 수
+        "tokens": 0,              # 샘플 내 전체 토큰 수
+        "max_tokens": 0,          # 문서 하나의 최대 토큰 수
+        "field_statistics": None  # 인덱스 전체 기준 통계 (ES 응답)
+    }
+
+def add_term_vector(counter, field_vector):
+    """문서 하나의 필드 텀 벡터를 카운터에 누적"""
+    vocab, ttf, df = counter["vocab"], counter["ttf"], counter["df"]
+    doc_tokens = 0
+    for term, info in field_vector.get("terms", {}).items():
+        term_id = vocab.get(term)
+        if term_id is None:
+            term_id = vocab[term] = len(counter["terms"])
+            counter["terms"].append(term)
+            ttf.append(0)
+            df.append(0)
+        freq = info["term_freq"]
+        ttf[term_id] += freq
+        df[term_id] += 1
+        doc_tokens += freq
+
+    counter["docs"] += 1
+    counter["tokens"] += doc_tokens
+    counter["max_tokens"] = max(counter["max_tokens"], doc_tokens)
+    if counter["field_statistics"] is None and "field_statistics" in field_vector:
+        counter["field_statistics"] = field_vector["field_statistics"]
+
+def iter_doc_ids(index_name, sample_size, batch_size):
+    """_source 없이 문서 id만 scan으로 조회 (최대 sample_size개)"""
+    count = 0
+    for hit in scan(es, index=index_name, query={"query": {"match_all": {}}, "_source": False}, size=batch_size):
+        if sample_size and count >= sample_size:
+            return
+        yield hit["_id"]
+        count += 1
+
+def _batched(iterable, batch_size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def analyze_term_vectors(index_name, fields, sample_size=5000, batch_size=200):
+    """샘플 문서의 텀 벡터를 배치로 조회하며 필드별 카운터에 누적"""
+    counters = {}
+    requests = 0
+    docs = 0
+
+    start = time.perf_counter()
+    for ids in _batched(iter_doc_ids(index_name, sample_size, batch_size), batch_size):
+        result = es.mtermvectors(
+            index=index_name,
+            ids=ids,
+            fields=fields,
+            field_statistics=True,
+            term_statistics=False,
+            positions=False,
+            offsets=False,
+            payloads=False
+        )
+        requests += 1
+        for doc in result["docs"]:
+            if not doc.get("found", True):
+                continue
+            docs += 1
+            for field, field_vector in doc.get("term_vectors", {}).items():
+                counter = counters.get(field)
+                if counter is None:
+                    # 와일드카드로 지정한 필드도 응답에서 처음 본 시점에 카운터 생성
+                    counter = counters[field] = new_field_counter()
+                add_term_vector(counter, field_vector)
+
+    return {
+        "index": index_name,
+        "docs": docs,
+        "requests": requests,
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+        "fields": counters
+    }
+
+def top_terms(counter, n=20, key="ttf"):
+    """카운터에서 빈도 상위 n개 텀 [(텀, ttf, df), ...]"""
+    values = counter[key]
+    term_ids = heapq.nlargest(n, range(len(values)), key=values.__getitem__)
+    return [(counter["terms"][i], counter["ttf"][i], counter["df"][i]) for i in term_ids]
+
+def field_summary(counter, sample_docs):
+    """필드 수준 통계 (문서당 토큰 수, 고유 텀 수, 희소도)"""
+    docs = counter["docs"]
+    unique = len(counter["terms"])
+    singletons = sum(1 for value in counter["df"] if value == 1)
+    return {
+        "coverage": docs / sample_docs if sample_docs else 0,
+        "avg_tokens": counter["tokens"] / docs if docs else 0,
+        "max_tokens": counter["max_tokens"],
+        "unique_terms": unique,
+        "singleton_ratio": singletons / unique if unique else 0,
+        "index_stats": counter["field_statistics"]
+    }
+
+def display_report(report, top=20):
+    print(f"📄 문서 {report['docs']:,}개, 요청 {report['requests']}회, {report['elapsed_ms']:.0f}ms")
+
+    # 문서당 토큰 수가 많은 필드부터 (비대한 필드 확인용)
+    summaries = {field: field_summary(counter, report["docs"]) for field, counter in report["fields"].items()}
+    for field in sorted(summaries, key=lambda f: summaries[f]["avg_tokens"], reverse=True):
+        summary = summaries[field]
+        counter = report["fields"][field]
+        print(f"\n🔧 {field}")
+        print(f"   📊 포함 문서 {summary['coverage']:.0%} | 문서당 토큰 평균 {summary['avg_tokens']:.1f} / 최대 {summary['max_tokens']}")
+        print(f"   🔤 고유 텀 {summary['unique_terms']:,}개 (한 문서에만 나온 텀 {summary['singleton_ratio']:.0%})")
+        if summary["index_stats"]:
+            stats = summary["index_stats"]
+            print(f"   🗂️  인덱스 전체: 문서 {stats['doc_count']:,} | sum_ttf {stats['sum_ttf']:,} | sum_doc_freq {stats['sum_doc_freq']:,}")
+        for term, ttf, df in top_terms(counter, top):
+            print(f"      - '{term}': 출현 {ttf:,}회 / 문서 {df:,}개")
+
+def main():
+    parser = argparse.ArgumentParser(description="텀 벡터 대량 분석")
+    parser.add_argument("--index", default="tech_books")
+    parser.add_argument("--fields", default="title,description", help="쉼표로 구분 (와일드카드 가능)")
+    parser.add_argument("--sample", type=int, default=5000, help="분석할 최대 문서 수 (0 = 전체)")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    print_section(f"텀 벡터 분석 ({args.index})")
+
+    if not es.indices.exists(index=args.index):
+        print(f"❌ '{args.index}' 인덱스가 존재하지 않습니다.")
+        return
+
+    fields = [field.strip() for field in args.fields.split(",") if field.strip()]
+    report = analyze_term_vectors(args.index, fields, args.sample, args.batch_size)
+    display_report(report, args.top)
+
+    print_section("✅ 텀 벡터 분석 완료!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+가벼운 트레이싱 (OpenTelemetry 호환 API)
+- tracer.start_as_current_span("이름", attributes={...}) 으로 구간 측정
+- ES_TRACE=stdout → 스팬을 한 줄 JSON으로 출력
+  ES_TRACE=파일경로 → NDJSON 파일에 기록
+  ES_TRACE=otel → opentelemetry-api가 설치되어 있으면 그 트레이서 사용
+- ES_TRACE가 없으면 공용 no-op 스팬만 돌려주므로 오버헤드가 거의 없음
+- python tracing.py summarize <파일> 로 스팬 이름별 시간 요약
+"""
+
+import argparse
+import atexit
+import contextvars
+import functools
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+TRACE_EXPORT = os.environ.get("ES_TRACE", "")
+
+SERVICE_NAME = "elasticsearch-study"
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_exporter = None
+
+def print_section(title):
+    print("\n" + "="*60)
+    print(f"🧵 {title}")
+    print("="*60)
+
+class _NonRecordingSpan:
+    """트레이싱이 꺼져 있을 때 쓰는 공용 스팬 - 모든 메서드가 아무것도 하지 않음"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def is_recording(self):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def add_event(self, name, attributes=None):
+        pass
+
+    def record_exception(self, exception):
+        pass
+
+    def set_status(self, status, description=None):
+        pass
+
+    def end(self):
+        pass
+
+_NOOP_SPAN = _NonRecordingSpan()
+
+class Span:
+    """기록 중인 스팬 (with 블록을 벗어나면 종료되어 exporter로 전달)"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "events", "status", "_token")
+
+    def __init__(self, name, parent, attributes=None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes) if attributes else {}
+        self.events = []
+        self.status = "UNSET"
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.record_exception(exc)
+            self.set_status("ERROR", str(exc))
+        _current_span.reset(self._token)
+        self.end()
+        return False
+
+    def is_recording(self):
+        return self.end_ns is None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes):
+        self.attributes.update(attributes)
+
+    def add_event(self, name, attributes=None):
+        self.events.append({"name": name, "time_unix_nano": time.time_ns(), "attributes": attributes or {}})
+
+    def record_exception(self, exception):
+        self.add_event("exception", {
+            "exception.type": type(exception).__name__,
+            "exception.message": str(exception)
+        })
+
+    def set_status(self, status, description=None):
+        self.status = status if description is None else f"{status}: {description}"
+
+    def end(self):
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if _exporter is not None:
+            _exporter.export(self)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1_000_000, 3),
+            "attributes": self.attributes,
+            "events": self.events,
+            "status": self.status,
+            "resource": {"service.name": SERVICE_NAME}
+        }
+
+class Tracer:
+    def __init__(self, name):
+        self.name = name
+
+    def start_as_current_span(self, name, attributes=None):
+        """with 블록 동안 현재 스팬이 되는 스팬 (OpenTelemetry와 같은 사용법)"""
+        if _exporter is None:
+            return _NOOP_SPAN
+        return Span(name, _current_span.get(), attributes)
+
+class ConsoleSpanExporter:
+    """스팬을 한 줄 JSON으로 stdout에 출력"""
+
+    def export(self, span):
+        print(json.dumps(span.to_dict(), ensure_ascii=False), file=sys.stdout)
+
+    def shutdown(self):
+        sys.stdout.flush()
+
+class JsonFileSpanExporter:
+    """스팬을 NDJSON 파일에 추가 (여러 스레드에서 호출 가능)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        line = json.dumps(span.to_dict(), ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def shutdown(self):
+        with self._lock:
+            self._file.close()
+
+def configure(export=None):
+    """exporter 설정 ("stdout", 파일 경로, 또는 None/"" = 끄기)"""
+    global _exporter
+    if _exporter is not None:
+        _exporter.shutdown()
+    if not export or export == "otel":
+        _exporter = None
+    elif export == "stdout":
+        _exporter = ConsoleSpanExporter()
+    else:
+        _exporter = JsonFileSpanExporter(export)
+
+def is_enabled():
+    return _exporter is not None
+
+def _shutdown():
+    if _exporter is not None:
+        _exporter.shutdown()
+
+atexit.register(_shutdown)
+
+def get_tracer(name):
+    """모듈별 트레이서 (ES_TRACE=otel이면 OpenTelemetry 트레이서 반환)"""
+    if TRACE_EXPORT == "otel":
+        try:
+            from opentelemetry import trace
+            return trace.get_tracer(name)
+        except ImportError:
+            print("⚠️  ES_TRACE=otel 이지만 opentelemetry-api가 설치되어 있지 않아 트레이싱을 끕니다.")
+    return Tracer(name)
+
+def get_current_span():
+    return _current_span.get() or _NOOP_SPAN
+
+def traced(name=None, tracer=None):
+    """함수 전체를 스팬으로 감싸는 데코레이터"""
+    def decorator(func):
+        span_name = name or func.__name__
+        span_tracer = tracer or get_tracer(func.__module__)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span_tracer.start_as_current_span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def load_spans(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def summarize_spans(spans):
+    """스팬 이름별 호출 수 / 합계 / 평균 / p95 / 최대 (ms)"""
+    durations = {}
+    for span in spans:
+        durations.setdefault(span["name"], []).append(span["duration_ms"])
+
+    rows = []
+    for name, values in durations.items():
+        values.sort()
+        rows.append({
+            "name": name,
+            "count": len(values),
+            "total_ms": round(sum(values), 3),
+            "avg_ms": round(sum(values) / len(values), 3),
+            "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))],
+            "max_ms": values[-1]
+        })
+    rows.sort(key=lambda row: row["total_ms"], reverse=True)
+    return rows
+
+def format_trace_tree(spans, trace_id):
+    """한 트레이스의 스팬을 부모-자식 트리로 출력"""
+    trace_spans = [span for span in spans if span["trace_id"] == trace_id]
+    children = {}
+    for span in trace_spans:
+        children.setdefault(span["parent_span_id"], []).append(span)
+
+    lines = []
+
+    def walk(parent_id, depth):
+        for span in sorted(children.get(parent_id, []), key=lambda s: s["start_time_unix_nano"]):
+            lines.append(f"   {'  ' * depth}- {span['name']} {span['duration_ms']}ms")
+            walk(span["span_id"], depth + 1)
+
+    walk(None, 0)
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="트레이스 파일 요약")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    summarize_parser = subparsers.add_parser("summarize", help="스팬 이름별 시간 요약")
+    summarize_parser.add_argument("path")
+    summarize_parser.add_argument("--slowest", type=int, default=1, help="트리로 출력할 느린 트레이스 수")
+
+    args = parser.parse_args()
+    spans = load_spans(args.path)
+
+    print_section(f"트레이스 요약 ({len(spans):,}개 스팬)")
+    for row in summarize_spans(spans):
+        print(f"   {row['name']}: {row['count']}회, 합계 {row['total_ms']:.1f}ms, "
+              f"평균 {row['avg_ms']:.2f}ms, p95 {row['p95_ms']:.2f}ms, 최대 {row['max_ms']:.2f}ms")
+
+    roots = sorted(
+        (span for span in spans if span["parent_span_id"] is None),
+        key=lambda span: span["duration_ms"],
+        reverse=True
+    )
+    for root in roots[:args.slowest]:
+        print(f"\n🐢 가장 느린 트레이스 {root['trace_id'][:8]} ({root['duration_ms']}ms)")
+        print(format_trace_tree(spans, root["trace_id"]))
+
+configure(TRACE_EXPORT)
+
+if __name__ == "__main__":
+    main()